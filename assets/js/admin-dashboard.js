@@ -302,6 +302,18 @@ document.addEventListener('DOMContentLoaded', function() {
     // setup modal close functionality
     setupModalClose();
     
-    // refresh dashboard stats every 30 seconds
-    setInterval(loadDashboardStats, 30000);
+    // refresh dashboard stats only when the server reports a change
+    subscribeToDashboardEvents();
 });
+
+// listen for counter changes pushed by the server, falling back to polling
+function subscribeToDashboardEvents() {
+    if (!window.EventSource) {
+        setInterval(loadDashboardStats, 30000);
+        return;
+    }
+
+    const events = new EventSource('/api/events/', { withCredentials: true });
+    events.addEventListener('counters', loadDashboardStats);
+    events.addEventListener('notification', loadDashboardStats);
+}
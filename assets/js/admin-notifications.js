@@ -1,9 +1,14 @@
 // admin notification functions
 
-// load and display notifications
-async function loadNotifications() {
+// link to the next page of the feed, or null once the last page is shown
+let nextNotificationsUrl = null;
+
+// load and display notifications; pass append to add the next page below the current one
+async function loadNotifications(append = false) {
+    const appending = append && nextNotificationsUrl !== null;
+    const url = appending ? nextNotificationsUrl : '/api/notifications/admin/';
     try {
-        const response = await fetch('/api/notifications/admin/', {
+        const response = await fetch(url, {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json',
@@ -14,7 +19,8 @@ async function loadNotifications() {
 
         if (response.ok) {
             const data = await response.json();
-            renderNotifications(data);
+            nextNotificationsUrl = data.next;
+            renderNotifications(data.results, appending);
         } else {
             console.error('Failed to load notifications');
             showNotification('Failed to load notifications', 'error');
@@ -25,25 +31,31 @@ async function loadNotifications() {
     }
 }
 
+// load the next page of notifications
+function loadMoreNotifications() {
+    loadNotifications(true);
+}
+
 // render notifications in the container
-function renderNotifications(notifications) {
+function renderNotifications(notifications, append = false) {
     const container = document.getElementById('notifications-container');
     if (!container) return;
 
-    if (notifications.length === 0) {
+    const loadMore = container.querySelector('.load-more-notifications');
+    if (loadMore) loadMore.remove();
+
+    if (!append && notifications.length === 0) {
         container.innerHTML = '<div class="no-notifications">No notifications at this time.</div>';
         return;
     }
 
-    let html = '';
+    const page = document.createElement('div');
     notifications.forEach(notification => {
-        html += createNotificationHTML(notification);
+        page.insertAdjacentHTML('beforeend', createNotificationHTML(notification));
     });
     
-    container.innerHTML = html;
-    
-    // add event listeners for payment detail buttons
-    const paymentButtons = document.querySelectorAll('.view-payment-details');
+    // add event listeners for payment detail buttons on this page only
+    const paymentButtons = page.querySelectorAll('.view-payment-details');
     console.log('Found payment detail buttons:', paymentButtons.length);
     
     paymentButtons.forEach(button => {
@@ -59,6 +71,17 @@ function renderNotifications(notifications) {
             viewPaymentDetails(studentName, studentId, `PKR ${amount}`, paymentMethod, description);
         });
     });
+
+    if (!append) container.innerHTML = '';
+    container.append(...page.children);
+
+    if (nextNotificationsUrl) {
+        container.insertAdjacentHTML('beforeend', `
+            <div class="load-more-notifications">
+                <button class="btn btn-secondary" onclick="loadMoreNotifications()">Load more</button>
+            </div>
+        `);
+    }
 }
 
 // create HTML for individual notification
@@ -483,6 +506,18 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
-    // refresh notifications every 30 seconds
-    setInterval(loadNotifications, 30000);
+    // refresh notifications only when the server reports a change
+    subscribeToNotificationEvents();
 });
+
+// listen for new notifications and counter changes pushed by the server, falling back to polling
+function subscribeToNotificationEvents() {
+    if (!window.EventSource) {
+        setInterval(() => loadNotifications(), 30000);
+        return;
+    }
+
+    const events = new EventSource('/api/events/', { withCredentials: true });
+    events.addEventListener('counters', () => loadNotifications());
+    events.addEventListener('notification', () => loadNotifications());
+}
@@ -5,6 +5,10 @@ let attendanceData = [];
 let penalties = [];
 let selectedDate = new Date().toISOString().split('T')[0];
 
+// offline marking: the queue for each date is kept in localStorage and refreshed with delta syncs
+const SYNC_CACHE_PREFIX = 'attendance-sync:';
+const PENDING_MARKS_KEY = 'attendance-sync-pending';
+
 // ensure arrays are always arrays
 if (!Array.isArray(students)) students = [];
 if (!Array.isArray(attendanceData)) attendanceData = [];
@@ -14,7 +18,6 @@ if (!Array.isArray(penalties)) penalties = [];
 document.addEventListener('DOMContentLoaded', async function() {
 
     // load data in sequence
-    await loadStudents();
     await loadPenalties();
     setupEventListeners();
     
@@ -36,71 +39,125 @@ function setupEventListeners() {
     
     // add student form
     document.getElementById('add-student-form').addEventListener('submit', addNewStudent);
+
+    // upload marks saved while offline once the connection is back
+    window.addEventListener('online', flushPendingMarks);
 }
 
-// load students assigned rooms by admin
-async function loadStudents() {
+// load the marking queue for a date, fetching only what changed since the last sync
+async function loadAttendanceForDate(date) {
+    const cache = readSyncCache(date);
     try {
-        const response = await fetch('/api/students/?has_room=true');
-        if (response.ok) {
-            const data = await response.json();
-            console.log('Raw students data:', data);
-            // Handle paginated response - check for results array
-            if (data.results && Array.isArray(data.results)) {
-                students = data.results;
-            } else if (Array.isArray(data)) {
-                students = data;
-            } else {
-                students = [];
-                console.error('Unexpected students data structure:', data);
-            }
-            console.log('Loaded students:', students.length);
-            if (students.length > 0) {
-                console.log('Sample student:', students[0]);
-            }
-        } else {
-            console.error('Failed to load students, status:', response.status);
-            showNotification('Failed to load students', 'error');
-            students = [];
+        let data = await fetchAttendanceChanges(date, cache.token);
+        mergeAttendanceChanges(cache, data);
+
+        // rows deleted on the server never show up in a delta, so start over when the counts disagree
+        if (!data.full && !syncCountsMatch(cache, data.counts)) {
+            console.log('Attendance sync counts differ, running a full sync');
+            data = await fetchAttendanceChanges(date, null);
+            mergeAttendanceChanges(cache, data);
         }
+        cache.token = data.token;
+        writeSyncCache(date, cache);
     } catch (error) {
-        console.error('Error loading students:', error);
-        showNotification('Error loading students', 'error');
-        students = [];
+        console.error('Error syncing attendance:', error);
+        if (!cache.token) {
+            showNotification('Error loading attendance', 'error');
+        } else {
+            showNotification('Offline: showing attendance from the last sync', 'warning');
+        }
     }
+
+    students = Object.values(cache.students)
+        .filter(student => student.room_number)
+        .sort((a, b) => a.student_id.localeCompare(b.student_id))
+        .map(student => ({ id: student.student, student_id: student.student_id, name: student.student_name }));
+    attendanceData = applyPendingMarks(date, Object.values(cache.attendance));
+    console.log('Loaded students:', students.length, 'attendance records:', attendanceData.length);
+    renderAttendanceTable();
 }
 
-// load attendance for specific date
-async function loadAttendanceForDate(date) {
-    try {
-        const response = await fetch(`/api/attendance/?date=${date}`);
-        if (response.ok) {
-            const data = await response.json();
-            console.log('Raw attendance data:', data);
+async function fetchAttendanceChanges(date, token) {
+    const params = new URLSearchParams({ date: date });
+    if (token) params.set('token', token);
+    const response = await fetch(`/api/attendance/sync/?${params}`);
+    if (!response.ok) {
+        throw new Error(`Attendance sync failed with status ${response.status}`);
+    }
+    return response.json();
+}
 
-            // handle paginated response - check for results array
-            if (data.results && Array.isArray(data.results)) {
-                attendanceData = data.results;
-            } else if (Array.isArray(data)) {
-                attendanceData = data;
-            } else {
-                attendanceData = [];
-                console.error('Unexpected attendance data structure:', data);
-            }
-            console.log('Loaded attendance records:', attendanceData.length);
-            renderAttendanceTable();
+// apply a sync response to the cached queue
+function mergeAttendanceChanges(cache, data) {
+    if (data.full) {
+        cache.students = {};
+        cache.attendance = {};
+    }
+    data.students.forEach(student => {
+        if (student.is_active) {
+            cache.students[student.student] = student;
         } else {
-            console.error('Failed to load attendance, status:', response.status);
-            showNotification('Failed to load attendance', 'error');
-            attendanceData = [];
+            // students who left the queue are sent once so they can be dropped
+            delete cache.students[student.student];
+            delete cache.attendance[student.student];
+        }
+    });
+    data.attendance.forEach(attendance => {
+        if (cache.students[attendance.student]) {
+            cache.attendance[attendance.student] = attendance;
         }
+    });
+}
+
+function syncCountsMatch(cache, counts) {
+    return Object.keys(cache.students).length === counts.students &&
+        Object.keys(cache.attendance).length === counts.attendance;
+}
+
+function readSyncCache(date) {
+    try {
+        const cache = JSON.parse(localStorage.getItem(SYNC_CACHE_PREFIX + date));
+        if (cache && cache.students && cache.attendance) return cache;
     } catch (error) {
-        console.error('Error loading attendance:', error);
-        showNotification('Error loading attendance', 'error');
-        attendanceData = [];
+        console.error('Error reading attendance cache:', error);
+    }
+    return { token: null, students: {}, attendance: {} };
+}
+
+function writeSyncCache(date, cache) {
+    try {
+        localStorage.setItem(SYNC_CACHE_PREFIX + date, JSON.stringify(cache));
+    } catch (error) {
+        console.error('Error writing attendance cache:', error);
     }
 }
 
+function readPendingMarks() {
+    try {
+        return JSON.parse(localStorage.getItem(PENDING_MARKS_KEY)) || [];
+    } catch (error) {
+        return [];
+    }
+}
+
+function writePendingMarks(marks) {
+    localStorage.setItem(PENDING_MARKS_KEY, JSON.stringify(marks));
+}
+
+// show marks that are still waiting to be uploaded over the synced ones
+function applyPendingMarks(date, attendance) {
+    const byStudent = {};
+    attendance.forEach(record => { byStudent[record.student] = record; });
+    readPendingMarks().filter(mark => mark.date === date).forEach(mark => {
+        byStudent[mark.student] = {
+            ...byStudent[mark.student],
+            ...mark,
+            summary: calculateSummary(mark.morning_shift, mark.evening_shift, mark.night_shift)
+        };
+    });
+    return Object.values(byStudent);
+}
+
 // load penalties
 async function loadPenalties() {
     try {
@@ -359,43 +416,64 @@ async function removeNightPenalty(studentId) {
     }
 }
 
-// save attendance data
+// save attendance data: marks are queued locally and uploaded when the connection allows
 async function saveAttendance() {
-    const attendanceRows = document.querySelectorAll('#attendance-tbody tr');
-    const attendanceData = [];
+    const attendanceRows = document.querySelectorAll('#attendance-tbody tr[data-student-id]');
+    const cache = readSyncCache(selectedDate);
+    // a newer save of a queued row replaces it but keeps the version it was based on
+    const queuedVersions = {};
+    const pending = readPendingMarks().filter(mark => {
+        if (mark.date !== selectedDate) return true;
+        queuedVersions[mark.student] = mark.base_version;
+        return false;
+    });
 
     attendanceRows.forEach(row => {
         const studentId = parseInt(row.dataset.studentId);
-        const morningShift = row.querySelector('.morning-shift').value;
-        const eveningShift = row.querySelector('.evening-shift').value;
-        const nightShift = row.querySelector('.night-shift').value;
-        const remarks = row.querySelector('.remarks').value;
+        const synced = cache.attendance[studentId];
+        const baseVersion = studentId in queuedVersions ? queuedVersions[studentId] : (synced ? synced.version : null);
 
-        attendanceData.push({
+        pending.push({
             student: studentId,
-            morning_shift: morningShift,
-            evening_shift: eveningShift,
-            night_shift: nightShift,
-            remarks: remarks
+            date: selectedDate,
+            morning_shift: row.querySelector('.morning-shift').value,
+            evening_shift: row.querySelector('.evening-shift').value,
+            night_shift: row.querySelector('.night-shift').value,
+            remarks: row.querySelector('.remarks').value,
+            base_version: baseVersion
         });
     });
+    writePendingMarks(pending);
+
+    if (!navigator.onLine) {
+        showNotification('Offline: attendance saved on this device and will upload when you reconnect', 'warning');
+        return;
+    }
+    await flushPendingMarks();
+}
+
+// upload queued marks, reporting rows someone else changed since they were loaded
+async function flushPendingMarks(event, force = false) {
+    const marks = readPendingMarks();
+    if (marks.length === 0) return;
 
     try {
-        const response = await fetch('/api/attendance/bulk_mark_attendance/', {
+        const response = await fetch('/api/attendance/sync/', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCSRFToken()
             },
-            body: JSON.stringify({
-                date: selectedDate,
-                attendances: attendanceData
-            })
+            body: JSON.stringify({ marks: marks, force: force })
         });
 
         if (response.ok) {
             const result = await response.json();
-            showNotification(result.message, 'success');
+            writePendingMarks([]);
+            showNotification(`Attendance saved. Updated: ${result.applied}`, 'success');
+            if (result.conflicts.length > 0) {
+                showSyncConflicts(result.conflicts);
+            }
             loadAttendanceForDate(selectedDate);
             loadPenalties();
         } else {
@@ -404,10 +482,38 @@ async function saveAttendance() {
         }
     } catch (error) {
         console.error('Error saving attendance:', error);
-        showNotification('Error saving attendance', 'error');
+        showNotification('Offline: attendance saved on this device and will upload when you reconnect', 'warning');
     }
 }
 
+// list marks that were not applied because the row changed on the server, with an option to overwrite
+function showSyncConflicts(conflicts) {
+    const names = conflicts.map(conflict => {
+        const student = students.find(s => s.id === conflict.student);
+        const server = conflict.server;
+        return `${student ? student.student_id : conflict.student} (${conflict.date}): now ` +
+            `${server.morning_shift}/${server.evening_shift}/${server.night_shift}`;
+    });
+    showNotification(
+        `${conflicts.length} record(s) were changed by someone else and were not saved:<br>${names.join('<br>')}` +
+        '<br><button type="button" class="btn btn-sm btn-warning mt-2" onclick="overwriteConflicts()">Overwrite with my marks</button>',
+        'warning'
+    );
+    window.attendanceConflicts = conflicts;
+}
+
+async function overwriteConflicts() {
+    const conflicts = window.attendanceConflicts || [];
+    writePendingMarks(conflicts.map(conflict => ({
+        student: conflict.student,
+        date: conflict.date,
+        ...conflict.client,
+        base_version: conflict.server.version
+    })));
+    window.attendanceConflicts = [];
+    await flushPendingMarks(null, true);
+}
+
 // add new student to attendance table
 async function addNewStudent(event) {
     event.preventDefault();
@@ -471,9 +577,8 @@ async function addNewStudent(event) {
             // clear form
             document.getElementById('add-student-form').reset();
             
-            // reload students and attendance
-            await loadStudents();
-            renderAttendanceTable();
+            // reload the marking queue
+            await loadAttendanceForDate(selectedDate);
         } else {
             showNotification('Failed to create student profile', 'error');
         }
@@ -58,8 +58,8 @@ document.addEventListener("DOMContentLoaded", () => {
   // initial update
   updateDashboard();
 
-  // auto refresh every minute
-  setInterval(updateDashboard, 60 * 1000);
+  // refresh when another tab changes the stored data instead of polling
+  window.addEventListener("storage", updateDashboard);
 
   
   // 4. card click handlers
@@ -36,7 +36,8 @@ document.addEventListener('DOMContentLoaded', function() {
             });
             
             if (response.ok) {
-                currentRooms = await response.json();
+                const data = await response.json();
+                currentRooms = data.results || data;
                 renderRooms(currentRooms);
             } else {
                 console.error('Failed to load rooms');
@@ -11,7 +11,8 @@ async function loadNotifications() {
     try {
         const response = await fetch('/api/notifications/');
         if (response.ok) {
-            notifications = await response.json();
+            const data = await response.json();
+            notifications = data.results || data;
             renderNotifications();
         } else {
             showNotification('Failed to load notifications', 'error');
@@ -18,6 +18,28 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // fetch every page of a paginated list, following the next links
+    async function fetchAllPages(url, errorMessage) {
+        const items = [];
+        while (url) {
+            const response = await fetch(url, {
+                credentials: 'include'
+            });
+            
+            if (!response.ok) {
+                throw new Error(errorMessage);
+            }
+            
+            const data = await response.json();
+            if (Array.isArray(data)) {
+                return items.concat(data);
+            }
+            items.push(...data.results);
+            url = data.next;
+        }
+        return items;
+    }
+    
     // load student data
     async function loadStudentData() {
         try {
@@ -39,20 +61,9 @@ document.addEventListener('DOMContentLoaded', function() {
     //load attendance records from API
     async function loadAttendanceRecords() {
         try {
-            const response = await fetch('/api/attendance/', {
-                credentials: 'include'
-            });
-            
-            if (!response.ok) {
-                throw new Error('Failed to load attendance records');
-            }
-            
-            const allRecords = await response.json();
-            
-            // filter records for current student
-            attendanceRecords = allRecords.filter(record => 
-                record.student == studentData.id
-            );
+            const url = '/api/attendance/?student_id=' + encodeURIComponent(studentData.student_id);
+            // the API only returns the current student's own records
+            attendanceRecords = await fetchAllPages(url, 'Failed to load attendance records');
         } catch (error) {
             console.error('Error loading attendance records:', error);
             throw error;
@@ -40,23 +40,33 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    // load existing complaints
-    async function loadComplaints() {
-        try {
-            const response = await fetch('/api/complaints/', {
+    // fetch every page of a paginated list, following the next links
+    async function fetchAllPages(url, errorMessage) {
+        const items = [];
+        while (url) {
+            const response = await fetch(url, {
                 credentials: 'include'
             });
             
             if (!response.ok) {
-                throw new Error('Failed to load complaints');
+                throw new Error(errorMessage);
             }
             
-            const allComplaints = await response.json();
-            
-            // filter complaints for current student
-            complaints = allComplaints.filter(complaint => 
-                complaint.student == studentData.id
-            );
+            const data = await response.json();
+            if (Array.isArray(data)) {
+                return items.concat(data);
+            }
+            items.push(...data.results);
+            url = data.next;
+        }
+        return items;
+    }
+    
+    // load existing complaints
+    async function loadComplaints() {
+        try {
+            // the API only returns the current student's own complaints
+            complaints = await fetchAllPages('/api/complaints/', 'Failed to load complaints');
             
             renderComplaints();
         } catch (error) {
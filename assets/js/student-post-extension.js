@@ -40,23 +40,33 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    // load existing extension requests
-    async function loadExtensionRequests() {
-        try {
-            const response = await fetch('/api/stay-extension-requests/', {
+    // fetch every page of a paginated list, following the next links
+    async function fetchAllPages(url, errorMessage) {
+        const items = [];
+        while (url) {
+            const response = await fetch(url, {
                 credentials: 'include'
             });
             
             if (!response.ok) {
-                throw new Error('Failed to load extension requests');
+                throw new Error(errorMessage);
             }
             
-            const allRequests = await response.json();
-            
-            // filter requests for current student
-            extensionRequests = allRequests.filter(request => 
-                request.student == studentData.id
-            );
+            const data = await response.json();
+            if (Array.isArray(data)) {
+                return items.concat(data);
+            }
+            items.push(...data.results);
+            url = data.next;
+        }
+        return items;
+    }
+    
+    // load existing extension requests
+    async function loadExtensionRequests() {
+        try {
+            // the API only returns the current student's own requests
+            extensionRequests = await fetchAllPages('/api/stay-extension-requests/', 'Failed to load extension requests');
             
             renderExtensionRequests();
         } catch (error) {
@@ -27,7 +27,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error('Failed to load notifications');
             }
             
-            notifications = await response.json();
+            const data = await response.json();
+            notifications = data.results || data;
         } catch (error) {
             console.error('Error loading notifications:', error);
             throw error;
@@ -3,7 +3,7 @@ from django.contrib.auth.admin import UserAdmin
 from .models import (
     User, Student, Room, Payment, Attendance, Penalty, Meal, 
     MealFeedback, Complaint, StayExtensionRequest, Notification, 
-    Staff, FoodShortage
+    Staff, FoodShortage, DashboardCounter
 )
 
 
@@ -259,3 +259,12 @@ class FoodShortageAdmin(admin.ModelAdmin):
         }),
     )
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(DashboardCounter)
+class DashboardCounterAdmin(admin.ModelAdmin):
+    """Admin for DashboardCounter model"""
+    list_display = ['name', 'value', 'updated_at']
+    search_fields = ['name']
+    ordering = ['name']
+    readonly_fields = ['updated_at']
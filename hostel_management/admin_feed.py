@@ -0,0 +1,151 @@
+"""
+Admin notification feed.
+The feed interleaves pending payments, pending food shortages and students who have not
+applied for a room, newest first. Each source is read in index order from just after the
+cursor and never more than one page of it, and the sources are combined with a lazy k-way
+merge, so every page costs three bounded queries however long the feed grows.
+"""
+
+import base64
+import heapq
+import json
+from datetime import timedelta
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import FoodShortage, Payment, Student
+
+INACTIVE_AFTER = timedelta(days=7)
+
+
+class InvalidFeedCursor(ValueError):
+    """Raised for a feed cursor that cannot be decoded"""
+
+
+class FeedSource:
+    """One kind of feed item: the rows it comes from, ordered by (timestamp, id), and how each is shown.
+    A source's rank is its position in FEED_SOURCES."""
+
+    def __init__(self, rank, queryset, timestamp, serialize):
+        # Breaks ties between sources at the same timestamp so the merged order is total
+        self.rank = rank
+        self.queryset = queryset
+        self.timestamp = timestamp
+        self.serialize = serialize
+
+    def rows(self, position, limit):
+        """Up to limit (timestamp, rank, id, row) tuples that come after position in the feed"""
+        queryset = self.queryset().order_by(f'-{self.timestamp}', '-id')
+        if position is not None:
+            queryset = queryset.filter(self._after(*position))
+        path = self.timestamp.split('__')
+        for row in queryset[:limit]:
+            value = row
+            for name in path:
+                value = getattr(value, name)
+            yield value, self.rank, row.id, row
+
+    def _after(self, timestamp, rank, row_id):
+        """Rows whose (timestamp, rank, id) is below the cursor's"""
+        if self.rank < rank:
+            return Q(**{f'{self.timestamp}__lte': timestamp})
+        if self.rank > rank:
+            return Q(**{f'{self.timestamp}__lt': timestamp})
+        return Q(**{f'{self.timestamp}__lte': timestamp}) & (
+            Q(**{f'{self.timestamp}__lt': timestamp}) | Q(id__lt=row_id)
+        )
+
+
+def _payment_item(payment):
+    student_name = f'{payment.student.user.first_name} {payment.student.user.last_name}'
+    return {
+        'id': f'payment_{payment.id}',
+        'notification_type': 'payment',
+        'title': 'New Payment Receipt',
+        'message': f'Payment received from {student_name}',
+        'student_name': student_name,
+        'student_id': payment.student.student_id,
+        'amount': payment.amount,
+        'payment_method': payment.payment_method,
+        'description': payment.description,
+        'status': payment.status,
+        'created_at': payment.created_at.isoformat()
+    }
+
+
+def _shortage_item(shortage):
+    return {
+        'id': f'shortage_{shortage.id}',
+        'notification_type': 'food_shortage',
+        'title': 'Food Shortage Alert',
+        'message': f'Food shortage reported for {shortage.meal.meal_type} on {shortage.meal.date}: {shortage.description}',
+        'created_at': shortage.created_at.isoformat()
+    }
+
+
+def _inactive_student_item(student):
+    student_name = f'{student.user.first_name} {student.user.last_name}'
+    return {
+        'id': f'inactive_{student.id}',
+        'notification_type': 'inactive_student',
+        'title': 'Inactive Student',
+        'message': f'Student {student_name} has not applied for room after 7 days of login',
+        'student_name': student_name,
+        'student_id': student.student_id,
+        'created_at': student.user.date_joined.isoformat()
+    }
+
+
+FEED_SOURCES = [
+    FeedSource(
+        0,
+        lambda: Payment.objects.filter(status='pending').select_related('student__user'),
+        'created_at', _payment_item,
+    ),
+    FeedSource(
+        1,
+        lambda: FoodShortage.objects.filter(status='pending').select_related('meal'),
+        'created_at', _shortage_item,
+    ),
+    FeedSource(
+        2,
+        lambda: Student.objects.filter(
+            is_active=True, room__isnull=True, user__date_joined__lt=timezone.now() - INACTIVE_AFTER
+        ).select_related('user'),
+        'user__date_joined', _inactive_student_item,
+    ),
+]
+
+
+def get_admin_feed(position=None, page_size=50):
+    """
+    One page of the admin feed after position (None for the first page).
+    Returns (items, position of the last item or None if it is the last page).
+    """
+    streams = [source.rows(position, page_size + 1) for source in FEED_SOURCES]
+    merged = list(islice(heapq.merge(*streams, key=lambda item: item[:3], reverse=True), page_size + 1))
+    page = merged[:page_size]
+    items = [FEED_SOURCES[rank].serialize(row) for _, rank, _, row in page]
+    next_position = page[-1][:3] if len(merged) > page_size else None
+    return items, next_position
+
+
+def encode_feed_cursor(position):
+    timestamp, rank, row_id = position
+    payload = json.dumps([timestamp.isoformat(), rank, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_feed_cursor(cursor):
+    """(timestamp, rank, id) from a feed cursor"""
+    try:
+        timestamp, rank, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None or not 0 <= rank < len(FEED_SOURCES):
+            raise ValueError
+        return timestamp, int(rank), int(row_id)
+    except Exception:
+        raise InvalidFeedCursor('Invalid cursor')
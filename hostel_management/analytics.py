@@ -0,0 +1,187 @@
+"""
+Hostel-wide attendance analytics computed with NumPy.
+Attendance for a date range is read from the packed monthly store into a
+students x days array of day codes, and every statistic is a vectorized reduction over it.
+"""
+
+from calendar import monthrange
+from datetime import timedelta
+
+import numpy as np
+
+from .attendance_months import DECODED_DAYS, SHIFTS, months_between
+from .models import AttendanceMonth, Student
+from .report_cache import cached_report
+
+# Lookup tables from a day code to (morning, evening, night, summary), each 0 for not marked or 1 + the SHIFTS index
+DAY_CODE_PARTS = np.array(
+    [(0, 0, 0, 0)] + [tuple(SHIFTS.index(part) + 1 for part in parts) for parts in DECODED_DAYS[1:]],
+    dtype=np.uint8,
+)
+STATUSES = len(SHIFTS) + 1
+ABSENT = SHIFTS.index('Absent') + 1
+PRESENT = SHIFTS.index('Present') + 1
+SHIFT_NAMES = ['morning_shift', 'evening_shift', 'night_shift']
+TOP_PATTERNS = 10
+
+
+def load_day_codes(start_date, end_date):
+    """(student ids, students x days uint16 day codes) for every student with attendance in the range"""
+    n_days = (end_date - start_date).days + 1
+    blocks = []
+    for month in months_between(start_date, end_date):
+        rows = list(AttendanceMonth.objects.filter(month=month).values_list('student_id', 'days'))
+        if not rows:
+            continue
+        width = 2 * monthrange(month.year, month.month)[1]
+        # Each month is read as one students x days block instead of one array per blob
+        packed = b''.join(bytes(blob).ljust(width, b'\0') for _, blob in rows)
+        block = np.frombuffer(packed, dtype='<u2').reshape(len(rows), width // 2)
+        blocks.append((month, np.fromiter((student_id for student_id, _ in rows), np.int64, len(rows)), block))
+
+    student_ids = np.unique(np.concatenate([ids for _, ids, _ in blocks])) if blocks else np.empty(0, np.int64)
+    codes = np.zeros((len(student_ids), n_days), dtype=np.uint16)
+    for month, ids, block in blocks:
+        offset = (month - start_date).days
+        first = max(0, -offset)
+        last = min(block.shape[1], n_days - offset)
+        codes[np.searchsorted(student_ids, ids), offset + first:offset + last] = block[:, first:last]
+    return student_ids, codes
+
+
+def count_by_row(values, minlength=STATUSES):
+    """Count each value per row of a 2-D array in one bincount: rows x minlength"""
+    rows = values.shape[0]
+    offsets = (np.arange(rows, dtype=np.int64) * minlength)[:, None]
+    return np.bincount((values + offsets).ravel(), minlength=rows * minlength).reshape(rows, minlength)
+
+
+def count_by_group(labels, counts):
+    """Sum per-student status counts into groups; returns (group labels, groups x STATUSES, students per group)"""
+    groups, inverse = np.unique(labels, return_inverse=True)
+    totals = np.stack(
+        [np.bincount(inverse, weights=counts[:, k], minlength=len(groups)) for k in range(counts.shape[1])],
+        axis=1,
+    ).astype(np.int64)
+    return groups, totals, np.bincount(inverse, minlength=len(groups))
+
+
+def absence_streaks(summary):
+    """(longest, current) run of consecutive Absent days for each student"""
+    absent = (summary == ABSENT).astype(np.int32)
+    running = np.cumsum(absent, axis=1)
+    # Subtract the running total as it stood at the last non-absent day, leaving the length of the current run
+    runs = running - np.maximum.accumulate(np.where(absent == 0, running, 0), axis=1)
+    if not runs.shape[1]:
+        return np.zeros(len(runs), dtype=np.int32), np.zeros(len(runs), dtype=np.int32)
+    return runs.max(axis=1), runs[:, -1]
+
+
+def summarize_counts(counts):
+    """Status counts (one row of a STATUSES wide array) as a response dict with the attendance percentage"""
+    return summarize_rows(np.asarray(counts)[None, :])[0]
+
+
+def summarize_rows(counts):
+    """summarize_counts for every row of a rows x STATUSES array"""
+    marked = counts[:, 1:].sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentages = counts[:, PRESENT] * 100.0 / marked
+    return [
+        {
+            **dict(zip(SHIFTS, row)),
+            'marked_days': marked_days,
+            'attendance_percentage': round(percentage, 2) if marked_days else None,
+        }
+        for row, marked_days, percentage in zip(counts[:, 1:].tolist(), marked.tolist(), percentages.tolist())
+    ]
+
+
+def shift_patterns(parts, marked):
+    """Status counts per shift and the most common (morning, evening, night) combinations on marked days"""
+    breakdown = {
+        name: summarize_counts(np.bincount(parts[..., i].ravel(), minlength=STATUSES))
+        for i, name in enumerate(SHIFT_NAMES)
+    }
+    for shift_counts in breakdown.values():
+        del shift_counts['attendance_percentage']
+
+    combined = (parts[..., 0].astype(np.int32) * STATUSES + parts[..., 1]) * STATUSES + parts[..., 2]
+    pattern_counts = np.bincount(combined[marked], minlength=STATUSES ** 3)
+    top = np.argsort(pattern_counts)[::-1][:TOP_PATTERNS]
+    breakdown['top_patterns'] = [
+        {
+            'morning_shift': SHIFTS[code // STATUSES ** 2 - 1],
+            'evening_shift': SHIFTS[code // STATUSES % STATUSES - 1],
+            'night_shift': SHIFTS[code % STATUSES - 1],
+            'days': int(pattern_counts[code]),
+        }
+        for code in top.tolist() if pattern_counts[code]
+    ]
+    return breakdown
+
+
+@cached_report('attendance_months', 'students', 'rooms')
+def get_attendance_analytics(start_date, end_date):
+    """Per-student, per-floor, per-department and per-day attendance statistics for a date range"""
+    student_ids, codes = load_day_codes(start_date, end_date)
+    parts = DAY_CODE_PARTS[codes]
+    summary = parts[..., 3]
+    marked = summary > 0
+
+    per_student_counts = count_by_row(summary)
+    per_day_counts = count_by_row(summary.T)
+    longest_streaks, current_streaks = absence_streaks(summary)
+
+    details = {
+        student_id: (code, department, floor)
+        for student_id, code, department, floor in Student.objects.values_list(
+            'id', 'student_id', 'department', 'room__floor'
+        )
+    }
+    student_details = [details.get(student_id, (None, None, None)) for student_id in student_ids.tolist()]
+    # -1 stands in for students without a room so the labels stay integers
+    floors = np.array([floor if floor is not None else -1 for _, _, floor in student_details], dtype=np.int64)
+    departments = np.array([department or '' for _, department, _ in student_details], dtype=object)
+
+    per_student = [
+        {
+            'student': student_id,
+            'student_id': code,
+            'department': department,
+            'floor': floor,
+            **student_summary,
+            'longest_absence_streak': longest,
+            'current_absence_streak': current,
+        }
+        for student_id, (code, department, floor), student_summary, longest, current in zip(
+            student_ids.tolist(), student_details, summarize_rows(per_student_counts),
+            longest_streaks.tolist(), current_streaks.tolist(),
+        )
+    ]
+
+    per_floor = []
+    for floor, counts, students in zip(*count_by_group(floors, per_student_counts)):
+        per_floor.append({'floor': int(floor) if floor >= 0 else None, 'students': int(students), **summarize_counts(counts)})
+
+    per_department = []
+    for department, counts, students in zip(*count_by_group(departments.astype(str), per_student_counts)):
+        per_department.append({'department': department or None, 'students': int(students), **summarize_counts(counts)})
+
+    per_day = [
+        {'date': start_date + timedelta(days=offset), **day_summary}
+        for offset, day_summary in enumerate(summarize_rows(per_day_counts))
+    ]
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'students': len(student_ids),
+        'days': codes.shape[1],
+        'overall': summarize_counts(per_student_counts.sum(axis=0)),
+        'per_student': per_student,
+        'per_floor': per_floor,
+        'per_department': per_department,
+        'per_day': per_day,
+        'shift_patterns': shift_patterns(parts, marked),
+    }
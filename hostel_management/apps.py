@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class HostelManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hostel_management'
+
+    def ready(self):
+        # Importing the reports registers the tables they read for invalidation
+        from . import dashboard_queries
+        from .signals import (
+            connect_counter_signals, connect_report_cache_signals, connect_rollup_signals, connect_unread_signals
+        )
+        connect_counter_signals()
+        connect_report_cache_signals()
+        connect_rollup_signals()
+        connect_unread_signals()
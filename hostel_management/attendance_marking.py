@@ -0,0 +1,75 @@
+"""
+Set-based attendance marking.
+A day's batch is checked against one student lookup and written with a single upsert
+inside one transaction. Bulk writes send no model signals, so the attendance rollup,
+the packed monthly attendance, the report cache and the night-shift penalties are
+brought up to date for the batch here.
+"""
+
+from django.db import transaction
+
+from .attendance_months import attendance_day_change, write_attendance_days
+from .models import Student, Attendance, shift_summary
+from .penalties import reconcile_night_shift_penalties
+from .report_cache import bump_table_versions
+from .rollups import attendance_deltas, apply_attendance_deltas
+
+ATTENDANCE_TABLE = Attendance._meta.db_table
+# Re-marking a day rewrites the shifts but keeps who first marked it and when
+ATTENDANCE_UPSERT_FIELDS = ['morning_shift', 'evening_shift', 'night_shift', 'summary', 'remarks', 'updated_at']
+
+
+def build_attendance_rows(day, entries, marked_by):
+    """Turn submitted entries into unsaved Attendance rows keyed by student id; later entries win"""
+    rows = {}
+    for entry in entries:
+        morning = entry.get('morning_shift', 'Null')
+        evening = entry.get('evening_shift', 'Null')
+        night = entry.get('night_shift', 'Null')
+        # Apply shift logic: if morning & evening are present, night should be null
+        if morning == 'Present' and evening == 'Present':
+            night = 'Null'
+        student_id = int(entry['student'])
+        rows[student_id] = Attendance(
+            student_id=student_id,
+            date=day,
+            marked_by=marked_by,
+            remarks=entry.get('remarks', ''),
+            morning_shift=morning,
+            evening_shift=evening,
+            night_shift=night,
+            summary=shift_summary(morning, evening),
+        )
+    return rows
+
+
+def mark_attendance(day, entries, marked_by):
+    """Write a day's attendance for a batch of students, returning (created, updated)"""
+    rows = build_attendance_rows(day, entries, marked_by)
+    # Unknown students are skipped, as they were when each one was looked up on its own
+    known = set(Student.objects.filter(id__in=rows).values_list('id', flat=True))
+    rows = {student_id: row for student_id, row in rows.items() if student_id in known}
+    if not rows:
+        return 0, 0
+
+    with transaction.atomic():
+        previous = dict(
+            Attendance.objects.filter(date=day, student_id__in=rows).values_list('student_id', 'summary')
+        )
+        Attendance.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['student', 'date'],
+            update_fields=ATTENDANCE_UPSERT_FIELDS,
+        )
+        apply_attendance_deltas(attendance_deltas(
+            ((day, previous[student_id]) if student_id in previous else None, (day, row.summary))
+            for student_id, row in rows.items()
+        ))
+        write_attendance_days(attendance_day_change(row) for row in rows.values())
+        reconcile_night_shift_penalties(
+            ((student_id, day, row.night_shift) for student_id, row in rows.items()), marked_by
+        )
+        transaction.on_commit(lambda: bump_table_versions(ATTENDANCE_TABLE))
+
+    return len(rows) - len(previous), len(previous)
@@ -0,0 +1,214 @@
+"""
+Packed monthly attendance.
+Each (student, month) is stored as one small blob holding a 16-bit code per day that encodes
+the morning, evening and night shifts and the summary, so calendars and attendance
+percentages read one row per student per month instead of one row per day.
+The blobs are kept in step with the attendances table by signals and by bulk marking.
+"""
+
+import sys
+from array import array
+from calendar import monthrange
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import Attendance, AttendanceMonth
+from .report_cache import bump_table_versions
+
+SHIFTS = [value for value, _ in Attendance.SHIFT_CHOICES]
+SHIFT_INDEX = {shift: i for i, shift in enumerate(SHIFTS)}
+NULL_INDEX = SHIFT_INDEX['Null']
+# Day codes are 1 + the base-5 number (morning, evening, night, summary); 0 means not marked
+DAY_CODES = 1 + len(SHIFTS) ** 4
+DECODED_DAYS = [None] + [
+    (SHIFTS[code // 125], SHIFTS[code // 25 % 5], SHIFTS[code // 5 % 5], SHIFTS[code % 5])
+    for code in range(DAY_CODES - 1)
+]
+SUMMARY_OF_CODE = [None] + [SHIFTS[code % 5] for code in range(DAY_CODES - 1)]
+MONTH_BATCH_SIZE = 500
+ATTENDANCE_MONTH_TABLE = AttendanceMonth._meta.db_table
+
+
+def encode_day(morning, evening, night, summary):
+    """Day code for four shift values; legacy values outside SHIFT_CHOICES are stored as 'Null'"""
+    morning, evening, night, summary = (
+        SHIFT_INDEX.get(shift, NULL_INDEX) for shift in (morning, evening, night, summary)
+    )
+    return 1 + ((morning * 5 + evening) * 5 + night) * 5 + summary
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def unpack_days(blob, month):
+    """Day codes of a month's blob, one per day of the month"""
+    codes = array('H')
+    if blob:
+        codes.frombytes(bytes(blob))
+        if sys.byteorder == 'big':
+            codes.byteswap()
+    days_in_month = monthrange(month.year, month.month)[1]
+    if len(codes) < days_in_month:
+        codes.extend([0] * (days_in_month - len(codes)))
+    return codes
+
+
+def pack_days(codes):
+    if sys.byteorder == 'big':
+        codes = array('H', codes)
+        codes.byteswap()
+    return codes.tobytes()
+
+
+def write_attendance_days(changes):
+    """
+    Store day codes for (student id, date, code) changes, where a code of 0 clears the day.
+    All touched months are read in one query and written back with one upsert.
+    """
+    by_month = defaultdict(dict)
+    for student_id, day, code in changes:
+        by_month[(student_id, month_start(day))][day.day - 1] = code
+    if not by_month:
+        return
+
+    students = {student_id for student_id, _ in by_month}
+    months = {month for _, month in by_month}
+    with transaction.atomic():
+        existing = dict(
+            ((student_id, month), blob)
+            for student_id, month, blob in AttendanceMonth.objects.filter(
+                student_id__in=students, month__in=months
+            ).values_list('student_id', 'month', 'days')
+        )
+        packed = []
+        for (student_id, month), day_codes in by_month.items():
+            blob = existing.get((student_id, month))
+            if blob is None and not any(day_codes.values()):
+                # Nothing to clear, and the student may be in the middle of being deleted
+                continue
+            codes = unpack_days(blob, month)
+            for index, code in day_codes.items():
+                codes[index] = code
+            packed.append(AttendanceMonth(student_id=student_id, month=month, days=pack_days(codes)))
+        if packed:
+            AttendanceMonth.objects.bulk_create(
+                packed,
+                batch_size=MONTH_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['student', 'month'],
+                update_fields=['days'],
+            )
+            transaction.on_commit(lambda: bump_table_versions(ATTENDANCE_MONTH_TABLE))
+
+
+def rebuild_attendance_months(start_date=None, end_date=None):
+    """Repack the monthly blobs from the raw attendances table for whole months covering the range"""
+    attendance = Attendance.objects.order_by()
+    months = AttendanceMonth.objects.all()
+    if start_date:
+        start_date = month_start(start_date)
+        attendance = attendance.filter(date__gte=start_date)
+        months = months.filter(month__gte=start_date)
+    if end_date:
+        end_date = month_start(end_date)
+        attendance = attendance.filter(date__lt=_next_month(end_date))
+        months = months.filter(month__lte=end_date)
+
+    packed = {}
+    rows = attendance.values_list('student_id', 'date', 'morning_shift', 'evening_shift', 'night_shift', 'summary')
+    for student_id, day, morning, evening, night, summary in rows.iterator(chunk_size=5000):
+        key = (student_id, month_start(day))
+        codes = packed.get(key)
+        if codes is None:
+            codes = packed[key] = unpack_days(None, key[1])
+        codes[day.day - 1] = encode_day(morning, evening, night, summary)
+
+    with transaction.atomic():
+        months.delete()
+        AttendanceMonth.objects.bulk_create(
+            [AttendanceMonth(student_id=student_id, month=month, days=pack_days(codes))
+             for (student_id, month), codes in packed.items()],
+            batch_size=MONTH_BATCH_SIZE,
+        )
+        transaction.on_commit(lambda: bump_table_versions(ATTENDANCE_MONTH_TABLE))
+    return len(packed)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def months_between(start_date, end_date):
+    month = month_start(start_date)
+    while month <= end_date:
+        yield month
+        month = _next_month(month)
+
+
+def summarize_codes(code_counts):
+    """Turn {day code: days} into summary counts and an attendance percentage, or None if nothing was marked"""
+    summary = dict.fromkeys(SHIFTS, 0)
+    for code, count in code_counts.items():
+        if code:
+            summary[SUMMARY_OF_CODE[code]] += count
+    marked = sum(summary.values())
+    if not marked:
+        return None
+    summary['marked_days'] = marked
+    summary['attendance_percentage'] = round(summary['Present'] * 100.0 / marked, 2)
+    return summary
+
+
+def get_attendance_month(student_id, month):
+    """A student's month as a calendar of every day (None where not marked) plus its summary"""
+    month = month_start(month)
+    blob = AttendanceMonth.objects.filter(student_id=student_id, month=month).values_list('days', flat=True).first()
+    codes = unpack_days(blob, month)
+    days = []
+    for index, code in enumerate(codes):
+        shifts = DECODED_DAYS[code] or (None, None, None, None)
+        days.append({
+            'date': month + timedelta(days=index),
+            'morning_shift': shifts[0],
+            'evening_shift': shifts[1],
+            'night_shift': shifts[2],
+            'summary': shifts[3],
+        })
+    return {'days': days, 'summary': summarize_codes(Counter(codes))}
+
+
+def get_attendance_percentages(start_date, end_date, student_ids=None):
+    """
+    Summary counts and attendance percentage per student between two dates (inclusive),
+    as {student id: {'Present': n, ..., 'marked_days': n, 'attendance_percentage': pct}}
+    """
+    months = list(months_between(start_date, end_date))
+    rows = AttendanceMonth.objects.filter(month__in=months)
+    if student_ids is not None:
+        rows = rows.filter(student_id__in=student_ids)
+
+    per_student = defaultdict(Counter)
+    for student_id, month, blob in rows.values_list('student_id', 'month', 'days').iterator(chunk_size=2000):
+        codes = unpack_days(blob, month)
+        first = max((start_date - month).days, 0)
+        last = (end_date - month).days + 1
+        per_student[student_id].update(codes[first:last])
+
+    results = {}
+    for student_id, code_counts in per_student.items():
+        summary = summarize_codes(code_counts)
+        if summary is not None:
+            results[student_id] = summary
+    return results
+
+
+def attendance_day_change(attendance):
+    """(student id, date, code) that stores an attendance row in its month"""
+    return (
+        attendance.student_id,
+        attendance.date,
+        encode_day(attendance.morning_shift, attendance.evening_shift, attendance.night_shift, attendance.summary),
+    )
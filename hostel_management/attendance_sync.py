@@ -0,0 +1,122 @@
+"""
+Delta sync of the attendance marking queue for deputies marking offline.
+A client keeps the queue for a date (and optionally a floor) locally and asks only for what
+changed since its last change token; offline marks are uploaded in batches and applied
+unless the row changed on the server since the client last saw it.
+"""
+
+import base64
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .attendance_marking import build_attendance_rows, mark_attendance
+from .dashboard_queries import get_attendance_sync_rows, get_attendance_sync_counts, get_attendance_versions
+
+# Tokens are backdated so rows written by transactions that commit a little after the token was issued are sent again
+SYNC_TOKEN_OVERLAP = timedelta(seconds=5)
+STUDENT_FIELDS = ['student', 'student_id', 'student_name', 'department', 'room_number', 'floor', 'is_active']
+ATTENDANCE_FIELDS = ['morning_shift', 'evening_shift', 'night_shift', 'summary', 'remarks']
+MARK_FIELDS = ['morning_shift', 'evening_shift', 'night_shift', 'remarks']
+
+
+class InvalidSyncToken(ValueError):
+    """Raised for a change token that cannot be decoded"""
+
+
+def encode_sync_token(since, date_filter, floor):
+    payload = json.dumps({'t': str(since), 'd': date_filter.isoformat(), 'f': floor}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """(since, date iso string, floor) from a change token"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        since, token_date, floor = payload['t'], payload['d'], payload['f']
+    except Exception:
+        raise InvalidSyncToken('Invalid sync token')
+    # since goes into SQL as a parameter, so a well-formed token must not smuggle in other types
+    if not isinstance(since, str) or not isinstance(token_date, str) or \
+            not (floor is None or (isinstance(floor, int) and not isinstance(floor, bool))):
+        raise InvalidSyncToken('Invalid sync token')
+    return since, token_date, floor
+
+
+def row_version(value):
+    """The attendance row version sent to clients: its updated_at as the database returns it"""
+    return None if value is None else str(value)
+
+
+def get_attendance_changes(date_filter, token=None, floor=None):
+    """
+    The marking queue for a date as {'token', 'full', 'students', 'attendance', 'counts'}.
+    With a token issued for the same date and floor only changed rows are returned;
+    clients whose local counts differ from 'counts' after merging should sync again without a token.
+    """
+    since = None
+    if token:
+        since, token_date, token_floor = decode_sync_token(token)
+        if token_date != date_filter.isoformat() or token_floor != floor:
+            since = None
+
+    issued_at = connection.ops.adapt_datetimefield_value(timezone.now() - SYNC_TOKEN_OVERLAP)
+    rows = get_attendance_sync_rows(date_filter, since=since, floor=floor)
+    students, queue_attendance = get_attendance_sync_counts(date_filter, floor=floor)
+
+    return {
+        'token': encode_sync_token(issued_at, date_filter, floor),
+        'full': since is None,
+        'students': [{field: row[field] for field in STUDENT_FIELDS} for row in rows],
+        'attendance': [
+            {
+                'student': row['student'],
+                'date': date_filter,
+                **{field: row[field] for field in ATTENDANCE_FIELDS},
+                'version': row_version(row['version']),
+            }
+            for row in rows if row['version'] is not None
+        ],
+        'counts': {'students': students, 'attendance': queue_attendance},
+    }
+
+
+def apply_offline_marks(marks, marked_by, force=False):
+    """
+    Apply uploaded marks, each carrying the base_version of the row the client edited (None if it saw no row).
+    Marks whose row changed on the server since then are returned as conflicts instead of applied,
+    unless force is set or the server already holds the same values. Returns (applied, conflicts).
+    """
+    by_date = defaultdict(dict)
+    for mark in marks:
+        by_date[mark['date']][mark['student']] = mark
+
+    applied = 0
+    conflicts = []
+    with transaction.atomic():
+        for day, day_marks in sorted(by_date.items()):
+            current = get_attendance_versions(day, day_marks)
+            # Compare what would be stored, after the shift logic is applied
+            rows = build_attendance_rows(day, day_marks.values(), marked_by)
+            accepted = []
+            for student_id, mark in day_marks.items():
+                server = current.get(student_id)
+                row = rows[student_id]
+                client = [getattr(row, field) for field in MARK_FIELDS]
+                changed = server is not None and row_version(server[4]) != mark.get('base_version')
+                if changed and not force and list(server[:4]) != client:
+                    conflicts.append({
+                        'student': student_id,
+                        'date': day,
+                        'client': dict(zip(MARK_FIELDS, client)),
+                        'server': {**dict(zip(MARK_FIELDS, server[:4])), 'version': row_version(server[4])},
+                    })
+                else:
+                    accepted.append(mark)
+            if accepted:
+                created, updated = mark_attendance(day, accepted, marked_by)
+                applied += created + updated
+    return applied, conflicts
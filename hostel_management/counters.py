@@ -0,0 +1,164 @@
+"""
+Dashboard counters maintained incrementally from model signals.
+Each counter is defined by the model it watches, the fields it depends on,
+a predicate deciding whether an instance is counted, and the filter used to
+recount it from scratch.
+"""
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    Student, Room, Payment, MealFeedback, Complaint, StayExtensionRequest,
+    Staff, DashboardCounter
+)
+from .report_cache import bump_table_versions, shared_cache
+
+COUNTER_TABLE = DashboardCounter._meta.db_table
+
+
+class CounterDefinition:
+    """A single counter: which rows of a model it counts"""
+
+    def __init__(self, name, model, fields, predicate, condition):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.predicate = predicate
+        self.condition = condition
+
+    def matches(self, instance):
+        return bool(self.predicate(instance))
+
+    def recount(self):
+        return self.model.objects.filter(self.condition).count()
+
+
+COUNTERS = [
+    CounterDefinition(
+        'total_students', Student, ['is_active'],
+        lambda s: s.is_active,
+        Q(is_active=True),
+    ),
+    CounterDefinition(
+        'allocated_students', Student, ['is_active', 'room_id'],
+        lambda s: s.is_active and s.room_id is not None,
+        Q(is_active=True, room__isnull=False),
+    ),
+    CounterDefinition(
+        'total_rooms', Room, [],
+        lambda r: True,
+        Q(),
+    ),
+    CounterDefinition(
+        'available_rooms', Room, ['is_available'],
+        lambda r: r.is_available,
+        Q(is_available=True),
+    ),
+    CounterDefinition(
+        'occupied_rooms', Room, ['occupied'],
+        lambda r: r.occupied > 0,
+        Q(occupied__gt=0),
+    ),
+    CounterDefinition(
+        'pending_payments', Payment, ['status'],
+        lambda p: p.status == 'pending',
+        Q(status='pending'),
+    ),
+    CounterDefinition(
+        'pending_complaints', Complaint, ['status'],
+        lambda c: c.status == 'pending',
+        Q(status='pending'),
+    ),
+    CounterDefinition(
+        'open_complaints', Complaint, ['status'],
+        lambda c: c.status in ('pending', 'in_progress'),
+        Q(status__in=['pending', 'in_progress']),
+    ),
+    CounterDefinition(
+        'pending_extension_requests', StayExtensionRequest, ['status'],
+        lambda r: r.status == 'pending',
+        Q(status='pending'),
+    ),
+    CounterDefinition(
+        'total_staff', Staff, ['is_active'],
+        lambda s: s.is_active,
+        Q(is_active=True),
+    ),
+    CounterDefinition(
+        'meal_feedbacks', MealFeedback, [],
+        lambda f: True,
+        Q(),
+    ),
+]
+
+COUNTERS_BY_NAME = {counter.name: counter for counter in COUNTERS}
+COUNTERS_BY_MODEL = {}
+for _counter in COUNTERS:
+    COUNTERS_BY_MODEL.setdefault(_counter.model, []).append(_counter)
+
+
+def counted_flags(instance):
+    """Return {counter name: counted?} for an instance, or None if any field is deferred"""
+    deferred = instance.get_deferred_fields()
+    flags = {}
+    for counter in COUNTERS_BY_MODEL.get(type(instance), []):
+        if deferred.intersection(counter.fields):
+            flags[counter.name] = None
+        else:
+            flags[counter.name] = counter.matches(instance)
+    return flags
+
+
+def _changed():
+    # Event streams watch this version in a shared cache instead of querying every tick
+    if shared_cache() is not None:
+        transaction.on_commit(lambda: bump_table_versions(COUNTER_TABLE))
+
+
+def _store(name, value):
+    DashboardCounter.objects.update_or_create(name=name, defaults={'value': value})
+    _changed()
+
+
+def adjust_counter(name, delta):
+    """Atomically add delta to a counter, recounting it if it does not exist yet"""
+    if not delta:
+        return
+    updated = DashboardCounter.objects.filter(name=name).update(
+        value=F('value') + delta, updated_at=timezone.now()
+    )
+    if updated:
+        _changed()
+    else:
+        _store(name, COUNTERS_BY_NAME[name].recount())
+
+
+def recount_counter(name):
+    """Recompute a counter whose previous state is unknown"""
+    _store(name, COUNTERS_BY_NAME[name].recount())
+
+
+def read_counters(names):
+    """Read the given counters in one query, recounting any that are missing"""
+    values = dict(
+        DashboardCounter.objects.filter(name__in=names).values_list('name', 'value')
+    )
+    for name in names:
+        if name not in values:
+            values[name] = COUNTERS_BY_NAME[name].recount()
+            _store(name, values[name])
+    return values
+
+
+def rebuild_counters():
+    """Recount every counter from scratch, returning {name: (stored, actual)} for drifted ones"""
+    stored = dict(DashboardCounter.objects.values_list('name', 'value'))
+    drift = {}
+    for counter in COUNTERS:
+        actual = counter.recount()
+        if stored.get(counter.name) != actual:
+            drift[counter.name] = (stored.get(counter.name), actual)
+            _store(counter.name, actual)
+    return drift
@@ -3,37 +3,68 @@ Centralized SQL queries for the hostel management system
 All SQL queries should be added here and called from other files
 """
 
-from django.db import connection
+import re
+
+from django.db import connection, transaction
 from django.db.models import Count, Q, Sum, Avg
 from datetime import date, timedelta
 from .models import (
     Student, Room, Payment, Attendance, Penalty, Meal, 
     Complaint, StayExtensionRequest, Notification, Staff
 )
+from .counters import read_counters
+from .report_cache import cached_report
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+DASHBOARD_COUNTERS = [
+    'total_students', 'total_rooms', 'available_rooms', 'occupied_rooms',
+    'pending_payments', 'pending_complaints', 'pending_extension_requests', 'total_staff',
+]
+
+DAILY_STATS_SQL = """
+    SELECT
+        m.today_meals,
+        p.total_payments_today,
+        a.total_attendance_today,
+        a.present_today,
+        a.absent_today
+    FROM
+        (SELECT COUNT(*) AS today_meals
+         FROM meals WHERE date = %(today)s) m,
+        (SELECT COUNT(*) AS total_payments_today
+         FROM payments WHERE payment_date = %(today)s) p,
+        (SELECT
+            COUNT(*) AS total_attendance_today,
+            COUNT(CASE WHEN is_present = 1 THEN 1 END) AS present_today,
+            COUNT(CASE WHEN is_present = 0 THEN 1 END) AS absent_today
+         FROM attendances WHERE date = %(today)s) a
+"""
 
 
 def get_dashboard_stats():
-    """Get comprehensive dashboard statistics"""
-    today = date.today()
-    
-    stats = {
-        'total_students': Student.objects.filter(is_active=True).count(),
-        'total_rooms': Room.objects.count(),
-        'available_rooms': Room.objects.filter(is_available=True).count(),
-        'occupied_rooms': Room.objects.filter(occupied__gt=0).count(),
-        'pending_payments': Payment.objects.filter(status='pending').count(),
-        'pending_complaints': Complaint.objects.filter(status='pending').count(),
-        'today_meals': Meal.objects.filter(date=today).count(),
-        'total_staff': Staff.objects.filter(is_active=True).count(),
-        'total_payments_today': Payment.objects.filter(payment_date=today).count(),
-        'total_attendance_today': Attendance.objects.filter(date=today).count(),
-        'present_today': Attendance.objects.filter(date=today, is_present=True).count(),
-        'absent_today': Attendance.objects.filter(date=today, is_present=False).count(),
-    }
-    
+    """Get comprehensive dashboard statistics from the maintained counters plus one query for today's figures"""
+    stats = read_counters(DASHBOARD_COUNTERS)
+    with connection.cursor() as cursor:
+        cursor.execute(DAILY_STATS_SQL, {'today': date.today()})
+        columns = [col[0] for col in cursor.description]
+        stats.update(zip(columns, cursor.fetchone()))
     return stats
 
 
+def get_event_stream_versions(user_id):
+    """Get the counter version and latest notification id a user's event stream watches"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                (SELECT MAX(updated_at) FROM dashboard_counters) as counters_version,
+                (SELECT MAX(id) FROM notifications WHERE recipient_id = %s) as last_notification_id
+        """, [user_id])
+        return cursor.fetchone()
+
+
+@cached_report('rooms')
 def get_student_room_allocation_stats():
     """Get room allocation statistics"""
     with connection.cursor() as cursor:
@@ -49,84 +80,138 @@ def get_student_room_allocation_stats():
         return cursor.fetchall()
 
 
+@cached_report('payment_monthly_rollups')
 def get_payment_summary_by_month():
-    """Get payment summary grouped by month"""
+    """Get payment summary grouped by month from the monthly rollup"""
     with connection.cursor() as cursor:
         cursor.execute("""
             SELECT 
-                strftime('%Y-%m', payment_date) as month,
-                COUNT(*) as total_payments,
-                SUM(amount) as total_amount,
-                COUNT(CASE WHEN status = 'verified' THEN 1 END) as verified_payments,
-                COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_payments
-            FROM payments
-            WHERE payment_date >= date('now', '-6 months')
-            GROUP BY strftime('%Y-%m', payment_date)
+                strftime('%Y-%m', month) as month,
+                SUM(payment_count) as total_payments,
+                SUM(total_amount) as total_amount,
+                SUM(CASE WHEN status = 'verified' THEN payment_count ELSE 0 END) as verified_payments,
+                SUM(CASE WHEN status = 'pending' THEN payment_count ELSE 0 END) as pending_payments
+            FROM payment_monthly_rollups
+            WHERE month >= date('now', 'start of month', '-6 months')
+            GROUP BY month
+            HAVING SUM(payment_count) > 0
             ORDER BY month DESC
         """)
         return cursor.fetchall()
 
 
+@cached_report('payment_monthly_rollups')
+def get_revenue_by_month_and_method(start_month, end_month):
+    """Get payment count and amount per month, status and method from the monthly rollup"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT 
+                strftime('%%Y-%%m', month) as month,
+                status,
+                payment_method,
+                payment_count,
+                total_amount
+            FROM payment_monthly_rollups
+            WHERE month BETWEEN %s AND %s
+            AND payment_count > 0
+            ORDER BY month DESC, status, payment_method
+        """, [start_month.replace(day=1), end_month.replace(day=1)])
+        return cursor.fetchall()
+
+
+@cached_report('attendance_daily_rollups')
 def get_attendance_summary_by_month():
-    """Get attendance summary grouped by month"""
+    """Get attendance summary grouped by month from the daily rollup"""
     with connection.cursor() as cursor:
         cursor.execute("""
             SELECT 
                 strftime('%Y-%m', date) as month,
-                COUNT(*) as total_records,
-                COUNT(CASE WHEN is_present = 1 THEN 1 END) as present_count,
-                COUNT(CASE WHEN is_present = 0 THEN 1 END) as absent_count,
-                ROUND(COUNT(CASE WHEN is_present = 1 THEN 1 END) * 100.0 / COUNT(*), 2) as attendance_percentage
-            FROM attendances
+                SUM(count) as total_records,
+                SUM(CASE WHEN summary = 'Present' THEN count ELSE 0 END) as present_count,
+                SUM(CASE WHEN summary != 'Present' THEN count ELSE 0 END) as absent_count,
+                ROUND(SUM(CASE WHEN summary = 'Present' THEN count ELSE 0 END) * 100.0 / SUM(count), 2) as attendance_percentage
+            FROM attendance_daily_rollups
             WHERE date >= date('now', '-6 months')
             GROUP BY strftime('%Y-%m', date)
+            HAVING SUM(count) > 0
             ORDER BY month DESC
         """)
         return cursor.fetchall()
 
 
-def get_student_attendance_report(student_id, start_date, end_date):
-    """Get detailed attendance report for a specific student"""
+@cached_report('attendance_daily_rollups')
+def get_attendance_summary_by_range(start_date, end_date):
+    """Get per-day attendance summary for a date range from the daily rollup"""
     with connection.cursor() as cursor:
         cursor.execute("""
             SELECT 
-                a.date,
-                a.is_present,
-                a.remarks,
-                u.first_name || ' ' || u.last_name as marked_by_name
-            FROM attendances a
-            JOIN students s ON a.student_id = s.id
-            LEFT JOIN users u ON a.marked_by_id = u.id
-            WHERE s.student_id = %s 
-            AND a.date BETWEEN %s AND %s
-            ORDER BY a.date DESC
-        """, [student_id, start_date, end_date])
+                date,
+                SUM(count) as total_records,
+                SUM(CASE WHEN summary = 'Present' THEN count ELSE 0 END) as present_count,
+                SUM(CASE WHEN summary = 'Absent' THEN count ELSE 0 END) as absent_count,
+                SUM(CASE WHEN summary = 'Holiday' THEN count ELSE 0 END) as holiday_count,
+                SUM(CASE WHEN summary = 'Leave' THEN count ELSE 0 END) as leave_count,
+                ROUND(SUM(CASE WHEN summary = 'Present' THEN count ELSE 0 END) * 100.0 / SUM(count), 2) as attendance_percentage
+            FROM attendance_daily_rollups
+            WHERE date BETWEEN %s AND %s
+            GROUP BY date
+            HAVING SUM(count) > 0
+            ORDER BY date DESC
+        """, [start_date, end_date])
+        return cursor.fetchall()
+
+
+STUDENT_ATTENDANCE_REPORT_SQL = """
+    SELECT 
+        a.date,
+        a.is_present,
+        a.remarks,
+        u.first_name || ' ' || u.last_name as marked_by_name
+    FROM attendances a
+    JOIN students s ON a.student_id = s.id
+    LEFT JOIN users u ON a.marked_by_id = u.id
+    WHERE s.student_id = %s 
+    AND a.date BETWEEN %s AND %s
+    ORDER BY a.date DESC
+"""
+
+
+@cached_report('attendances', 'students', 'users')
+def get_student_attendance_report(student_id, start_date, end_date):
+    """Get detailed attendance report for a specific student"""
+    with connection.cursor() as cursor:
+        cursor.execute(STUDENT_ATTENDANCE_REPORT_SQL, [student_id, start_date, end_date])
         return cursor.fetchall()
 
 
+ROOM_OCCUPANCY_REPORT_SQL = """
+    SELECT 
+        r.room_number,
+        r.room_type,
+        r.floor,
+        r.capacity,
+        r.occupied,
+        r.price_per_month,
+        r.is_available,
+        GROUP_CONCAT(s.student_id) as student_ids,
+        GROUP_CONCAT(u.first_name || ' ' || u.last_name) as student_names
+    FROM rooms r
+    LEFT JOIN students s ON r.id = s.room_id
+    LEFT JOIN users u ON s.user_id = u.id
+    GROUP BY r.id
+    ORDER BY r.room_number
+"""
+
+
+@cached_report('rooms', 'students', 'users')
 def get_room_occupancy_report():
     """Get detailed room occupancy report"""
     with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT 
-                r.room_number,
-                r.room_type,
-                r.floor,
-                r.capacity,
-                r.occupied,
-                r.price_per_month,
-                r.is_available,
-                GROUP_CONCAT(s.student_id) as student_ids,
-                GROUP_CONCAT(u.first_name || ' ' || u.last_name) as student_names
-            FROM rooms r
-            LEFT JOIN students s ON r.id = s.room_id
-            LEFT JOIN users u ON s.user_id = u.id
-            GROUP BY r.id
-            ORDER BY r.room_number
-        """)
+        cursor.execute(ROOM_OCCUPANCY_REPORT_SQL)
         return cursor.fetchall()
 
 
+@cached_report('complaints')
 def get_complaint_summary_by_type():
     """Get complaint summary grouped by type"""
     with connection.cursor() as cursor:
@@ -145,6 +230,7 @@ def get_complaint_summary_by_type():
         return cursor.fetchall()
 
 
+@cached_report('meals', 'meal_feedbacks')
 def get_meal_feedback_summary():
     """Get meal feedback summary"""
     with connection.cursor() as cursor:
@@ -164,51 +250,92 @@ def get_meal_feedback_summary():
         return cursor.fetchall()
 
 
+STUDENT_PAYMENT_HISTORY_SQL = """
+    SELECT 
+        p.payment_date,
+        p.amount,
+        p.payment_method,
+        p.status,
+        p.transaction_id,
+        u.first_name || ' ' || u.last_name as verified_by_name,
+        p.verified_at
+    FROM payments p
+    JOIN students s ON p.student_id = s.id
+    LEFT JOIN users u ON p.verified_by_id = u.id
+    WHERE s.student_id = %s
+    ORDER BY p.payment_date DESC
+"""
+
+
+@cached_report('payments', 'students', 'users')
 def get_student_payment_history(student_id):
     """Get payment history for a specific student"""
     with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT 
-                p.payment_date,
-                p.amount,
-                p.payment_method,
-                p.status,
-                p.transaction_id,
-                u.first_name || ' ' || u.last_name as verified_by_name,
-                p.verified_at
-            FROM payments p
-            JOIN students s ON p.student_id = s.id
-            LEFT JOIN users u ON p.verified_by_id = u.id
-            WHERE s.student_id = %s
-            ORDER BY p.payment_date DESC
-        """, [student_id])
+        cursor.execute(STUDENT_PAYMENT_HISTORY_SQL, [student_id])
         return cursor.fetchall()
 
 
-def get_staff_performance_summary():
-    """Get staff performance summary"""
+def _date_range_condition(column, start_date, end_date, params):
+    """Build an inclusive date range condition on a date or datetime column"""
+    conditions = []
+    if start_date:
+        conditions.append(f'{column} >= %s')
+        params.append(start_date)
+    if end_date:
+        conditions.append(f'{column} < %s')
+        params.append(end_date + timedelta(days=1))
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+
+@cached_report('staff', 'users', 'complaints', 'payments', 'attendances')
+def get_staff_performance_summary(start_date=None, end_date=None):
+    """
+    Get staff performance summary, optionally limited to a date range.
+    Each activity source is aggregated per user on its own before joining,
+    so the cost is linear in the number of activity rows instead of their product.
+    """
+    params = []
+    complaints_where = _date_range_condition('created_at', start_date, end_date, params)
+    payments_where = _date_range_condition('verified_at', start_date, end_date, params)
+    attendances_where = _date_range_condition('date', start_date, end_date, params)
+
     with connection.cursor() as cursor:
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 s.staff_id,
                 u.first_name || ' ' || u.last_name as staff_name,
                 s.staff_type,
                 s.department,
-                COUNT(DISTINCT c.id) as complaints_handled,
-                COUNT(DISTINCT p.id) as payments_verified,
-                COUNT(DISTINCT a.id) as attendance_marked
+                COALESCE(c.complaints_handled, 0) as complaints_handled,
+                COALESCE(p.payments_verified, 0) as payments_verified,
+                COALESCE(a.attendance_marked, 0) as attendance_marked
             FROM staff s
             JOIN users u ON s.user_id = u.id
-            LEFT JOIN complaints c ON s.user_id = c.assigned_to_id
-            LEFT JOIN payments p ON s.user_id = p.verified_by_id
-            LEFT JOIN attendances a ON s.user_id = a.marked_by_id
+            LEFT JOIN (
+                SELECT assigned_to_id as user_id, COUNT(*) as complaints_handled
+                FROM complaints
+                {complaints_where}
+                GROUP BY assigned_to_id
+            ) c ON c.user_id = s.user_id
+            LEFT JOIN (
+                SELECT verified_by_id as user_id, COUNT(*) as payments_verified
+                FROM payments
+                {payments_where}
+                GROUP BY verified_by_id
+            ) p ON p.user_id = s.user_id
+            LEFT JOIN (
+                SELECT marked_by_id as user_id, COUNT(*) as attendance_marked
+                FROM attendances
+                {attendances_where}
+                GROUP BY marked_by_id
+            ) a ON a.user_id = s.user_id
             WHERE s.is_active = 1
-            GROUP BY s.id
             ORDER BY complaints_handled DESC, payments_verified DESC
-        """)
+        """, params)
         return cursor.fetchall()
 
 
+@cached_report('penalties')
 def get_penalty_summary():
     """Get penalty summary"""
     with connection.cursor() as cursor:
@@ -228,6 +355,7 @@ def get_penalty_summary():
         return cursor.fetchall()
 
 
+@cached_report('stay_extension_requests')
 def get_stay_extension_requests_summary():
     """Get stay extension requests summary"""
     with connection.cursor() as cursor:
@@ -244,6 +372,7 @@ def get_stay_extension_requests_summary():
         return cursor.fetchall()
 
 
+@cached_report('notifications')
 def get_notification_summary():
     """Get notification summary"""
     with connection.cursor() as cursor:
@@ -261,8 +390,23 @@ def get_notification_summary():
         return cursor.fetchall()
 
 
-def get_student_search_results(search_term):
-    """Search students by various criteria"""
+SEARCH_RESULT_LIMIT = 100
+
+
+def build_search_query(search_term):
+    """Turn free text into an FTS5 query matching every word as a prefix, or None if it has no words"""
+    words = re.findall(r'\w+', search_term or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+@cached_report('students', 'users', 'rooms')
+def get_student_search_results(search_term, limit=SEARCH_RESULT_LIMIT):
+    """Search active students by id, name, department or phone using the FTS5 index, best matches first"""
+    match = build_search_query(search_term)
+    if match is None:
+        return []
     with connection.cursor() as cursor:
         cursor.execute("""
             SELECT 
@@ -273,24 +417,24 @@ def get_student_search_results(search_term):
                 r.room_number,
                 u.phone,
                 s.parent_phone
-            FROM students s
+            FROM student_search_fts
+            JOIN students s ON s.id = student_search_fts.rowid
             JOIN users u ON s.user_id = u.id
             LEFT JOIN rooms r ON s.room_id = r.id
-            WHERE s.is_active = 1
-            AND (
-                s.student_id LIKE %s 
-                OR u.first_name LIKE %s 
-                OR u.last_name LIKE %s 
-                OR s.department LIKE %s
-                OR u.phone LIKE %s
-            )
-            ORDER BY s.student_id
-        """, [f'%{search_term}%'] * 5)
+            WHERE student_search_fts MATCH %s
+            AND s.is_active = 1
+            ORDER BY student_search_fts.rank, s.student_id
+            LIMIT %s
+        """, [match, limit])
         return cursor.fetchall()
 
 
-def get_room_search_results(search_term):
-    """Search rooms by various criteria"""
+@cached_report('rooms', 'students')
+def get_room_search_results(search_term, limit=SEARCH_RESULT_LIMIT):
+    """Search rooms by number or type using the FTS5 index, best matches first"""
+    match = build_search_query(search_term)
+    if match is None:
+        return []
     with connection.cursor() as cursor:
         cursor.execute("""
             SELECT 
@@ -302,40 +446,149 @@ def get_room_search_results(search_term):
                 r.price_per_month,
                 r.is_available,
                 GROUP_CONCAT(s.student_id) as student_ids
-            FROM rooms r
+            FROM (
+                SELECT rowid as room_id, rank
+                FROM room_search_fts
+                WHERE room_search_fts MATCH %s
+                ORDER BY rank
+                LIMIT %s
+            ) m
+            JOIN rooms r ON r.id = m.room_id
             LEFT JOIN students s ON r.id = s.room_id
-            WHERE (
-                r.room_number LIKE %s 
-                OR r.room_type LIKE %s
-            )
             GROUP BY r.id
-            ORDER BY r.room_number
-        """, [f'%{search_term}%', f'%{search_term}%'])
+            ORDER BY m.rank, r.room_number
+        """, [match, limit])
         return cursor.fetchall()
 
 
-def get_payment_verification_queue():
-    """Get pending payments for verification"""
+# Position in this list is the kind code packed into the index rowid (rowid = id * 4 + code)
+GLOBAL_SEARCH_KINDS = ['complaint', 'notification', 'meal', 'meal_feedback']
+GLOBAL_SEARCH_PAGE_SIZE = 20
+
+
+def _global_search_hits_sql(columns, kinds, recipient_id, params):
+    """Build the MATCH query; kinds and notification ownership are read from the rowid, not stored columns"""
+    sql = f"""
+        SELECT {columns}
+        FROM global_search_fts
+        WHERE global_search_fts MATCH %s
+    """
+    if len(kinds) < len(GLOBAL_SEARCH_KINDS):
+        sql += f" AND rowid %% 4 IN ({', '.join(['%s'] * len(kinds))})"
+        params.extend(GLOBAL_SEARCH_KINDS.index(kind) for kind in kinds)
+    if recipient_id is not None and 'notification' in kinds:
+        sql += """
+            AND (
+                rowid %% 4 != 1
+                OR rowid / 4 IN (SELECT id FROM notifications WHERE recipient_id = %s)
+            )
+        """
+        params.append(recipient_id)
+    return sql
+
+
+# rowid = id * 4 + code, see migration 0009_global_search_fts
+GLOBAL_SEARCH_INDEX_SQL = """
+    INSERT INTO global_search_fts (rowid, kind, object_id, title, body)
+    SELECT id * 4 + 0, 'complaint', id, title, description FROM complaints
+    UNION ALL
+    SELECT id * 4 + 1, 'notification', id, title, message FROM notifications
+    UNION ALL
+    SELECT id * 4 + 2, 'meal', id, meal_type || ' ' || date, menu FROM meals
+    UNION ALL
+    SELECT id * 4 + 3, 'meal_feedback', id, NULL, feedback_text FROM meal_feedbacks
+"""
+
+
+@cached_report('complaints', 'notifications', 'meals', 'meal_feedbacks')
+def get_global_search_results(search_term, kinds=None, recipient_id=None, page=1, page_size=GLOBAL_SEARCH_PAGE_SIZE):
+    """Ranked page of complaint, notification, meal and feedback hits; recipient_id limits notifications to one user"""
+    match = build_search_query(search_term)
+    kinds = [kind for kind in (kinds or GLOBAL_SEARCH_KINDS) if kind in GLOBAL_SEARCH_KINDS]
+    if match is None or not kinds:
+        return {'count': 0, 'results': []}
+    
+    params = [match]
+    hits_sql = _global_search_hits_sql('{columns}', kinds, recipient_id, params)
     with connection.cursor() as cursor:
+        cursor.execute(hits_sql.format(columns='COUNT(*)'), params)
+        count = cursor.fetchone()[0]
+        
+        # Rank without snippets first so highlighting only runs for the rows on this page
+        cursor.execute(hits_sql.format(columns='rowid') + """
+            ORDER BY rank, rowid DESC
+            LIMIT %s OFFSET %s
+        """, params + [page_size, (page - 1) * page_size])
+        rowids = [row[0] for row in cursor.fetchall()]
+        if not rowids:
+            return {'count': count, 'results': []}
+        
+        cursor.execute(f"""
+            SELECT kind, object_id, title, snippet(global_search_fts, 3, '', '', '...', 16), rank
+            FROM global_search_fts
+            WHERE global_search_fts MATCH %s
+            AND rowid IN ({', '.join(['%s'] * len(rowids))})
+            ORDER BY rank, rowid DESC
+        """, [match, *rowids])
+        results = [
+            {'kind': kind, 'id': object_id, 'title': title, 'snippet': snippet, 'score': -score}
+            for kind, object_id, title, snippet, score in cursor.fetchall()
+        ]
+    return {'count': count, 'results': results}
+
+
+def rebuild_search_index():
+    """Repopulate every FTS5 search table from its source tables and return the row count of each"""
+    counts = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("DELETE FROM student_search_fts")
         cursor.execute("""
-            SELECT 
-                p.id,
-                s.student_id,
-                u.first_name || ' ' || u.last_name as student_name,
-                p.amount,
-                p.payment_date,
-                p.payment_method,
-                p.transaction_id,
-                p.description
-            FROM payments p
-            JOIN students s ON p.student_id = s.id
-            JOIN users u ON s.user_id = u.id
-            WHERE p.status = 'pending'
-            ORDER BY p.payment_date DESC
+            INSERT INTO student_search_fts (rowid, student_id, first_name, last_name, department, phone)
+            SELECT s.id, s.student_id, u.first_name, u.last_name, s.department, u.phone
+            FROM students s JOIN users u ON s.user_id = u.id
+        """)
+        counts['student_search_fts'] = cursor.rowcount
+        cursor.execute("DELETE FROM room_search_fts")
+        cursor.execute("""
+            INSERT INTO room_search_fts (rowid, room_number, room_type)
+            SELECT id, room_number, room_type FROM rooms
         """)
+        counts['room_search_fts'] = cursor.rowcount
+        cursor.execute("DELETE FROM global_search_fts")
+        cursor.execute(GLOBAL_SEARCH_INDEX_SQL)
+        counts['global_search_fts'] = cursor.rowcount
+        for table in counts:
+            cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    return counts
+
+
+PAYMENT_VERIFICATION_QUEUE_SQL = """
+    SELECT 
+        p.id,
+        s.student_id,
+        u.first_name || ' ' || u.last_name as student_name,
+        p.amount,
+        p.payment_date,
+        p.payment_method,
+        p.transaction_id,
+        p.description
+    FROM payments p
+    JOIN students s ON p.student_id = s.id
+    JOIN users u ON s.user_id = u.id
+    WHERE p.status = 'pending'
+    ORDER BY p.payment_date DESC
+"""
+
+
+@cached_report('payments', 'students', 'users')
+def get_payment_verification_queue():
+    """Get pending payments for verification"""
+    with connection.cursor() as cursor:
+        cursor.execute(PAYMENT_VERIFICATION_QUEUE_SQL)
         return cursor.fetchall()
 
 
+@cached_report('students', 'users', 'rooms', 'attendances')
 def get_attendance_marking_queue(date_filter):
     """Get students for attendance marking"""
     with connection.cursor() as cursor:
@@ -355,3 +608,151 @@ def get_attendance_marking_queue(date_filter):
             ORDER BY s.student_id
         """, [date_filter])
         return cursor.fetchall()
+
+
+ATTENDANCE_SYNC_COLUMNS = """
+    s.id as student,
+    s.student_id,
+    u.first_name || ' ' || u.last_name as student_name,
+    s.department,
+    r.room_number,
+    r.floor,
+    s.is_active,
+    a.morning_shift,
+    a.evening_shift,
+    a.night_shift,
+    a.summary,
+    a.remarks,
+    a.updated_at as version
+"""
+
+ATTENDANCE_SYNC_JOINS = """
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN rooms r ON s.room_id = r.id
+    LEFT JOIN attendances a ON s.id = a.student_id AND a.date = %(date)s
+"""
+
+
+def get_attendance_sync_rows(date_filter, since=None, floor=None):
+    """
+    Rows of the attendance marking queue for a date, optionally limited to one floor.
+    With since, only students whose student, user or room row or attendance for the date changed
+    after it; students who left the queue since (deactivated or moved floor) are included so clients can drop them.
+    """
+    params = {'date': date_filter, 'since': since, 'floor': floor}
+    in_queue = 's.is_active = 1' + (' AND r.floor = %(floor)s' if floor is not None else '')
+    with connection.cursor() as cursor:
+        if since is None:
+            cursor.execute(f"""
+                SELECT {ATTENDANCE_SYNC_COLUMNS}
+                FROM students s
+                {ATTENDANCE_SYNC_JOINS}
+                WHERE {in_queue}
+                ORDER BY s.student_id
+            """, params)
+        else:
+            # Each branch is an index range scan on updated_at, so the work follows the number of changes
+            cursor.execute(f"""
+                WITH changed(id) AS (
+                    SELECT id FROM students WHERE updated_at > %(since)s
+                    UNION SELECT s.id FROM users u JOIN students s ON s.user_id = u.id WHERE u.updated_at > %(since)s
+                    UNION SELECT s.id FROM rooms r JOIN students s ON s.room_id = r.id WHERE r.updated_at > %(since)s
+                    UNION SELECT student_id FROM attendances WHERE date = %(date)s AND updated_at > %(since)s
+                )
+                SELECT {ATTENDANCE_SYNC_COLUMNS}
+                FROM changed c
+                JOIN students s ON s.id = c.id
+                {ATTENDANCE_SYNC_JOINS}
+                WHERE ({in_queue}) OR s.updated_at > %(since)s
+                ORDER BY s.student_id
+            """, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def get_attendance_sync_counts(date_filter, floor=None):
+    """(students in the marking queue, of which marked on the date) so sync clients can detect deletions"""
+    floor_condition = 'AND r.floor = %s' if floor is not None else ''
+    params = [date_filter] + ([floor] if floor is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT COUNT(*), COUNT(a.id)
+            FROM students s
+            LEFT JOIN rooms r ON s.room_id = r.id
+            LEFT JOIN attendances a ON s.id = a.student_id AND a.date = %s
+            WHERE s.is_active = 1 {floor_condition}
+        """, params)
+        return cursor.fetchone()
+
+
+def get_attendance_versions(date_filter, student_ids):
+    """{student id: (morning, evening, night, remarks, version)} for the students' attendance on a date"""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT student_id, morning_shift, evening_shift, night_shift, remarks, updated_at
+            FROM attendances
+            WHERE date = %s AND student_id IN ({', '.join(['%s'] * len(student_ids))})
+        """, [date_filter, *student_ids])
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+ATTENDANCE_EXPORT_SQL = """
+    SELECT 
+        s.student_id,
+        u.first_name || ' ' || u.last_name as student_name,
+        a.date,
+        a.morning_shift,
+        a.evening_shift,
+        a.night_shift,
+        a.summary,
+        a.remarks
+    FROM attendances a
+    JOIN students s ON a.student_id = s.id
+    JOIN users u ON s.user_id = u.id
+    WHERE a.date BETWEEN %s AND %s
+    ORDER BY a.date, s.student_id
+"""
+
+
+def iter_query(sql, params=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the column names of a query, then each of its rows.
+    Rows are read chunk_size at a time through a chunked cursor (a server-side
+    cursor on PostgreSQL), so memory stays flat however large the result is.
+    """
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        yield [col[0] for col in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def iter_room_occupancy_report():
+    """Stream the room occupancy report"""
+    return iter_query(ROOM_OCCUPANCY_REPORT_SQL)
+
+
+def iter_student_attendance_report(student_id, start_date, end_date):
+    """Stream the attendance report of a specific student"""
+    return iter_query(STUDENT_ATTENDANCE_REPORT_SQL, [student_id, start_date, end_date])
+
+
+def iter_attendance_export(start_date, end_date):
+    """Stream every attendance record in a date range"""
+    return iter_query(ATTENDANCE_EXPORT_SQL, [start_date, end_date])
+
+
+def iter_student_payment_history(student_id):
+    """Stream the payment history of a specific student"""
+    return iter_query(STUDENT_PAYMENT_HISTORY_SQL, [student_id])
+
+
+def iter_payment_verification_queue():
+    """Stream the pending payment verification queue"""
+    return iter_query(PAYMENT_VERIFICATION_QUEUE_SQL)
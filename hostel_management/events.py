@@ -0,0 +1,125 @@
+"""
+Server-Sent Events stream for dashboard counter changes and new notifications.
+With a shared cache (file, memcached, redis) each tick only reads the counter and
+notification table versions from the cache, and the version query runs once one of
+them changes. With a process-local cache each stream runs the version query every
+DB_POLL_INTERVAL seconds instead. Counters and notifications are only read when
+their version changes, so idle dashboards cost almost nothing.
+
+Every open stream holds a worker thread, so serve this with threaded or ASGI
+workers (e.g. gunicorn --worker-class gthread), not sync workers.
+"""
+
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from .counters import COUNTER_TABLE
+from .dashboard_queries import get_event_stream_versions
+from .models import DashboardCounter, Notification
+from .notifications import NOTIFICATION_TABLE
+from .report_cache import get_table_versions, shared_cache
+
+POLL_INTERVAL = 2
+DB_POLL_INTERVAL = 15
+HEARTBEAT_INTERVAL = 15
+DEFAULT_STREAM_TIMEOUT = 60
+MAX_STREAM_TIMEOUT = 300
+RECONNECT_DELAY_MS = 3000
+NOTIFICATION_BATCH = 50
+# Roles that may see the hostel-wide dashboard counters; everyone else only gets their notifications
+COUNTER_ROLES = {'admin', 'warden', 'deputy_rt'}
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF negotiate text/event-stream; error responses become an SSE error event"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data)
+
+
+def format_event(event, data, event_id=None):
+    """Encode a single SSE message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _read_counters():
+    return dict(DashboardCounter.objects.values_list('name', 'value'))
+
+
+def _watched_versions():
+    """Counter and notification table versions from the shared cache, or None without one"""
+    if shared_cache() is None:
+        return None
+    return get_table_versions([COUNTER_TABLE, NOTIFICATION_TABLE])
+
+
+def _new_notifications(user, after_id):
+    return list(
+        Notification.objects.filter(recipient=user, id__gt=after_id)
+        .order_by('id')
+        .values('id', 'notification_type', 'title', 'message', 'is_read', 'created_at')[:NOTIFICATION_BATCH]
+    )
+
+
+def dashboard_event_stream(user, last_event_id=None, timeout=DEFAULT_STREAM_TIMEOUT,
+                           poll_interval=None, sleep=time.sleep, clock=time.monotonic):
+    """
+    Yield SSE messages for one user until timeout seconds have passed.
+    Emits a 'snapshot' of all counters on connect, then 'counters' with only the
+    changed values (both for COUNTER_ROLES only) and one 'notification' per new row
+    addressed to the user.
+    The browser reconnects automatically and resumes from the last notification id.
+    """
+    send_counters = user.role in COUNTER_ROLES
+    watched = _watched_versions()
+    if poll_interval is None:
+        poll_interval = DB_POLL_INTERVAL if watched is None else POLL_INTERVAL
+    counters_version, latest_id = get_event_stream_versions(user.id)
+    counters = _read_counters() if send_counters else {}
+    last_id = last_event_id if last_event_id is not None else (latest_id or 0)
+
+    yield f'retry: {RECONNECT_DELAY_MS}\n\n'
+    if send_counters:
+        yield format_event('snapshot', counters)
+
+    deadline = clock() + timeout
+    last_sent = clock()
+    while True:
+        if latest_id and latest_id > last_id:
+            for notification in _new_notifications(user, last_id):
+                last_id = notification['id']
+                yield format_event('notification', notification, event_id=last_id)
+                last_sent = clock()
+
+        if clock() >= deadline:
+            return
+        if clock() - last_sent >= HEARTBEAT_INTERVAL:
+            yield ': keep-alive\n\n'
+            last_sent = clock()
+        sleep(poll_interval)
+
+        if watched is not None:
+            current_watched = _watched_versions()
+            if current_watched == watched:
+                continue
+            watched = current_watched
+        version, latest_id = get_event_stream_versions(user.id)
+        if send_counters and version != counters_version:
+            counters_version = version
+            current = _read_counters()
+            changed = {name: value for name, value in current.items() if counters.get(name) != value}
+            counters = current
+            if changed:
+                yield format_event('counters', changed)
+                last_sent = clock()
@@ -0,0 +1,74 @@
+"""
+Streaming CSV and newline-delimited JSON exports of the dashboard_queries reports.
+Rows are encoded one at a time as the database cursor yields them, so an export
+never holds more than one fetch chunk in memory.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from . import dashboard_queries
+
+
+class _EchoBuffer:
+    """File-like object whose write() returns the value instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """Selects CSV exports during content negotiation; error bodies are rendered as JSON"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+class NDJSONStreamRenderer(CSVStreamRenderer):
+    """Selects newline-delimited JSON exports during content negotiation"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def csv_lines(rows):
+    """Encode the header and rows produced by dashboard_queries.iter_query as CSV lines"""
+    writer = csv.writer(_EchoBuffer())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    """Encode the rows produced by dashboard_queries.iter_query as one JSON object per line"""
+    rows = iter(rows)
+    columns = next(rows)
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+ENCODERS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+}
+
+# report name -> (row iterator, required query parameters, date parameters)
+EXPORTS = {
+    'room-occupancy': (dashboard_queries.iter_room_occupancy_report, [], []),
+    'student-attendance': (
+        dashboard_queries.iter_student_attendance_report,
+        ['student_id', 'start_date', 'end_date'],
+        ['start_date', 'end_date'],
+    ),
+    'attendance': (
+        dashboard_queries.iter_attendance_export,
+        ['start_date', 'end_date'],
+        ['start_date', 'end_date'],
+    ),
+    'payment-history': (dashboard_queries.iter_student_payment_history, ['student_id'], []),
+    'payment-verification-queue': (dashboard_queries.iter_payment_verification_queue, [], []),
+}
@@ -0,0 +1,163 @@
+"""
+Shared helpers for the benchmark management commands.
+Synthetic data is generated inside a transaction that is always rolled back,
+so benchmarks can be run against a development database without leaving rows behind.
+"""
+
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from hostel_management.models import (
+    User, Student, Room, Payment, Attendance, Complaint, StayExtensionRequest
+)
+
+SHIFTS = ['Present', 'Absent', 'Holiday', 'Leave', 'Null']
+DEPARTMENTS = ['Computer Science', 'Electrical Engineering', 'Mechanical Engineering',
+               'Civil Engineering', 'Business Administration']
+FIRST_NAMES = ['Ali', 'Ayesha', 'Bilal', 'Fatima', 'Hamza', 'Hira', 'Imran', 'Maryam', 'Omar',
+               'Sana', 'Usman', 'Zainab', 'Ahmed', 'Noor', 'Saad', 'Amna', 'Hassan', 'Iqra']
+LAST_NAMES = ['Khan', 'Ahmed', 'Malik', 'Hussain', 'Raza', 'Sheikh', 'Qureshi', 'Butt', 'Chaudhry',
+              'Siddiqui', 'Javed', 'Iqbal', 'Aslam', 'Rafique', 'Mirza', 'Baig']
+BATCH_SIZE = 2000
+
+
+class _Rollback(Exception):
+    """Raised to discard benchmark data at the end of a run"""
+
+
+@contextmanager
+def rolled_back():
+    """Run the enclosed block in a transaction that is always rolled back"""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def measure(func, repeat=10):
+    """Run func repeatedly and return (query_count, median_ms) for a single call"""
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    query_count = len(ctx.captured_queries)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return query_count, statistics.median(timings)
+
+
+def seed_hostel(students, attendance_days=0, payments_per_student=1, prefix='bench'):
+    """Bulk insert a synthetic hostel with the given number of students"""
+    rng = random.Random(students)
+    today = date.today()
+
+    rooms = [
+        Room(
+            room_number=f'{prefix[:2]}{i}',
+            room_type=rng.choice(['single', 'double', 'triple']),
+            floor=i % 10 + 1,
+            capacity=3,
+            occupied=0,
+            price_per_month=Decimal('7000'),
+        )
+        for i in range(max(1, students // 3))
+    ]
+    Room.objects.bulk_create(rooms, batch_size=BATCH_SIZE)
+    rooms = list(Room.objects.filter(room_number__startswith=prefix[:2]))
+
+    users = [
+        User(
+            username=f'{prefix}_{i}',
+            email=f'{prefix}_{i}@hostify.test',
+            first_name=FIRST_NAMES[i % len(FIRST_NAMES)],
+            last_name=f'{LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}{i // 1000 or ""}',
+            phone=f'03{i:09d}',
+            password='!',
+            role='student',
+        )
+        for i in range(students)
+    ]
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    users = list(User.objects.filter(username__startswith=f'{prefix}_').order_by('id'))
+
+    Student.objects.bulk_create([
+        Student(
+            user=user,
+            student_id=f'{prefix.upper()}{i:06d}',
+            department=rng.choice(DEPARTMENTS),
+            year_of_study=rng.randint(1, 5),
+            parent_name=f'Parent {i}',
+            parent_phone='0300000000',
+            emergency_contact='0300000000',
+            room=rooms[i % len(rooms)] if rng.random() < 0.9 else None,
+            is_active=rng.random() < 0.95,
+        )
+        for i, user in enumerate(users)
+    ], batch_size=BATCH_SIZE)
+    student_ids = list(
+        Student.objects.filter(user__username__startswith=f'{prefix}_').values_list('id', flat=True)
+    )
+
+    Payment.objects.bulk_create([
+        Payment(
+            student_id=student_id,
+            amount=Decimal('7000'),
+            payment_date=today - timedelta(days=rng.randint(0, 365)),
+            payment_method=rng.choice(['bank_transfer', 'credit_card', 'mobile_payment', 'cash']),
+            status=rng.choice(['pending', 'verified', 'verified', 'rejected']),
+        )
+        for student_id in student_ids
+        for _ in range(payments_per_student)
+    ], batch_size=BATCH_SIZE)
+
+    Complaint.objects.bulk_create([
+        Complaint(
+            student_id=student_id,
+            complaint_type=rng.choice(['maintenance', 'food', 'noise', 'security', 'other']),
+            title='Benchmark complaint',
+            description='Generated for benchmarking',
+            status=rng.choice(['pending', 'in_progress', 'resolved']),
+        )
+        for student_id in student_ids[::10]
+    ], batch_size=BATCH_SIZE)
+
+    StayExtensionRequest.objects.bulk_create([
+        StayExtensionRequest(
+            student_id=student_id,
+            current_checkout_date=today,
+            requested_checkout_date=today + timedelta(days=30),
+            reason='Generated for benchmarking',
+            status=rng.choice(['pending', 'approved', 'rejected']),
+        )
+        for student_id in student_ids[::20]
+    ], batch_size=BATCH_SIZE)
+
+    for offset in range(attendance_days):
+        day = today - timedelta(days=offset)
+        rows = []
+        for student_id in student_ids:
+            morning, evening, night = rng.choice(SHIFTS), rng.choice(SHIFTS), rng.choice(SHIFTS)
+            summary = Attendance(morning_shift=morning, evening_shift=evening).calculate_summary()
+            rows.append(Attendance(
+                student_id=student_id,
+                date=day,
+                is_present=summary == 'Present',
+                morning_shift=morning,
+                evening_shift=evening,
+                night_shift=night,
+                summary=summary,
+            ))
+        Attendance.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+    return student_ids
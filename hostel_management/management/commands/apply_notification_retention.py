@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from hostel_management.retention import RETENTION_BATCH_SIZE, apply_retention, get_policies
+
+
+def _after(days):
+    return 'never' if days is None else f'after {days} days'
+
+
+class Command(BaseCommand):
+    help = 'Archive or delete notifications past the retention policy for their type'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RETENTION_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        for notification_type, policy in sorted(get_policies().items()):
+            self.stdout.write(
+                f"{notification_type}: {'archive' if policy.archive else 'delete'} read {_after(policy.read_days)}, "
+                f'unread {_after(policy.unread_days)}'
+            )
+        archived, deleted = apply_retention(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} notifications, deleted {deleted}'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from hostel_management.rollups import rebuild_attendance_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily attendance rollup from the raw attendances table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD), default: all history')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD), default: all history')
+
+    def handle(self, *args, **options):
+        start = self._parse(options['start'])
+        end = self._parse(options['end'])
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+
+        rows = rebuild_attendance_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} attendance rollup row(s)'))
+
+    def _parse(self, value):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'Invalid date: {value}')
+        return parsed
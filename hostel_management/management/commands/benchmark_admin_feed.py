@@ -0,0 +1,77 @@
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hostel_management.admin_feed import FEED_SOURCES, get_admin_feed
+from hostel_management.models import FoodShortage, Meal, Payment, Student, User
+from ._bench import BATCH_SIZE, measure, rolled_back, seed_hostel
+
+
+def legacy_admin_feed():
+    """Load every feed item, build all of them and sort, as the admin feed did before the merge"""
+    items = []
+    for source in FEED_SOURCES:
+        items.extend(source.serialize(row) for row in source.queryset())
+    items.sort(key=lambda item: item['created_at'], reverse=True)
+    return items
+
+
+def spread_feed_timestamps(rng, days):
+    """Scatter seeded payments, shortages and sign-ups over the past days so the sources interleave"""
+    now = timezone.now()
+    for model, field in [(Payment, 'created_at'), (FoodShortage, 'created_at'), (User, 'date_joined')]:
+        rows = list(model.objects.only('id'))
+        for row in rows:
+            setattr(row, field, now - timedelta(seconds=rng.randint(0, days * 86400)))
+        model.objects.bulk_update(rows, [field], batch_size=BATCH_SIZE)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark one page of the merged admin feed against loading and sorting the whole feed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', nargs='+', type=int, default=[1000, 10000])
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        self.stdout.write(f"{'students':>9} {'items':>7} {'impl':>7} {'queries':>8} {'median ms':>10}")
+        for students in options['students']:
+            with rolled_back():
+                rng = random.Random(students)
+                seed_hostel(students)
+                Student.objects.filter(id__in=list(Student.objects.values_list('id', flat=True))[::4]).update(room=None)
+                cook = User.objects.create(username='bench_feed_cook', role='mess_staff')
+                meal = Meal.objects.create(
+                    date=date.today(), meal_type='lunch', menu='Rice', prepared_by=cook
+                )
+                FoodShortage.objects.bulk_create([
+                    FoodShortage(meal=meal, reported_by=cook, shortage_type='Rice', description='Ran out', status='pending')
+                    for _ in range(students // 10)
+                ], batch_size=BATCH_SIZE)
+                spread_feed_timestamps(rng, days=60)
+
+                legacy = legacy_admin_feed()
+                pages, position = [], None
+                while True:
+                    items, position = get_admin_feed(position, page_size)
+                    pages.extend(items)
+                    if position is None:
+                        break
+                # Ties on created_at may be broken differently, so compare as sets in timestamp order
+                if sorted(map(repr, pages)) != sorted(map(repr, legacy)) or \
+                        [item['created_at'] for item in pages] != [item['created_at'] for item in legacy]:
+                    self.stderr.write(self.style.ERROR(f'Feed mismatch at {students} students'))
+
+                # A page from the middle of the feed should cost the same as the first
+                _, deep_position = get_admin_feed(None, len(legacy) // 2)
+                for name, func in [
+                    ('legacy', legacy_admin_feed),
+                    ('merge', lambda: get_admin_feed(None, page_size)),
+                    ('deep', lambda: get_admin_feed(deep_position, page_size)),
+                ]:
+                    query_count, median_ms = measure(func, options['repeat'])
+                    self.stdout.write(f'{students:>9} {len(legacy):>7} {name:>7} {query_count:>8} {median_ms:>10.2f}')
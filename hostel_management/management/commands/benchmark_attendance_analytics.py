@@ -0,0 +1,124 @@
+import time
+from calendar import monthrange
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from hostel_management.analytics import get_attendance_analytics, load_day_codes
+from hostel_management.attendance_months import MONTH_BATCH_SIZE, months_between, rebuild_attendance_months
+from hostel_management.models import Attendance, AttendanceMonth
+from ._bench import rolled_back, seed_hostel
+
+
+def legacy_attendance_analytics(start_date, end_date):
+    """Per-row Python loop over Attendance objects that the NumPy analytics replaced"""
+    per_student = defaultdict(Counter)
+    per_day = defaultdict(Counter)
+    streaks = {}
+    rows = (
+        Attendance.objects.filter(date__range=(start_date, end_date))
+        .select_related('student__room')
+        .order_by('student_id', 'date')
+    )
+    previous = {}
+    for attendance in rows.iterator(chunk_size=2000):
+        summary = attendance.calculate_summary()
+        per_student[attendance.student_id][summary] += 1
+        per_day[attendance.date][summary] += 1
+        longest, current = streaks.get(attendance.student_id, (0, 0))
+        consecutive = previous.get(attendance.student_id) == attendance.date - timedelta(days=1)
+        current = (current + 1 if consecutive else 1) if summary == 'Absent' else 0
+        streaks[attendance.student_id] = (max(longest, current), current)
+        previous[attendance.student_id] = attendance.date
+
+    results = {}
+    for student_id, counts in per_student.items():
+        longest, current = streaks[student_id]
+        if previous[student_id] != end_date:
+            current = 0
+        results[student_id] = (
+            round(counts['Present'] * 100.0 / sum(counts.values()), 2), longest, current
+        )
+    return results, {day: counts['Present'] for day, counts in per_day.items()}
+
+
+def seed_packed_months(student_ids, start_date, end_date, seed):
+    """Write random packed months straight into the monthly store, skipping attendance rows"""
+    rng = np.random.default_rng(seed)
+    n_days = (end_date - start_date).days + 1
+    parts = rng.integers(0, 5, size=(len(student_ids), n_days, 4), dtype=np.uint16)
+    codes = 1 + ((parts[..., 0] * 5 + parts[..., 1]) * 5 + parts[..., 2]) * 5 + parts[..., 3]
+
+    months = []
+    for month in months_between(start_date, end_date):
+        days_in_month = monthrange(month.year, month.month)[1]
+        offset = (month - start_date).days
+        block = np.zeros((len(student_ids), days_in_month), dtype='<u2')
+        first, last = max(0, -offset), min(days_in_month, n_days - offset)
+        block[:, first:last] = codes[:, offset + first:offset + last]
+        months.extend(
+            AttendanceMonth(student_id=student_id, month=month, days=block[i].tobytes())
+            for i, student_id in enumerate(student_ids)
+        )
+    AttendanceMonth.objects.bulk_create(months, batch_size=MONTH_BATCH_SIZE)
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the NumPy attendance analytics against a per-row Python loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=180)
+        parser.add_argument('--legacy-students', type=int, default=500,
+                            help='Hostel size for the comparison with the legacy loop (0 to skip)')
+        parser.add_argument('--legacy-days', type=int, default=60)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        end_date = date.today()
+        self.stdout.write(f"{'students':>9} {'days':>5} {'impl':>7} {'median ms':>10}")
+
+        if options['legacy_students']:
+            students, days = options['legacy_students'], options['legacy_days']
+            start_date = end_date - timedelta(days=days - 1)
+            with rolled_back():
+                seed_hostel(students, attendance_days=days, payments_per_student=0)
+                rebuild_attendance_months()
+
+                analytics = get_attendance_analytics.uncached(start_date, end_date)
+                vectorized = {
+                    row['student']: (row['attendance_percentage'], row['longest_absence_streak'],
+                                     row['current_absence_streak'])
+                    for row in analytics['per_student']
+                }
+                present_by_day = {row['date']: row['Present'] for row in analytics['per_day'] if row['marked_days']}
+                if legacy_attendance_analytics(start_date, end_date) != (vectorized, present_by_day):
+                    self.stderr.write(self.style.ERROR('Result mismatch against the legacy loop'))
+
+                for name, func in [
+                    ('legacy', lambda: legacy_attendance_analytics(start_date, end_date)),
+                    ('numpy', lambda: get_attendance_analytics.uncached(start_date, end_date)),
+                ]:
+                    self.stdout.write(f'{students:>9} {days:>5} {name:>7} {timed(func, options["repeat"]):>10.1f}')
+
+        students, days = options['students'], options['days']
+        start_date = end_date - timedelta(days=days - 1)
+        with rolled_back():
+            student_ids = seed_hostel(students, payments_per_student=0)
+            seed_packed_months(student_ids, start_date, end_date, seed=students)
+            for name, func in [
+                ('load', lambda: load_day_codes(start_date, end_date)),
+                ('numpy', lambda: get_attendance_analytics.uncached(start_date, end_date)),
+            ]:
+                self.stdout.write(f'{students:>9} {days:>5} {name:>7} {timed(func, options["repeat"]):>10.1f}')
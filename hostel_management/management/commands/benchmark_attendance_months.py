@@ -0,0 +1,78 @@
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from hostel_management.attendance_months import (
+    SHIFTS, get_attendance_month, get_attendance_percentages, rebuild_attendance_months
+)
+from hostel_management.models import Attendance, AttendanceMonth
+from ._bench import measure, rolled_back, seed_hostel
+
+
+def row_percentages(start_date, end_date):
+    """Per-student summary counts from scanning every attendance row in the range"""
+    counts = defaultdict(Counter)
+    rows = Attendance.objects.filter(date__range=(start_date, end_date)).values_list('student_id', 'summary')
+    for student_id, summary in rows.iterator(chunk_size=5000):
+        counts[student_id][summary] += 1
+    results = {}
+    for student_id, summary_counts in counts.items():
+        summary = {shift: summary_counts[shift] for shift in SHIFTS}
+        marked = sum(summary.values())
+        summary['marked_days'] = marked
+        summary['attendance_percentage'] = round(summary['Present'] * 100.0 / marked, 2)
+        results[student_id] = summary
+    return results
+
+
+def row_calendar(student_id, month):
+    """One student's month from the attendance rows"""
+    return list(Attendance.objects.filter(
+        student_id=student_id, date__year=month.year, date__month=month.month
+    ).values_list('date', 'morning_shift', 'evening_shift', 'night_shift', 'summary'))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark attendance percentages and calendars from the packed monthly store against attendance rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', nargs='+', type=int, default=[500, 2000])
+        parser.add_argument('--days', type=int, default=90, help='Attendance days per student')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'students':>9} {'rows':>8} {'months':>7} {'blob bytes':>11} {'report':>12} {'impl':>7} {'queries':>8} {'median ms':>10}"
+        )
+        for students in options['students']:
+            with rolled_back():
+                student_ids = seed_hostel(students, attendance_days=options['days'], payments_per_student=0)
+                rebuild_attendance_months()
+                rows = Attendance.objects.count()
+                months = AttendanceMonth.objects.count()
+                blob_bytes = sum(len(blob) for blob in AttendanceMonth.objects.values_list('days', flat=True))
+                end_date = date.today()
+                start_date = end_date - timedelta(days=options['days'] - 1)
+
+                if row_percentages(start_date, end_date) != get_attendance_percentages(start_date, end_date):
+                    self.stderr.write(self.style.ERROR(f'Percentage mismatch at {students} students'))
+                calendar = [
+                    (day['date'], day['morning_shift'], day['evening_shift'], day['night_shift'], day['summary'])
+                    for day in get_attendance_month(student_ids[0], end_date)['days'] if day['summary']
+                ]
+                if sorted(row_calendar(student_ids[0], end_date)) != calendar:
+                    self.stderr.write(self.style.ERROR(f'Calendar mismatch at {students} students'))
+
+                implementations = [
+                    ('percentages', 'rows', lambda: row_percentages(start_date, end_date)),
+                    ('percentages', 'packed', lambda: get_attendance_percentages(start_date, end_date)),
+                    ('calendar', 'rows', lambda: row_calendar(student_ids[0], end_date)),
+                    ('calendar', 'packed', lambda: get_attendance_month(student_ids[0], end_date)),
+                ]
+                for report, name, func in implementations:
+                    query_count, median_ms = measure(func, options['repeat'])
+                    self.stdout.write(
+                        f'{students:>9} {rows:>8} {months:>7} {blob_bytes:>11} {report:>12} {name:>7} '
+                        f'{query_count:>8} {median_ms:>10.2f}'
+                    )
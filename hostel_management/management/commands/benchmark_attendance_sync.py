@@ -0,0 +1,50 @@
+import json
+import random
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+
+from hostel_management.attendance_marking import mark_attendance
+from hostel_management.attendance_sync import encode_sync_token, get_attendance_changes
+from hostel_management.models import Student, User
+from ._bench import measure, rolled_back, seed_hostel
+from .benchmark_bulk_attendance import random_entries
+
+
+def payload_bytes(changes):
+    return len(json.dumps(changes, cls=DjangoJSONEncoder))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full and delta attendance syncs for offline marking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', nargs='+', type=int, default=[1000, 10000])
+        parser.add_argument('--changes', type=int, default=20, help='Attendance rows re-marked between syncs')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        today = date.today()
+        self.stdout.write(f"{'students':>9} {'changes':>8} {'sync':>6} {'rows':>6} {'bytes':>9} {'queries':>8} {'median ms':>10}")
+        for students in options['students']:
+            with rolled_back():
+                student_ids = seed_hostel(students, payments_per_student=0)
+                marker = User.objects.create(username='bench_sync_marker', role='deputy_rt')
+                rng = random.Random(students)
+                mark_attendance(today, random_entries(student_ids, rng), marker)
+
+                token = encode_sync_token(connection.ops.adapt_datetimefield_value(timezone.now()), today, None)
+                active = list(Student.objects.filter(id__in=student_ids, is_active=True).values_list('id', flat=True))
+                changed = rng.sample(active, min(options['changes'], len(active)))
+                mark_attendance(today, random_entries(changed, rng), marker)
+
+                for name, sync_token in [('full', None), ('delta', token)]:
+                    changes = get_attendance_changes(today, token=sync_token)
+                    query_count, median_ms = measure(lambda: get_attendance_changes(today, token=sync_token), options['repeat'])
+                    self.stdout.write(
+                        f"{students:>9} {len(changed):>8} {name:>6} {len(changes['students']):>6} "
+                        f"{payload_bytes(changes):>9} {query_count:>8} {median_ms:>10.2f}"
+                    )
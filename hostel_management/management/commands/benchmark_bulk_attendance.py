@@ -0,0 +1,114 @@
+import random
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from hostel_management.attendance_marking import mark_attendance
+from hostel_management.models import User, Student, Attendance, Penalty, AttendanceDailyRollup, shift_summary
+from hostel_management.rollups import rebuild_attendance_rollups
+from ._bench import SHIFTS, rolled_back, seed_hostel
+
+
+def legacy_mark_attendance(day, entries, marked_by):
+    """Per-student loop the set-based marking replaced"""
+    for entry in entries:
+        try:
+            student = Student.objects.get(id=entry['student'])
+        except Student.DoesNotExist:
+            continue
+        morning, evening, night = entry['morning_shift'], entry['evening_shift'], entry['night_shift']
+        if morning == 'Present' and evening == 'Present':
+            night = 'Null'
+        summary = shift_summary(morning, evening)
+        attendance, created = Attendance.objects.get_or_create(
+            student=student, date=day,
+            defaults={'marked_by': marked_by, 'remarks': '', 'morning_shift': morning,
+                      'evening_shift': evening, 'night_shift': night, 'summary': summary},
+        )
+        if not created:
+            attendance.remarks = ''
+            attendance.morning_shift = morning
+            attendance.evening_shift = evening
+            attendance.night_shift = night
+            attendance.summary = summary
+            attendance.save()
+        if night == 'Present':
+            Penalty.objects.get_or_create(
+                student=student, penalty_type='night_shift',
+                defaults={'amount': 500, 'reason': 'Present during night shift (after 8 PM)', 'issued_by': marked_by},
+            )
+        elif night == 'Null':
+            Penalty.objects.filter(student=student, penalty_type='night_shift').delete()
+
+
+class QueryCounter:
+    """Count executed statements without keeping them, unlike CaptureQueriesContext's capped log"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def random_entries(student_ids, rng):
+    return [
+        {
+            'student': str(student_id),
+            'morning_shift': rng.choice(SHIFTS),
+            'evening_shift': rng.choice(SHIFTS),
+            'night_shift': rng.choice(SHIFTS),
+        }
+        for student_id in student_ids
+    ]
+
+
+def snapshot():
+    """The attendance and rollup rows a marking run leaves, for comparing implementations"""
+    # Penalties are left out: the legacy loop kept one per student rather than one per night
+    attendance = sorted(Attendance.objects.values_list(
+        'student_id', 'date', 'morning_shift', 'evening_shift', 'night_shift', 'summary'
+    ))
+    rollups = sorted(AttendanceDailyRollup.objects.filter(count__gt=0).values_list('date', 'summary', 'count'))
+    return attendance, rollups
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk attendance marking against the legacy per-student loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', nargs='+', type=int, default=[500, 2000])
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time the set-based marking')
+
+    def handle(self, *args, **options):
+        implementations = [('bulk', mark_attendance)]
+        if not options['skip_legacy']:
+            implementations.insert(0, ('legacy', legacy_mark_attendance))
+
+        self.stdout.write(f"{'students':>9} {'impl':>7} {'pass':>7} {'queries':>8} {'ms':>9}")
+        for students in options['students']:
+            results = {}
+            for name, func in implementations:
+                with rolled_back():
+                    student_ids = seed_hostel(students, payments_per_student=0)
+                    rebuild_attendance_rollups()
+                    marked_by = User.objects.create(username='bench_marker', password='!', role='deputy_rt')
+                    rng = random.Random(students)
+                    # First pass inserts every row, the second re-marks the same day
+                    for label in ('insert', 'update'):
+                        entries = random_entries(student_ids, rng)
+                        counter = QueryCounter()
+                        with connection.execute_wrapper(counter):
+                            start = time.perf_counter()
+                            func(date.today(), entries, marked_by)
+                            elapsed = (time.perf_counter() - start) * 1000
+                        self.stdout.write(
+                            f'{students:>9} {name:>7} {label:>7} {counter.count:>8} {elapsed:>9.1f}'
+                        )
+                    results[name] = snapshot()
+
+            if len(set(map(repr, results.values()))) > 1:
+                self.stderr.write(self.style.ERROR(f'Result mismatch at {students} students'))
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from hostel_management.counters import rebuild_counters
+from hostel_management.dashboard_queries import get_dashboard_stats
+from hostel_management.models import (
+    Student, Room, Payment, Attendance, Meal, Complaint, StayExtensionRequest, Staff
+)
+from ._bench import measure, rolled_back, seed_hostel
+
+
+def legacy_dashboard_stats():
+    """Per-counter COUNT(*) implementation the stats engine replaced"""
+    today = date.today()
+    return {
+        'total_students': Student.objects.filter(is_active=True).count(),
+        'total_rooms': Room.objects.count(),
+        'available_rooms': Room.objects.filter(is_available=True).count(),
+        'occupied_rooms': Room.objects.filter(occupied__gt=0).count(),
+        'pending_payments': Payment.objects.filter(status='pending').count(),
+        'pending_complaints': Complaint.objects.filter(status='pending').count(),
+        'pending_extension_requests': StayExtensionRequest.objects.filter(status='pending').count(),
+        'today_meals': Meal.objects.filter(date=today).count(),
+        'total_staff': Staff.objects.filter(is_active=True).count(),
+        'total_payments_today': Payment.objects.filter(payment_date=today).count(),
+        'total_attendance_today': Attendance.objects.filter(date=today).count(),
+        'present_today': Attendance.objects.filter(date=today, is_present=True).count(),
+        'absent_today': Attendance.objects.filter(date=today, is_present=False).count(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark dashboard statistics query count and latency on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'students':>10} {'impl':>8} {'queries':>8} {'median ms':>10}")
+        for size in options['sizes']:
+            with rolled_back():
+                seed_hostel(size, attendance_days=1)
+                # bulk_create bypasses the counter signals
+                rebuild_counters()
+                expected = legacy_dashboard_stats()
+                actual = get_dashboard_stats()
+                if any(actual[key] != value for key, value in expected.items()):
+                    self.stderr.write(self.style.ERROR(f'Mismatch at {size} students: {actual} != {expected}'))
+
+                for name, func in [('legacy', legacy_dashboard_stats), ('engine', get_dashboard_stats)]:
+                    queries, median_ms = measure(func, options['repeat'])
+                    self.stdout.write(f'{size:>10} {name:>8} {queries:>8} {median_ms:>10.2f}')
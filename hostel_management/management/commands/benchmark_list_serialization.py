@@ -0,0 +1,73 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.utils.encoders import JSONEncoder
+
+from hostel_management.models import User, Notification
+from hostel_management.serializers import ValuesPlan
+from hostel_management.views import AttendanceViewSet, NotificationViewSet, PaymentViewSet
+from ._bench import BATCH_SIZE, rolled_back, seed_hostel
+
+VIEWSETS = [('attendance', AttendanceViewSet), ('notifications', NotificationViewSet), ('payments', PaymentViewSet)]
+
+
+def serializer_rows(serializer_class, queryset, context):
+    """Current path: model instances through the ModelSerializer"""
+    return serializer_class(queryset, many=True, context=context).data
+
+
+def values_rows(serializer_class, queryset, context):
+    """Fast path: values() dicts through a ValuesPlan"""
+    plan = ValuesPlan(serializer_class(context=context))
+    return plan.render(queryset.values(*plan.keys))
+
+
+def rows_per_second(func, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+class Command(BaseCommand):
+    help = 'Compare list rendering throughput of the values() fast path against the ModelSerializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--days', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            student_ids = seed_hostel(options['students'], attendance_days=options['days'])
+            admin = User.objects.create(username='bench_list_admin', role='admin', profile_picture='profile_pictures/admin.png')
+            User.objects.filter(username__startswith='bench_').update(profile_picture='profile_pictures/student.png')
+            Notification.objects.bulk_create([
+                Notification(recipient=admin, notification_type='general', title='Notice', message=f'Notice {i}')
+                for i in range(len(student_ids) * options['days'])
+            ], batch_size=BATCH_SIZE)
+
+            request = Request(APIRequestFactory().get('/api/'))
+            request.user = admin
+            context = {'request': request}
+
+            self.stdout.write(f"{'endpoint':<15} {'rows':>8} {'serializer rows/s':>18} {'values rows/s':>14} {'speedup':>8}")
+            for name, viewset in VIEWSETS:
+                view = viewset(request=request, format_kwarg=None, action='list')
+                queryset = view.get_queryset()
+                serializer_class = view.get_serializer_class()
+
+                slow = json.dumps(serializer_rows(serializer_class, queryset, context), cls=JSONEncoder)
+                fast = json.dumps(values_rows(serializer_class, queryset, context), cls=JSONEncoder)
+                if slow != fast:
+                    raise CommandError(f'{name}: values() output differs from the serializer output')
+
+                rows = queryset.count()
+                slow_rate = rows_per_second(lambda: serializer_rows(serializer_class, queryset.all(), context), rows, options['repeat'])
+                fast_rate = rows_per_second(lambda: values_rows(serializer_class, queryset.all(), context), rows, options['repeat'])
+                self.stdout.write(f'{name:<15} {rows:>8} {slow_rate:>18,.0f} {fast_rate:>14,.0f} {fast_rate / slow_rate:>7.1f}x')
@@ -0,0 +1,84 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from hostel_management.models import Notification, NotificationArchive, User
+from hostel_management.retention import apply_retention, get_archived_notifications
+from ._bench import BATCH_SIZE, measure, rolled_back
+
+TYPES = ['general', 'payment', 'complaint', 'meal', 'room_assigned', 'extension']
+
+
+def seed_notifications(users, per_user, days, rng):
+    """Bulk insert per_user notifications for each of users new users, spread over the past days"""
+    User.objects.bulk_create(
+        [User(username=f'bench_retention_{i}', password='!', role='student') for i in range(users)],
+        batch_size=BATCH_SIZE,
+    )
+    user_ids = list(User.objects.filter(username__startswith='bench_retention_').values_list('id', flat=True))
+    now = timezone.now()
+    Notification.objects.bulk_create([
+        Notification(
+            recipient_id=user_id,
+            notification_type=rng.choice(TYPES),
+            title='Hostel Notice',
+            message=f'Notice {i} for everyone in the hostel, please read it carefully',
+            is_read=rng.random() < 0.8,
+        )
+        for user_id in user_ids for i in range(per_user)
+    ], batch_size=BATCH_SIZE)
+    notifications = list(Notification.objects.filter(recipient_id__in=user_ids).only('id'))
+    for notification in notifications:
+        notification.created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+    Notification.objects.bulk_update(notifications, ['created_at'], batch_size=BATCH_SIZE)
+    return user_ids
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-user notification queries before and after applying the retention policies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--per-user', type=int, default=500)
+        parser.add_argument('--days', type=int, default=730)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user_ids = seed_notifications(options['users'], options['per_user'], options['days'], random.Random(0))
+            user_id = user_ids[0]
+            hot_queries = [
+                ('latest page', lambda: list(Notification.objects.filter(recipient_id=user_id)[:20])),
+                ('unread recount', lambda: Notification.objects.filter(recipient_id=user_id, is_read=False).count()),
+                ('type history', lambda: Notification.objects.filter(
+                    recipient_id=user_id, notification_type='payment').count()),
+            ]
+
+            self.stdout.write(f"{'stage':>7} {'query':>15} {'rows':>8} {'queries':>8} {'median ms':>10}")
+            for stage in ['before', 'after']:
+                if stage == 'after':
+                    start = time.perf_counter()
+                    archived, deleted = apply_retention()
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(f'Retention archived {archived} and deleted {deleted} in {elapsed:.1f}s')
+                rows = Notification.objects.filter(recipient_id__in=user_ids).count()
+                for name, func in hot_queries:
+                    query_count, median_ms = measure(func, options['repeat'])
+                    self.stdout.write(f'{stage:>7} {name:>15} {rows:>8} {query_count:>8} {median_ms:>10.2f}')
+
+            chunks = NotificationArchive.objects.filter(recipient_id__in=user_ids)
+            stored = chunks.aggregate(bytes=Sum(Length('payload')))['bytes'] or 0
+            items, _ = get_archived_notifications(user_id, page_size=10 ** 9)
+            raw = len(json.dumps(items, separators=(',', ':'))) * len(user_ids)
+            self.stdout.write(
+                f'Archive: {chunks.count()} chunks, {stored / 1024:.0f} KB compressed '
+                f'(about {raw / 1024:.0f} KB as JSON)'
+            )
+            query_count, median_ms = measure(lambda: get_archived_notifications(user_id, page_size=20), options['repeat'])
+            self.stdout.write(f'Archive first page: {query_count} queries, {median_ms:.2f} ms')
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from hostel_management.models import Notification, User
+from hostel_management.notifications import notify_role
+from ._bench import rolled_back
+from .benchmark_bulk_attendance import QueryCounter
+
+ROLE = 'deputy_rt'
+
+
+def legacy_notify_role(role, notification_type, title, message):
+    """Per-recipient loop the bulk fan-out replaced"""
+    for user in User.objects.filter(role=role):
+        Notification.objects.create(recipient=user, notification_type=notification_type, title=title, message=message)
+
+
+def seed_recipients(count):
+    User.objects.bulk_create(
+        [User(username=f'bench_recipient_{i}', password='!', role=ROLE) for i in range(count)],
+        batch_size=1000,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark broadcasting a notification to a whole role against the per-recipient loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', nargs='+', type=int, default=[100, 1000, 10000])
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time the bulk fan-out')
+
+    def handle(self, *args, **options):
+        implementations = [('bulk', notify_role)]
+        if not options['skip_legacy']:
+            implementations.insert(0, ('legacy', legacy_notify_role))
+
+        self.stdout.write(f"{'recipients':>11} {'impl':>7} {'created':>8} {'queries':>8} {'ms':>9}")
+        for recipients in options['recipients']:
+            for name, func in implementations:
+                with rolled_back():
+                    seed_recipients(recipients)
+                    counter = QueryCounter()
+                    with connection.execute_wrapper(counter):
+                        start = time.perf_counter()
+                        func(ROLE, notification_type='general', title='Water Supply', message='Water will be off 2-4 PM')
+                        elapsed = (time.perf_counter() - start) * 1000
+                    created = Notification.objects.filter(title='Water Supply').count()
+                    self.stdout.write(f'{recipients:>11} {name:>7} {created:>8} {counter.count:>8} {elapsed:>9.1f}')
@@ -0,0 +1,69 @@
+import gzip
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from hostel_management import renderers
+from hostel_management.models import User
+from hostel_management.serializers import ValuesPlan
+from hostel_management.views import AttendanceViewSet, PaymentViewSet
+from ._bench import rolled_back, seed_hostel
+
+VIEWSETS = [('attendance', AttendanceViewSet), ('payments', PaymentViewSet)]
+
+
+def best_ms(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+class Command(BaseCommand):
+    help = 'Benchmark DRF JSONRenderer against the fast JSON and MessagePack renderers on list payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--days', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            seed_hostel(options['students'], attendance_days=options['days'])
+            request = Request(APIRequestFactory().get('/api/'))
+            request.user = User.objects.create(username='bench_renderer_admin', role='admin')
+
+            payloads = []
+            for name, viewset in VIEWSETS:
+                view = viewset(request=request, format_kwarg=None, action='list')
+                plan = ValuesPlan(view.get_serializer())
+                payloads.append((name, {'next': None, 'previous': None, 'results': plan.render(view.get_queryset().values(*plan.keys))}))
+
+        encoders = [
+            ('drf json', lambda data: JSONRenderer().render(data)),
+            ('stdlib fast', renderers.dumps_stdlib),
+        ]
+        if renderers.orjson is not None:
+            encoders.append(('orjson', renderers.dumps_orjson))
+        if renderers.msgpack is not None:
+            encoders.append(('msgpack', lambda data: renderers.MessagePackRenderer().render(data)))
+
+        self.stdout.write(f"{'payload':<11} {'rows':>6} {'renderer':<12} {'ms':>8} {'bytes':>10} {'gzip bytes':>11} {'gzip ms':>8}")
+        for name, data in payloads:
+            reference = JSONRenderer().render(data)
+            for label, encode in encoders:
+                body = encode(data)
+                if label != 'msgpack' and json.loads(body) != json.loads(reference):
+                    raise CommandError(f'{label} output differs from JSONRenderer for {name}')
+                render_ms = best_ms(lambda: encode(data), options['repeat'])
+                compressed = gzip.compress(body, compresslevel=6)
+                gzip_ms = best_ms(lambda: gzip.compress(body, compresslevel=6), options['repeat'])
+                self.stdout.write(
+                    f"{name:<11} {len(data['results']):>6} {label:<12} {render_ms:>8.1f} {len(body):>10,} {len(compressed):>11,} {gzip_ms:>8.1f}"
+                )
@@ -0,0 +1,146 @@
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from hostel_management.dashboard_queries import (
+    get_student_search_results, get_room_search_results, get_global_search_results
+)
+from hostel_management.models import User, Meal, MealFeedback, Complaint, Notification
+from ._bench import BATCH_SIZE, measure, rolled_back, seed_hostel
+
+LEGACY_STUDENT_SQL = """
+    SELECT 
+        s.student_id,
+        u.first_name || ' ' || u.last_name as student_name,
+        s.department,
+        s.year_of_study,
+        r.room_number,
+        u.phone,
+        s.parent_phone
+    FROM students s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN rooms r ON s.room_id = r.id
+    WHERE s.is_active = 1
+    AND (
+        s.student_id LIKE %s 
+        OR u.first_name LIKE %s 
+        OR u.last_name LIKE %s 
+        OR s.department LIKE %s
+        OR u.phone LIKE %s
+    )
+    ORDER BY s.student_id
+"""
+
+LEGACY_ROOM_SQL = """
+    SELECT 
+        r.room_number,
+        r.room_type,
+        r.floor,
+        r.capacity,
+        r.occupied,
+        r.price_per_month,
+        r.is_available,
+        GROUP_CONCAT(s.student_id) as student_ids
+    FROM rooms r
+    LEFT JOIN students s ON r.id = s.room_id
+    WHERE (
+        r.room_number LIKE %s 
+        OR r.room_type LIKE %s
+    )
+    GROUP BY r.id
+    ORDER BY r.room_number
+"""
+
+STUDENT_TERMS = ['Ayesha', 'khan', 'Hus', 'BENCH00012', 'Computer', 'Omar Malik', '0300001']
+ROOM_TERMS = ['be1', 'double', 'be123']
+GLOBAL_TERMS = ['fan', 'biryani', 'water leak', 'payment verified', 'cold']
+
+WORDS = ['fan', 'light', 'water', 'leak', 'noise', 'biryani', 'daal', 'chawal', 'cold', 'late',
+         'payment', 'verified', 'room', 'window', 'door', 'wifi', 'tea', 'roti', 'clean', 'broken']
+
+
+def _text(rng, words=12):
+    """Mostly long-tail filler words with the occasional common term, like real free text"""
+    return ' '.join(
+        rng.choice(WORDS) if rng.random() < 0.05 else f'w{rng.randint(0, 20000)}'
+        for _ in range(words)
+    )
+
+
+def seed_search_text(student_ids, notifications):
+    """Bulk insert free-text complaints, notifications, meals and feedback"""
+    rng = random.Random(notifications)
+    today = date.today()
+    Complaint.objects.bulk_create([
+        Complaint(student_id=student_id, complaint_type='other', title=_text(rng, 3), description=_text(rng))
+        for student_id in student_ids[::4]
+    ], batch_size=BATCH_SIZE)
+    recipients = list(User.objects.values_list('id', flat=True)[:1000])
+    Notification.objects.bulk_create([
+        Notification(recipient_id=rng.choice(recipients), notification_type='general',
+                     title=_text(rng, 3), message=_text(rng))
+        for _ in range(notifications)
+    ], batch_size=BATCH_SIZE)
+    Meal.objects.bulk_create([
+        Meal(meal_type=meal_type, date=today - timedelta(days=offset), menu=_text(rng, 6))
+        for offset in range(365) for meal_type in ['breakfast', 'lunch', 'dinner']
+    ], batch_size=BATCH_SIZE)
+    meal_ids = list(Meal.objects.filter(date__gt=today - timedelta(days=365)).values_list('id', flat=True))
+    MealFeedback.objects.bulk_create([
+        MealFeedback(student_id=student_id, meal_id=rng.choice(meal_ids), rating=rng.randint(1, 5),
+                     feedback_text=_text(rng, 8))
+        for student_id in student_ids[::2]
+    ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def legacy_global_search(term):
+    """Per-model icontains scans the global search replaced"""
+    return (
+        list(Complaint.objects.filter(Q(title__icontains=term) | Q(description__icontains=term)))
+        + list(Notification.objects.filter(message__icontains=term))
+        + list(Meal.objects.filter(menu__icontains=term))
+        + list(MealFeedback.objects.filter(feedback_text__icontains=term))
+    )
+
+
+def legacy_search(sql, term, columns):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [f'%{term}%'] * columns)
+        return cursor.fetchall()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark FTS5 student and room search against the legacy LIKE scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000)
+        parser.add_argument('--notifications', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['students']} students...")
+            student_ids = seed_hostel(options['students'])
+            seed_search_text(student_ids, options['notifications'])
+
+            self.stdout.write(f"{'term':>14} {'kind':>8} {'impl':>7} {'hits':>6} {'median ms':>10}")
+            cases = [('student', term, LEGACY_STUDENT_SQL, 5, get_student_search_results) for term in STUDENT_TERMS]
+            cases += [('room', term, LEGACY_ROOM_SQL, 2, get_room_search_results) for term in ROOM_TERMS]
+            for kind, term, legacy_sql, columns, search in cases:
+                legacy_hits = len(legacy_search(legacy_sql, term, columns))
+                _, legacy_ms = measure(lambda: legacy_search(legacy_sql, term, columns), options['repeat'])
+                fts_hits = len(search.uncached(term))
+                _, fts_ms = measure(lambda: search.uncached(term), options['repeat'])
+                self.stdout.write(f'{term:>14} {kind:>8} {"like":>7} {legacy_hits:>6} {legacy_ms:>10.2f}')
+                self.stdout.write(f'{term:>14} {kind:>8} {"fts5":>7} {fts_hits:>6} {fts_ms:>10.2f}')
+
+            for term in GLOBAL_TERMS:
+                legacy_hits = len(legacy_global_search(term))
+                _, legacy_ms = measure(lambda: legacy_global_search(term), options['repeat'])
+                fts_hits = get_global_search_results.uncached(term)['count']
+                _, fts_ms = measure(lambda: get_global_search_results.uncached(term), options['repeat'])
+                self.stdout.write(f'{term:>14} {"global":>8} {"like":>7} {legacy_hits:>6} {legacy_ms:>10.2f}')
+                self.stdout.write(f'{term:>14} {"global":>8} {"fts5":>7} {fts_hits:>6} {fts_ms:>10.2f}')
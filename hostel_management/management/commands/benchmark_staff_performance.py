@@ -0,0 +1,86 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from hostel_management.dashboard_queries import get_staff_performance_summary
+from hostel_management.models import User, Staff, Payment, Attendance, Complaint
+from ._bench import measure, rolled_back, seed_hostel
+
+LEGACY_SQL = """
+    SELECT 
+        s.staff_id,
+        u.first_name || ' ' || u.last_name as staff_name,
+        s.staff_type,
+        s.department,
+        COUNT(DISTINCT c.id) as complaints_handled,
+        COUNT(DISTINCT p.id) as payments_verified,
+        COUNT(DISTINCT a.id) as attendance_marked
+    FROM staff s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN complaints c ON s.user_id = c.assigned_to_id
+    LEFT JOIN payments p ON s.user_id = p.verified_by_id
+    LEFT JOIN attendances a ON s.user_id = a.marked_by_id
+    WHERE s.is_active = 1
+    GROUP BY s.id
+    ORDER BY complaints_handled DESC, payments_verified DESC
+"""
+
+
+def legacy_staff_performance_summary():
+    """Single LEFT JOIN fan-out query the report engine replaced"""
+    with connection.cursor() as cursor:
+        cursor.execute(LEGACY_SQL)
+        return cursor.fetchall()
+
+
+def seed_staff(count):
+    """Create active deputy staff and spread existing activity rows across them"""
+    User.objects.bulk_create([
+        User(username=f'bench_staff_{i}', email=f'bench_staff_{i}@hostify.test', password='!', role='deputy_rt')
+        for i in range(count)
+    ])
+    users = list(User.objects.filter(username__startswith='bench_staff_').order_by('id'))
+    Staff.objects.bulk_create([
+        Staff(user=user, staff_id=f'BSTAFF{i:04d}', staff_type='deputy_rt', department='Student Affairs',
+              hire_date=date(2020, 1, 1), salary=40000)
+        for i, user in enumerate(users)
+    ])
+    first, n = users[0].id, len(users)
+    with connection.cursor() as cursor:
+        cursor.execute('UPDATE attendances SET marked_by_id = %s + (id %% %s)', [first, n])
+        cursor.execute("UPDATE payments SET verified_by_id = %s + (id %% %s), verified_at = payment_date", [first, n])
+        cursor.execute('UPDATE complaints SET assigned_to_id = %s + (id %% %s)', [first, n])
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the staff performance report against the legacy fan-out query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', nargs='+', type=int, default=[100, 200, 400])
+        parser.add_argument('--days', type=int, default=10, help='Attendance days per student')
+        parser.add_argument('--staff', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time the new report')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'attendance':>11} {'payments':>9} {'complaints':>11} {'impl':>7} {'median ms':>10} {'ms/1k rows':>11}")
+        for students in options['students']:
+            with rolled_back():
+                seed_hostel(students, attendance_days=options['days'], payments_per_student=2)
+                seed_staff(options['staff'])
+                rows = (Attendance.objects.count(), Payment.objects.count(), Complaint.objects.count())
+                total_rows = sum(rows)
+
+                implementations = [('engine', get_staff_performance_summary.uncached)]
+                if not options['skip_legacy']:
+                    implementations.insert(0, ('legacy', legacy_staff_performance_summary))
+                    if sorted(legacy_staff_performance_summary()) != sorted(get_staff_performance_summary.uncached()):
+                        self.stderr.write(self.style.ERROR(f'Result mismatch at {students} students'))
+
+                for name, func in implementations:
+                    _, median_ms = measure(func, options['repeat'])
+                    self.stdout.write(
+                        f'{rows[0]:>11} {rows[1]:>9} {rows[2]:>11} {name:>7} {median_ms:>10.2f} '
+                        f'{median_ms * 1000 / total_rows:>11.3f}'
+                    )
@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from hostel_management.models import (
+    User, Penalty, Meal, MealFeedback, Notification, Staff, FoodShortage
+)
+from hostel_management.urls import router
+from ._bench import BATCH_SIZE, rolled_back, seed_hostel
+
+QUERY_BUDGET = 4
+ROLES = ['admin', 'warden', 'deputy_rt', 'mess_staff', 'student']
+
+
+def seed_list_data(students):
+    """Seed every model behind a list endpoint and return one user per role"""
+    student_ids = seed_hostel(students, attendance_days=1)
+    users = {
+        role: User.objects.create(username=f'budget_{role}', email=f'budget_{role}@hostify.test', password='!', role=role)
+        for role in ROLES
+    }
+    today = date.today()
+
+    Meal.objects.bulk_create([
+        Meal(meal_type=meal_type, date=today - timedelta(days=offset), menu='Daal chawal', prepared_by=users['mess_staff'])
+        for offset in range(max(1, students // 30)) for meal_type in ['breakfast', 'lunch', 'dinner']
+    ], batch_size=BATCH_SIZE)
+    meal_ids = list(Meal.objects.values_list('id', flat=True))
+
+    MealFeedback.objects.bulk_create([
+        MealFeedback(student_id=student_id, meal_id=meal_ids[i % len(meal_ids)], rating=4, feedback_text='Good')
+        for i, student_id in enumerate(student_ids)
+    ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+    Penalty.objects.bulk_create([
+        Penalty(student_id=student_id, penalty_type='night_shift', amount=500, reason='Night shift', issued_by=users['warden'])
+        for student_id in student_ids[::3]
+    ], batch_size=BATCH_SIZE)
+    Notification.objects.bulk_create([
+        Notification(recipient=user, notification_type='general', title='Notice', message=f'Notice {i}')
+        for user in users.values() for i in range(students)
+    ], batch_size=BATCH_SIZE)
+    Staff.objects.bulk_create([
+        Staff(user=user, staff_id=f'BUDGET{i:02d}', staff_type=user.role, department='Hostel',
+              hire_date=date(2020, 1, 1), salary=40000)
+        for i, user in enumerate([users['warden'], users['deputy_rt'], users['mess_staff']])
+    ])
+    FoodShortage.objects.bulk_create([
+        FoodShortage(meal_id=meal_id, reported_by=users['mess_staff'], shortage_type='Rice', description='Short',
+                     resolved_by=users['admin'])
+        for meal_id in meal_ids
+    ], batch_size=BATCH_SIZE)
+    return users
+
+
+def list_endpoints():
+    """(name, url, viewset) for every router endpoint that supports list"""
+    return [
+        (prefix, reverse(f'{basename}-list'), viewset)
+        for prefix, viewset, basename in router.registry
+        if hasattr(viewset, 'list')
+    ]
+
+
+def count_list_queries(students):
+    """Query count of each list endpoint with the given number of seeded students"""
+    counts = {}
+    with rolled_back():
+        users = seed_list_data(students)
+        client = APIClient()
+        for name, url, viewset in list_endpoints():
+            allowed_roles = getattr(viewset, 'allowed_roles', None) or ROLES
+            client.force_authenticate(users[allowed_roles[0]])
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+            counts[name] = len(ctx.captured_queries)
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Fail if any list endpoint exceeds the query budget or issues more queries as rows grow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=int, default=QUERY_BUDGET)
+        parser.add_argument('--small', type=int, default=10)
+        parser.add_argument('--large', type=int, default=300)
+
+    def handle(self, *args, **options):
+        small = count_list_queries(options['small'])
+        large = count_list_queries(options['large'])
+
+        failures = []
+        self.stdout.write(f"{'endpoint':<26} {options['small']:>8} {options['large']:>8}")
+        for name in small:
+            self.stdout.write(f'{name:<26} {small[name]:>8} {large[name]:>8}')
+            if large[name] != small[name]:
+                failures.append(f'{name}: {small[name]} -> {large[name]} queries as rows grow')
+            elif large[name] > options['budget']:
+                failures.append(f"{name}: {large[name]} queries exceeds budget of {options['budget']}")
+
+        if failures:
+            raise CommandError('Query budget exceeded:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f"All list endpoints within {options['budget']} queries"))
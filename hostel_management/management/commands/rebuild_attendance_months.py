@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from hostel_management.attendance_months import rebuild_attendance_months
+
+
+class Command(BaseCommand):
+    help = 'Repack the monthly attendance store from the raw attendances table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First month to rebuild (YYYY-MM-DD), default: all history')
+        parser.add_argument('--end', help='Last month to rebuild (YYYY-MM-DD), default: all history')
+
+    def handle(self, *args, **options):
+        start = self._parse(options['start'])
+        end = self._parse(options['end'])
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+
+        months = rebuild_attendance_months(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Packed {months} student month(s)'))
+
+    def _parse(self, value):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'Invalid date: {value}')
+        return parsed
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hostel_management.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount all dashboard counters from scratch and report any drift'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = rebuild_counters()
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('All dashboard counters are in sync'))
+            return
+
+        for name, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(self.style.WARNING(f'{name}: stored={stored} actual={actual}'))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(drift)} drifted counter(s)'))
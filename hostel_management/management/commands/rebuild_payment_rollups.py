@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from hostel_management.rollups import rebuild_payment_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly payment rollup from the raw payments table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First month to rebuild (YYYY-MM), default: all history')
+        parser.add_argument('--end', help='Last month to rebuild (YYYY-MM), default: all history')
+
+    def handle(self, *args, **options):
+        start = self._parse(options['start'])
+        end = self._parse(options['end'])
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+
+        rows = rebuild_payment_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} payment rollup row(s)'))
+
+    def _parse(self, value):
+        if value is None:
+            return None
+        parsed = parse_date(f'{value}-01')
+        if parsed is None:
+            raise CommandError(f'Invalid month: {value}')
+        return parsed
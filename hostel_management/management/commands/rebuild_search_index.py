@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from hostel_management.dashboard_queries import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Repopulate the full-text search indexes'
+
+    def handle(self, *args, **options):
+        for table, count in rebuild_search_index().items():
+            self.stdout.write(f'{table}: {count} row(s)')
+        self.stdout.write(self.style.SUCCESS('Search indexes rebuilt'))
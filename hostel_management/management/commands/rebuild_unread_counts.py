@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hostel_management.unread import rebuild_unread_counts
+
+
+class Command(BaseCommand):
+    help = 'Recount unread notifications for every user with a stored count and report any drift'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = rebuild_unread_counts()
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('All unread notification counts are in sync'))
+            return
+
+        for user_id, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(self.style.WARNING(f'user {user_id}: stored={stored} actual={actual}'))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(drift)} drifted count(s)'))
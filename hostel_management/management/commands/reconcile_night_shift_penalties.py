@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from hostel_management.penalties import reconcile_night_shift_penalties_for_range
+
+
+class Command(BaseCommand):
+    help = 'Issue and withdraw night-shift penalties so they match stored attendance (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to reconcile (YYYY-MM-DD), default: --days before today')
+        parser.add_argument('--end', help='Last date to reconcile (YYYY-MM-DD), default: today')
+        parser.add_argument('--days', type=int, default=7, help='Days to look back when --start is not given')
+
+    def handle(self, *args, **options):
+        end = self._parse(options['end']) or date.today()
+        start = self._parse(options['start']) or end - timedelta(days=options['days'])
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        issued, withdrawn = reconcile_night_shift_penalties_for_range(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled night-shift penalties from {start} to {end}: {issued} issued, {withdrawn} withdrawn'
+        ))
+
+    def _parse(self, value):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'Invalid date: {value}')
+        return parsed
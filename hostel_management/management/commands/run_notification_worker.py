@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hostel_management.outbox import OUTBOX_BATCH_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notifications from the outbox, polling until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            delivered, failed = drain_outbox(options['batch_size'])
+            if delivered or failed:
+                self.stdout.write(f'Delivered {delivered} outbox entries, {failed} failed')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+DEFAULT_GZIP_MIN_LENGTH = 1024
+
+
+class GZipLargeResponseMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves small responses alone (GZIP_MIN_LENGTH bytes, default 1 KiB)
+    and never compresses Server-Sent Events, which must reach the browser unbuffered.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        min_length = getattr(settings, 'GZIP_MIN_LENGTH', DEFAULT_GZIP_MIN_LENGTH)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0004_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportTableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=100, unique=True)),
+                ('version', models.BigIntegerField(default=1)),
+            ],
+            options={
+                'db_table': 'report_table_versions',
+            },
+        ),
+    ]
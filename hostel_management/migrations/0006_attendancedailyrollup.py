@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    schema_editor.execute("""
+        INSERT INTO attendance_daily_rollups (date, summary, count)
+        SELECT date, summary, COUNT(*)
+        FROM attendances
+        GROUP BY date, summary
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0005_reporttableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('summary', models.CharField(choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Holiday', 'Holiday'), ('Leave', 'Leave'), ('Null', 'Null')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'attendance_daily_rollups',
+                'unique_together': {('date', 'summary')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
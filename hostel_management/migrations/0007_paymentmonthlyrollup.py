@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    schema_editor.execute("""
+        INSERT INTO payment_monthly_rollups (month, status, payment_method, payment_count, total_amount)
+        SELECT date(payment_date, 'start of month'), status, payment_method, COUNT(*), SUM(amount)
+        FROM payments
+        GROUP BY date(payment_date, 'start of month'), status, payment_method
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0006_attendancedailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('verified', 'Verified'), ('rejected', 'Rejected'), ('completed', 'Completed')], max_length=20)),
+                ('payment_method', models.CharField(choices=[('bank_transfer', 'Bank Transfer'), ('credit_card', 'Credit Card'), ('mobile_payment', 'Mobile Payment'), ('cash', 'Cash')], max_length=20)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'db_table': 'payment_monthly_rollups',
+                'unique_together': {('month', 'status', 'payment_method')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
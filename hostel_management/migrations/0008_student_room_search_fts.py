@@ -0,0 +1,86 @@
+from django.db import migrations
+
+STUDENT_COLUMNS = "student_id, first_name, last_name, department, phone"
+
+CREATE_SQL = f"""
+CREATE VIRTUAL TABLE student_search_fts USING fts5(
+    {STUDENT_COLUMNS},
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '1 2 3'
+);
+
+CREATE VIRTUAL TABLE room_search_fts USING fts5(
+    room_number, room_type,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '1 2 3'
+);
+
+INSERT INTO student_search_fts (rowid, {STUDENT_COLUMNS})
+SELECT s.id, s.student_id, u.first_name, u.last_name, s.department, u.phone
+FROM students s JOIN users u ON s.user_id = u.id;
+
+INSERT INTO room_search_fts (rowid, room_number, room_type)
+SELECT id, room_number, room_type FROM rooms;
+
+CREATE TRIGGER students_search_ai AFTER INSERT ON students BEGIN
+    INSERT INTO student_search_fts (rowid, {STUDENT_COLUMNS})
+    SELECT NEW.id, NEW.student_id, u.first_name, u.last_name, NEW.department, u.phone
+    FROM users u WHERE u.id = NEW.user_id;
+END;
+
+CREATE TRIGGER students_search_au AFTER UPDATE OF student_id, department, user_id ON students BEGIN
+    DELETE FROM student_search_fts WHERE rowid = OLD.id;
+    INSERT INTO student_search_fts (rowid, {STUDENT_COLUMNS})
+    SELECT NEW.id, NEW.student_id, u.first_name, u.last_name, NEW.department, u.phone
+    FROM users u WHERE u.id = NEW.user_id;
+END;
+
+CREATE TRIGGER students_search_ad AFTER DELETE ON students BEGIN
+    DELETE FROM student_search_fts WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER users_search_au AFTER UPDATE OF first_name, last_name, phone ON users BEGIN
+    DELETE FROM student_search_fts WHERE rowid IN (SELECT id FROM students WHERE user_id = NEW.id);
+    INSERT INTO student_search_fts (rowid, {STUDENT_COLUMNS})
+    SELECT s.id, s.student_id, NEW.first_name, NEW.last_name, s.department, NEW.phone
+    FROM students s WHERE s.user_id = NEW.id;
+END;
+
+CREATE TRIGGER rooms_search_ai AFTER INSERT ON rooms BEGIN
+    INSERT INTO room_search_fts (rowid, room_number, room_type)
+    VALUES (NEW.id, NEW.room_number, NEW.room_type);
+END;
+
+CREATE TRIGGER rooms_search_au AFTER UPDATE OF room_number, room_type ON rooms BEGIN
+    DELETE FROM room_search_fts WHERE rowid = OLD.id;
+    INSERT INTO room_search_fts (rowid, room_number, room_type)
+    VALUES (NEW.id, NEW.room_number, NEW.room_type);
+END;
+
+CREATE TRIGGER rooms_search_ad AFTER DELETE ON rooms BEGIN
+    DELETE FROM room_search_fts WHERE rowid = OLD.id;
+END;
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS students_search_ai;
+DROP TRIGGER IF EXISTS students_search_au;
+DROP TRIGGER IF EXISTS students_search_ad;
+DROP TRIGGER IF EXISTS users_search_au;
+DROP TRIGGER IF EXISTS rooms_search_ai;
+DROP TRIGGER IF EXISTS rooms_search_au;
+DROP TRIGGER IF EXISTS rooms_search_ad;
+DROP TABLE IF EXISTS student_search_fts;
+DROP TABLE IF EXISTS room_search_fts;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0007_paymentmonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
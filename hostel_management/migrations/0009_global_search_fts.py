@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Rows of every searchable table share one FTS5 index. The rowid packs the source
+# row id with a kind code (rowid = id * 4 + code) so triggers can address entries directly.
+SOURCES = [
+    # (kind, code, table, title expression, body expression, watched columns)
+    ('complaint', 0, 'complaints', "{row}.title", "{row}.description", 'title, description'),
+    ('notification', 1, 'notifications', "{row}.title", "{row}.message", 'title, message'),
+    ('meal', 2, 'meals', "{row}.meal_type || ' ' || {row}.date", "{row}.menu", 'meal_type, date, menu'),
+    ('meal_feedback', 3, 'meal_feedbacks', "NULL", "{row}.feedback_text", 'feedback_text'),
+]
+
+
+def _insert(kind, code, title, body, row, source=''):
+    return f"""
+    INSERT INTO global_search_fts (rowid, kind, object_id, title, body)
+    SELECT {row}.id * 4 + {code}, '{kind}', {row}.id, {title.format(row=row)}, {body.format(row=row)}{source};"""
+
+
+def _delete(code, row):
+    return f"""
+    DELETE FROM global_search_fts WHERE rowid = {row}.id * 4 + {code};"""
+
+
+CREATE_SQL = """
+CREATE VIRTUAL TABLE global_search_fts USING fts5(
+    kind UNINDEXED, object_id UNINDEXED, title, body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '1 2 3'
+);
+"""
+DROP_SQL = ""
+
+for kind, code, table, title, body, columns in SOURCES:
+    CREATE_SQL += _insert(kind, code, title, body, 't', f' FROM {table} t') + f"""
+
+CREATE TRIGGER {table}_global_search_ai AFTER INSERT ON {table} BEGIN{_insert(kind, code, title, body, 'NEW')}
+END;
+
+CREATE TRIGGER {table}_global_search_au AFTER UPDATE OF {columns} ON {table} BEGIN{_delete(code, 'OLD')}{_insert(kind, code, title, body, 'NEW')}
+END;
+
+CREATE TRIGGER {table}_global_search_ad AFTER DELETE ON {table} BEGIN{_delete(code, 'OLD')}
+END;
+"""
+    DROP_SQL += f"""
+DROP TRIGGER IF EXISTS {table}_global_search_ai;
+DROP TRIGGER IF EXISTS {table}_global_search_au;
+DROP TRIGGER IF EXISTS {table}_global_search_ad;"""
+
+DROP_SQL += """
+DROP TABLE IF EXISTS global_search_fts;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0008_student_room_search_fts'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0009_global_search_fts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendance',
+            name='attendances_date_234e8d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'id'], name='attendances_date_0d5117_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['created_at', 'id'], name='complaints_created_c23f73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodshortage',
+            index=models.Index(fields=['created_at', 'id'], name='food_shorta_created_7256d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meal',
+            index=models.Index(fields=['date', 'id'], name='meals_date_759a6b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mealfeedback',
+            index=models.Index(fields=['created_at', 'id'], name='meal_feedba_created_588f7c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'created_at', 'id'], name='notificatio_recipie_1609ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='payments_created_d7f01e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='penalty',
+            index=models.Index(fields=['created_at', 'id'], name='penalties_created_9651e9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['created_at', 'id'], name='staff_created_8f7766_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stayextensionrequest',
+            index=models.Index(fields=['created_at', 'id'], name='stay_extens_created_084f4f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created_at', 'id'], name='students_created_1b3cf3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at', 'id'], name='users_created_1b562c_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:37
+
+from django.db import migrations, models
+
+
+def backfill_incident_dates(apps, schema_editor):
+    # Night-shift penalties used to be kept once per student with no attendance date; date each one
+    # by the day it was issued. A second penalty for the same student and day keeps a NULL date,
+    # which the unique constraint below ignores, rather than being dropped.
+    Penalty = apps.get_model('hostel_management', 'Penalty')
+    taken = set(
+        Penalty.objects.filter(penalty_type='night_shift', incident_date__isnull=False)
+        .values_list('student_id', 'incident_date')
+    )
+    dated = []
+    penalties = Penalty.objects.filter(penalty_type='night_shift', incident_date__isnull=True).order_by('id')
+    for penalty in penalties.only('id', 'student_id', 'issued_date').iterator(chunk_size=1000):
+        key = (penalty.student_id, penalty.issued_date.date())
+        if key in taken:
+            continue
+        taken.add(key)
+        penalty.incident_date = key[1]
+        dated.append(penalty)
+    Penalty.objects.bulk_update(dated, ['incident_date'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='penalty',
+            name='incident_date',
+            field=models.DateField(blank=True, help_text='Attendance date a night-shift penalty was issued for', null=True),
+        ),
+        migrations.RunPython(backfill_incident_dates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='penalty',
+            constraint=models.UniqueConstraint(condition=models.Q(('penalty_type', 'night_shift')), fields=('student', 'incident_date'), name='unique_night_shift_penalty_per_day'),
+        ),
+    ]
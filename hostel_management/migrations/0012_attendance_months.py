@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+from array import array
+from calendar import monthrange
+import sys
+
+SHIFTS = ['Present', 'Absent', 'Holiday', 'Leave', 'Null']
+
+
+def backfill_attendance_months(apps, schema_editor):
+    Attendance = apps.get_model('hostel_management', 'Attendance')
+    AttendanceMonth = apps.get_model('hostel_management', 'AttendanceMonth')
+    index = {shift: i for i, shift in enumerate(SHIFTS)}
+    null = index['Null']
+
+    packed = {}
+    rows = Attendance.objects.order_by().values_list(
+        'student_id', 'date', 'morning_shift', 'evening_shift', 'night_shift', 'summary'
+    )
+    for student_id, day, morning, evening, night, summary in rows.iterator(chunk_size=5000):
+        month = day.replace(day=1)
+        codes = packed.get((student_id, month))
+        if codes is None:
+            codes = packed[(student_id, month)] = array('H', [0] * monthrange(month.year, month.month)[1])
+        # Legacy rows can hold values outside SHIFTS (e.g. 'True'/'False'); store those as 'Null'
+        morning, evening, night, summary = (index.get(shift, null) for shift in (morning, evening, night, summary))
+        codes[day.day - 1] = 1 + ((morning * 5 + evening) * 5 + night) * 5 + summary
+
+    months = []
+    for (student_id, month), codes in packed.items():
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        months.append(AttendanceMonth(student_id=student_id, month=month, days=codes.tobytes()))
+    AttendanceMonth.objects.bulk_create(months, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0011_penalty_incident_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('days', models.BinaryField(help_text='Little-endian uint16 per day of the month; 0 means not marked')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_months', to='hostel_management.student')),
+            ],
+            options={
+                'db_table': 'attendance_months',
+                'unique_together': {('student', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill_attendance_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0013_attendance_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, help_text='Deliver to every user with this role', max_length=20)),
+                ('notification_type', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not picked up by workers before this time')),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'notification_outbox',
+            },
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='outbox_id',
+            field=models.BigIntegerField(blank=True, help_text='Outbox entry this was delivered from', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('outbox_id', 'recipient'), name='unique_outbox_delivery'),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='recipient',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(fields=['available_at', 'id'], name='notificatio_availab_6f82ba_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0015_unread_notification_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodshortage',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='food_shorta_status_79c59f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='payments_status_c94457_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined', 'id'], name='users_date_jo_12fc70_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0016_admin_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('oldest_at', models.DateTimeField()),
+                ('newest_at', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('payload', models.BinaryField(help_text='zlib-compressed JSON list of the archived notifications, newest first')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notification_archives',
+                'indexes': [models.Index(fields=['recipient', 'newest_at', 'id'], name='notificatio_recipie_28e96d_idx')],
+            },
+        ),
+    ]
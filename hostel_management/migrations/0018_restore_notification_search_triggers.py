@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Adding unique_outbox_delivery in 0014 made SQLite rebuild the notifications table, which
+# dropped the global search triggers 0009 created on it. Recreate them and reindex the
+# notifications written since. Any later migration that rebuilds notifications must do the same.
+CREATE_SQL = """
+DROP TRIGGER IF EXISTS notifications_global_search_ai;
+DROP TRIGGER IF EXISTS notifications_global_search_au;
+DROP TRIGGER IF EXISTS notifications_global_search_ad;
+
+DELETE FROM global_search_fts WHERE kind = 'notification';
+
+INSERT INTO global_search_fts (rowid, kind, object_id, title, body)
+SELECT t.id * 4 + 1, 'notification', t.id, t.title, t.message FROM notifications t;
+
+CREATE TRIGGER notifications_global_search_ai AFTER INSERT ON notifications BEGIN
+    INSERT INTO global_search_fts (rowid, kind, object_id, title, body)
+    SELECT NEW.id * 4 + 1, 'notification', NEW.id, NEW.title, NEW.message;
+END;
+
+CREATE TRIGGER notifications_global_search_au AFTER UPDATE OF title, message ON notifications BEGIN
+    DELETE FROM global_search_fts WHERE rowid = OLD.id * 4 + 1;
+    INSERT INTO global_search_fts (rowid, kind, object_id, title, body)
+    SELECT NEW.id * 4 + 1, 'notification', NEW.id, NEW.title, NEW.message;
+END;
+
+CREATE TRIGGER notifications_global_search_ad AFTER DELETE ON notifications BEGIN
+    DELETE FROM global_search_fts WHERE rowid = OLD.id * 4 + 1;
+END;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0017_notification_archives'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
@@ -24,6 +25,11 @@ class User(AbstractUser):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['date_joined', 'id']),
+        ]
 
 
 class Student(models.Model):
@@ -46,6 +52,10 @@ class Student(models.Model):
 
     class Meta:
         db_table = 'students'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.student_id}"
@@ -72,6 +82,9 @@ class Room(models.Model):
 
     class Meta:
         db_table = 'rooms'
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"Room {self.room_number} - {self.room_type}"
@@ -113,6 +126,11 @@ class Payment(models.Model):
 
     class Meta:
         db_table = 'payments'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['payment_date']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.amount} - {self.status}"
@@ -143,33 +161,38 @@ class Attendance(models.Model):
     class Meta:
         db_table = 'attendances'
         unique_together = ['student', 'date']
+        indexes = [
+            models.Index(fields=['date', 'id']),
+            models.Index(fields=['date', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.date} - {'Present' if self.is_present else 'Absent'}"
 
     def calculate_summary(self):
         """Calculate daily summary based on shifts"""
-        morning = self.morning_shift
-        evening = self.evening_shift
-        night = self.night_shift
-        
-        # If both morning and evening are present, summary is present
-        if morning == 'Present' and evening == 'Present':
-            return 'Present'
-        # If both morning and evening are absent, summary is absent
-        elif morning == 'Absent' and evening == 'Absent':
-            return 'Absent'
-        # If both morning and evening are holiday, summary is holiday
-        elif morning == 'Holiday' and evening == 'Holiday':
-            return 'Holiday'
-        # If both morning and evening are leave, summary is leave
-        elif morning == 'Leave' and evening == 'Leave':
-            return 'Leave'
-        # Mixed shifts - default to present if at least one is present
-        elif morning == 'Present' or evening == 'Present':
-            return 'Present'
-        else:
-            return 'Absent'
+        return shift_summary(self.morning_shift, self.evening_shift)
+
+
+def shift_summary(morning, evening):
+    """Daily attendance summary for the given morning and evening shifts"""
+    # If both morning and evening are present, summary is present
+    if morning == 'Present' and evening == 'Present':
+        return 'Present'
+    # If both morning and evening are absent, summary is absent
+    elif morning == 'Absent' and evening == 'Absent':
+        return 'Absent'
+    # If both morning and evening are holiday, summary is holiday
+    elif morning == 'Holiday' and evening == 'Holiday':
+        return 'Holiday'
+    # If both morning and evening are leave, summary is leave
+    elif morning == 'Leave' and evening == 'Leave':
+        return 'Leave'
+    # Mixed shifts - default to present if at least one is present
+    elif morning == 'Present' or evening == 'Present':
+        return 'Present'
+    else:
+        return 'Absent'
 
 
 class Penalty(models.Model):
@@ -190,11 +213,22 @@ class Penalty(models.Model):
     issued_date = models.DateTimeField(auto_now_add=True)
     is_paid = models.BooleanField(default=False)
     paid_date = models.DateTimeField(null=True, blank=True)
+    incident_date = models.DateField(null=True, blank=True, help_text='Attendance date a night-shift penalty was issued for')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'penalties'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'incident_date'],
+                condition=models.Q(penalty_type='night_shift'),
+                name='unique_night_shift_penalty_per_day',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.penalty_type} - {self.amount}"
@@ -219,6 +253,9 @@ class Meal(models.Model):
     class Meta:
         db_table = 'meals'
         unique_together = ['meal_type', 'date']
+        indexes = [
+            models.Index(fields=['date', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.meal_type} - {self.date}"
@@ -235,6 +272,9 @@ class MealFeedback(models.Model):
     class Meta:
         db_table = 'meal_feedbacks'
         unique_together = ['student', 'meal']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.meal.meal_type} - {self.rating}"
@@ -270,6 +310,9 @@ class Complaint(models.Model):
 
     class Meta:
         db_table = 'complaints'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.title} - {self.status}"
@@ -296,6 +339,9 @@ class StayExtensionRequest(models.Model):
 
     class Meta:
         db_table = 'stay_extension_requests'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.current_checkout_date} to {self.requested_checkout_date}"
@@ -318,11 +364,19 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     related_object_id = models.IntegerField(null=True, blank=True)
     related_object_type = models.CharField(max_length=50, blank=True, null=True)
+    outbox_id = models.BigIntegerField(null=True, blank=True, help_text='Outbox entry this was delivered from')
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'created_at', 'id']),
+        ]
+        constraints = [
+            # Delivering an outbox entry twice must not notify anyone twice
+            models.UniqueConstraint(fields=['outbox_id', 'recipient'], name='unique_outbox_delivery'),
+        ]
 
     def __str__(self):
         return f"{self.recipient.username} - {self.title}"
@@ -350,6 +404,9 @@ class Staff(models.Model):
 
     class Meta:
         db_table = 'staff'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.staff_type}"
@@ -376,6 +433,10 @@ class FoodShortage(models.Model):
 
     class Meta:
         db_table = 'food_shortages'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status', 'created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.meal.meal_type} - {self.shortage_type} - {self.status}"
@@ -411,3 +472,126 @@ class SystemSettings(models.Model):
             }
         )
         return settings
+
+
+class DashboardCounter(models.Model):
+    """Incrementally maintained dashboard counter, kept in sync by model signals"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dashboard_counters'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ReportTableVersion(models.Model):
+    """Write version of a table, used to invalidate cached reports across worker processes"""
+    table_name = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=1)
+
+    class Meta:
+        db_table = 'report_table_versions'
+
+    def __str__(self):
+        return f"{self.table_name} v{self.version}"
+
+
+class AttendanceDailyRollup(models.Model):
+    """Number of attendance records per day and summary status"""
+    date = models.DateField()
+    summary = models.CharField(max_length=10, choices=Attendance.SHIFT_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'attendance_daily_rollups'
+        unique_together = ['date', 'summary']
+
+    def __str__(self):
+        return f"{self.date} - {self.summary}: {self.count}"
+
+
+class PaymentMonthlyRollup(models.Model):
+    """Payment count and amount per month, status and payment method"""
+    month = models.DateField(help_text='First day of the month')
+    status = models.CharField(max_length=20, choices=Payment.PAYMENT_STATUS_CHOICES)
+    payment_method = models.CharField(max_length=20, choices=Payment.PAYMENT_METHOD_CHOICES)
+    payment_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'payment_monthly_rollups'
+        unique_together = ['month', 'status', 'payment_method']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} - {self.status} - {self.payment_method}: {self.payment_count}"
+
+
+class AttendanceMonth(models.Model):
+    """One student's attendance for a month, packed as a 16-bit shift code per day"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_months')
+    month = models.DateField(help_text='First day of the month')
+    days = models.BinaryField(help_text='Little-endian uint16 per day of the month; 0 means not marked')
+
+    class Meta:
+        db_table = 'attendance_months'
+        unique_together = ['student', 'month']
+
+    def __str__(self):
+        return f"{self.student_id} - {self.month:%Y-%m}"
+
+
+class UnreadNotificationCount(models.Model):
+    """Number of unread notifications per user, kept up to date as notifications are created and read"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'unread_notification_counts'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count}"
+
+
+class NotificationOutbox(models.Model):
+    """Notification waiting to be delivered, written in the same transaction as the change it reports"""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    role = models.CharField(max_length=20, blank=True, help_text='Deliver to every user with this role')
+    notification_type = models.CharField(max_length=50)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text='Not picked up by workers before this time')
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'notification_outbox'
+        indexes = [
+            models.Index(fields=['available_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient_id or self.role} - {self.title}"
+
+
+class NotificationArchive(models.Model):
+    """A chunk of one user's notifications moved out of the notifications table by the retention policies"""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    oldest_at = models.DateTimeField()
+    newest_at = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    payload = models.BinaryField(help_text='zlib-compressed JSON list of the archived notifications, newest first')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'notification_archives'
+        indexes = [
+            models.Index(fields=['recipient', 'newest_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient_id} - {self.count} archived"
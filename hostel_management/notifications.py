@@ -0,0 +1,67 @@
+"""
+Notification fan-out.
+A notification sent to many users is built once and inserted with one bulk_create
+per batch of recipients instead of one INSERT each. Bulk inserts send no model
+signals, so the report cache and the unread counts are updated here; the search index
+triggers and the event stream (which polls for new notification ids) pick up the rows on their own.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+
+from .models import Notification, User
+from .report_cache import bump_table_versions
+from .unread import adjust_unread_counts
+
+NOTIFICATION_BATCH_SIZE = 1000
+NOTIFICATION_TABLE = Notification._meta.db_table
+
+
+def notify_users(recipients, notification_type, title, message, outbox_id=None):
+    """
+    Send the same notification to every recipient (users or user ids), returning the number of recipients.
+    With an outbox_id, recipients who already got that outbox entry are skipped.
+    """
+    fields = {'notification_type': notification_type, 'title': title, 'message': message, 'outbox_id': outbox_id}
+    sent = 0
+    batch = []
+    with transaction.atomic():
+        for recipient in recipients:
+            recipient_id = recipient.pk if isinstance(recipient, User) else recipient
+            batch.append(Notification(recipient_id=recipient_id, **fields))
+            if len(batch) == NOTIFICATION_BATCH_SIZE:
+                sent += _insert(batch, outbox_id)
+                batch = []
+        if batch:
+            sent += _insert(batch, outbox_id)
+        if sent:
+            transaction.on_commit(lambda: bump_table_versions(NOTIFICATION_TABLE))
+    return sent
+
+
+def notify_role(role, notification_type, title, message, outbox_id=None):
+    """Send a notification to every user with the given role"""
+    recipients = User.objects.filter(role=role).values_list('id', flat=True)
+    return notify_users(
+        recipients.iterator(chunk_size=NOTIFICATION_BATCH_SIZE), notification_type, title, message, outbox_id
+    )
+
+
+def _insert(batch, outbox_id):
+    if outbox_id is not None:
+        # Recipients who already got this outbox entry from an earlier delivery
+        delivered = set(Notification.objects.filter(
+            outbox_id=outbox_id, recipient_id__in=[n.recipient_id for n in batch]
+        ).values_list('recipient_id', flat=True))
+        batch = [n for n in batch if n.recipient_id not in delivered]
+    # Conflicts left on (outbox_id, recipient) are deliveries committed by another worker meanwhile
+    Notification.objects.bulk_create(batch, ignore_conflicts=outbox_id is not None)
+    if outbox_id is not None and batch:
+        # Skipped rows were counted by the worker that inserted them; ours carry the created_at set here
+        stored = set(Notification.objects.filter(
+            outbox_id=outbox_id, recipient_id__in=[n.recipient_id for n in batch]
+        ).values_list('recipient_id', 'created_at'))
+        batch = [n for n in batch if (n.recipient_id, n.created_at) in stored]
+    adjust_unread_counts(Counter(n.recipient_id for n in batch))
+    return len(batch)
@@ -0,0 +1,120 @@
+"""
+Transactional outbox for notifications.
+Request handlers enqueue a notification in the same transaction as the change it reports,
+so it is sent if and only if the change commits, and return without doing the fan-out.
+A worker (the run_notification_worker command, or an in-process thread started after
+each commit) claims pending entries in batches and delivers them. Entries are retried
+until delivered, and delivery is idempotent, so no recipient gets the same notification
+twice even if a worker dies halfway or two workers pick up the same entry.
+"""
+
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import NotificationOutbox
+from .notifications import notify_role, notify_users
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 100
+# A claimed entry becomes available to other workers again if not delivered within the lease
+OUTBOX_LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+_executor = None
+
+
+def enqueue_notification(notification_type, title, message, recipient=None, role=''):
+    """Queue a notification for one recipient or every user with a role, delivered after the transaction commits"""
+    if (recipient is None) == (not role):
+        raise ValueError('Give either a recipient or a role')
+    entry = NotificationOutbox.objects.create(
+        recipient=recipient, role=role, notification_type=notification_type, title=title, message=message
+    )
+    if getattr(settings, 'NOTIFICATION_OUTBOX_THREAD', True):
+        transaction.on_commit(schedule_delivery)
+    return entry
+
+
+def claim_entries(batch_size=OUTBOX_BATCH_SIZE, lease=OUTBOX_LEASE):
+    """Lease up to batch_size pending entries to this worker and return them"""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    pending = NotificationOutbox.objects.filter(available_at__lte=now).order_by('available_at', 'id')
+    ids = list(pending.values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    # Only entries still available when the update runs are taken, so concurrent workers never share one
+    NotificationOutbox.objects.filter(id__in=ids, available_at__lte=now).update(
+        available_at=now + lease, claim_token=token
+    )
+    return list(NotificationOutbox.objects.filter(claim_token=token).order_by('id'))
+
+
+def deliver_entry(entry):
+    """Create the entry's notifications and remove it from the outbox in one transaction"""
+    with transaction.atomic():
+        if entry.role:
+            notify_role(entry.role, entry.notification_type, entry.title, entry.message, outbox_id=entry.id)
+        else:
+            notify_users([entry.recipient_id], entry.notification_type, entry.title, entry.message, outbox_id=entry.id)
+        NotificationOutbox.objects.filter(id=entry.id).delete()
+
+
+def retry_delay(attempts):
+    return min(timedelta(seconds=2 ** attempts), MAX_RETRY_DELAY)
+
+
+def deliver_outbox(batch_size=OUTBOX_BATCH_SIZE, lease=OUTBOX_LEASE):
+    """Deliver one batch of pending entries, returning (delivered, failed)"""
+    delivered = failed = 0
+    for entry in claim_entries(batch_size, lease):
+        try:
+            deliver_entry(entry)
+            delivered += 1
+        except Exception as e:
+            failed += 1
+            logger.exception('Delivering notification outbox entry %s failed', entry.id)
+            attempts = entry.attempts + 1
+            NotificationOutbox.objects.filter(id=entry.id).update(
+                attempts=attempts,
+                available_at=timezone.now() + retry_delay(attempts),
+                claim_token='',
+                last_error=str(e),
+            )
+    return delivered, failed
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Deliver batches until no entry is ready, returning (delivered, failed)"""
+    delivered = failed = 0
+    while True:
+        batch_delivered, batch_failed = deliver_outbox(batch_size)
+        delivered += batch_delivered
+        failed += batch_failed
+        # Stop when nothing is ready or everything claimed failed and is backing off
+        if not batch_delivered:
+            return delivered, failed
+
+
+def _drain_in_thread():
+    try:
+        drain_outbox()
+    except Exception:
+        logger.exception('Notification outbox worker thread failed')
+    finally:
+        connections.close_all()
+
+
+def schedule_delivery():
+    """Drain the outbox on a background thread; entries it misses are left for the worker command"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification-outbox')
+    _executor.submit(_drain_in_thread)
@@ -0,0 +1,99 @@
+"""
+Night-shift penalty reconciliation.
+A student has exactly one night-shift penalty for every date they were marked present
+on the night shift. Reconciliation works on whole batches of marks (or a date range of
+stored attendance), so each run costs a fixed number of statements and re-running it is a no-op.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Penalty
+from .report_cache import bump_table_versions
+
+PENALTY_TABLE = Penalty._meta.db_table
+NIGHT_SHIFT_PENALTY_AMOUNT = 500
+NIGHT_SHIFT_PENALTY_REASON = 'Present during night shift (after 8 PM)'
+
+
+def night_shift_penalty(student_id, day, issued_by=None):
+    return Penalty(
+        student_id=student_id,
+        penalty_type='night_shift',
+        amount=NIGHT_SHIFT_PENALTY_AMOUNT,
+        reason=NIGHT_SHIFT_PENALTY_REASON,
+        issued_by=issued_by,
+        incident_date=day,
+    )
+
+
+def reconcile_night_shift_penalties(marks, issued_by=None):
+    """
+    Bring night-shift penalties in line with (student id, date, night shift) marks.
+    Returns (issued, withdrawn).
+    """
+    marks = {(student_id, day): night for student_id, day, night in marks}
+    if not marks:
+        return 0, 0
+    students = {student_id for student_id, _ in marks}
+    days = {day for _, day in marks}
+
+    existing = {
+        (student_id, day): penalty_id
+        for penalty_id, student_id, day in Penalty.objects.filter(
+            penalty_type='night_shift', student_id__in=students, incident_date__in=days
+        ).values_list('id', 'student_id', 'incident_date')
+    }
+    # The batch may span several dates for different students, so keep only the marked pairs
+    to_issue = [key for key, night in marks.items() if night == 'Present' and key not in existing]
+    to_withdraw = [existing[key] for key, night in marks.items() if night != 'Present' and key in existing]
+
+    with transaction.atomic():
+        if to_issue:
+            # A concurrent marking of the same day may have issued some of these already
+            Penalty.objects.bulk_create(
+                [night_shift_penalty(student_id, day, issued_by) for student_id, day in to_issue],
+                ignore_conflicts=True,
+            )
+            transaction.on_commit(lambda: bump_table_versions(PENALTY_TABLE))
+        if to_withdraw:
+            # Deleted through the ORM so the report cache signals still fire
+            Penalty.objects.filter(id__in=to_withdraw).delete()
+    return len(to_issue), len(to_withdraw)
+
+
+def reconcile_night_shift_penalties_for_range(start_date, end_date):
+    """Reconcile night-shift penalties against stored attendance for a date range, returning (issued, withdrawn)"""
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {PENALTY_TABLE}
+                (student_id, penalty_type, amount, reason, issued_by_id, issued_date,
+                 is_paid, paid_date, incident_date, created_at, updated_at)
+            SELECT a.student_id, 'night_shift', %s, %s, NULL, %s, 0, NULL, a.date, %s, %s
+            FROM attendances a
+            WHERE a.date BETWEEN %s AND %s
+              AND a.night_shift = 'Present'
+              AND NOT EXISTS (
+                  SELECT 1 FROM {PENALTY_TABLE} p
+                  WHERE p.penalty_type = 'night_shift'
+                    AND p.student_id = a.student_id
+                    AND p.incident_date = a.date
+              )
+        """, [NIGHT_SHIFT_PENALTY_AMOUNT, NIGHT_SHIFT_PENALTY_REASON, now, now, now, start_date, end_date])
+        issued = cursor.rowcount
+        cursor.execute(f"""
+            DELETE FROM {PENALTY_TABLE}
+            WHERE penalty_type = 'night_shift'
+              AND incident_date BETWEEN %s AND %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM attendances a
+                  WHERE a.student_id = {PENALTY_TABLE}.student_id
+                    AND a.date = {PENALTY_TABLE}.incident_date
+                    AND a.night_shift = 'Present'
+              )
+        """, [start_date, end_date])
+        withdrawn = cursor.rowcount
+        if issued or withdrawn:
+            transaction.on_commit(lambda: bump_table_versions(PENALTY_TABLE))
+    return issued, withdrawn
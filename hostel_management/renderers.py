@@ -0,0 +1,97 @@
+"""
+Response renderers for the REST API.
+FastJSONRenderer uses orjson when it is installed and a reusable stdlib encoder otherwise;
+MessagePackRenderer is offered during content negotiation when msgpack is installed.
+"""
+
+import datetime
+import decimal
+import json
+
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _encode_datetime(value):
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+# Exact-type dispatch for the values API responses carry most often; anything else goes through DRF's encoder
+_ENCODERS = {
+    datetime.datetime: _encode_datetime,
+    datetime.date: datetime.date.isoformat,
+    decimal.Decimal: float,
+}
+_drf_default = JSONEncoder().default
+
+
+def encode_default(value):
+    """Convert a value json/orjson/msgpack cannot encode natively, the same way DRF's JSONEncoder does"""
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    return _drf_default(value)
+
+
+_stdlib_encoder = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(',', ':'), default=encode_default
+)
+
+
+def dumps_stdlib(data):
+    return _stdlib_encoder.encode(data).encode('utf-8')
+
+
+def dumps_orjson(data):
+    return orjson.dumps(
+        data,
+        default=encode_default,
+        option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+dumps = dumps_orjson if orjson is not None else dumps_stdlib
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer with the same output for compact responses, encoded by orjson when available"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Indented output is only asked for by the browsable API
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escape the line separators that are valid JSON but not valid JavaScript, as JSONRenderer does
+        return dumps(data).replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Binary MessagePack responses for clients sending Accept: application/msgpack"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+API_RENDERER_CLASSES = [FastJSONRenderer, BrowsableAPIRenderer]
+if msgpack is not None:
+    API_RENDERER_CLASSES.append(MessagePackRenderer)
@@ -0,0 +1,185 @@
+"""
+Versioned result cache for the raw-SQL reports in dashboard_queries.py.
+
+Every cached report declares the tables it reads. Writes to those tables bump a
+per-table version, and the versions are part of the cache key, so a report is
+recomputed only after its data actually changed. Results are kept in a small
+per-process LRU with a TTL and, when the configured Django cache is shared
+between processes (file, memcached, redis), in that cache as well.
+
+With a process-local backend such as locmem, table versions are read from the
+report_table_versions table instead so every gunicorn worker sees the same
+versions; with a shared backend they live in the cache itself and a cache hit
+costs no SQL at all.
+
+Settings (all optional):
+    REPORT_CACHE_ALIAS        Django cache alias to use (default 'default')
+    REPORT_CACHE_TTL          seconds a result may be served (default 300)
+    REPORT_CACHE_MAX_ENTRIES  size of the per-process LRU (default 256)
+"""
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F
+
+KEY_PREFIX = 'report_cache'
+
+# db_table names read by at least one cached report
+TRACKED_TABLES = set()
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a per-entry time-to-live"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LRUCache(
+    getattr(settings, 'REPORT_CACHE_MAX_ENTRIES', 256),
+    getattr(settings, 'REPORT_CACHE_TTL', 300),
+)
+_MISSING = object()
+
+
+def _cache():
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def _is_process_local(cache):
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def shared_cache():
+    """The report cache if it is shared between worker processes, otherwise None"""
+    cache = _cache()
+    return None if _is_process_local(cache) else cache
+
+
+def _version_key(table):
+    return f'{KEY_PREFIX}:version:{table}'
+
+
+def _fresh_version():
+    # Never restart at 1 after an eviction, or old results could match again
+    return time.time_ns()
+
+
+def get_table_versions(tables):
+    """Return {table: version} for the given tables"""
+    cache = _cache()
+    if _is_process_local(cache):
+        from .models import ReportTableVersion
+        versions = dict(
+            ReportTableVersion.objects.filter(table_name__in=tables)
+            .values_list('table_name', 'version')
+        )
+        return {table: versions.get(table, 0) for table in tables}
+
+    keys = {_version_key(table): table for table in tables}
+    found = cache.get_many(keys)
+    versions = {keys[key]: value for key, value in found.items()}
+    for key, table in keys.items():
+        if table not in versions:
+            cache.add(key, _fresh_version(), timeout=None)
+            versions[table] = cache.get(key)
+    return versions
+
+
+def bump_table_versions(*tables):
+    """Invalidate every cached report that reads any of the given tables"""
+    cache = _cache()
+    if _is_process_local(cache):
+        from .models import ReportTableVersion
+        for table in tables:
+            updated = ReportTableVersion.objects.filter(table_name=table).update(version=F('version') + 1)
+            if not updated:
+                ReportTableVersion.objects.get_or_create(table_name=table, defaults={'version': 1})
+        return
+
+    for table in tables:
+        try:
+            cache.incr(_version_key(table))
+        except ValueError:
+            cache.set(_version_key(table), _fresh_version(), timeout=None)
+
+
+def cached_report(*tables):
+    """
+    Cache a report function's result until one of its tables is written.
+    Relative date windows in the SQL (date('now', ...)) are covered by keying on today's date.
+    """
+    TRACKED_TABLES.update(tables)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            versions = get_table_versions(tables)
+            fingerprint = repr((
+                date.today().isoformat(),
+                sorted(versions.items()),
+                args,
+                sorted(kwargs.items()),
+            ))
+            key = '{}:{}:{}'.format(
+                KEY_PREFIX, func.__name__, hashlib.sha1(fingerprint.encode()).hexdigest()
+            )
+
+            result = _local.get(key, _MISSING)
+            if result is not _MISSING:
+                return result
+
+            cache = _cache()
+            shared = not _is_process_local(cache)
+            if shared:
+                result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = func(*args, **kwargs)
+                if shared:
+                    cache.set(key, result, timeout=_local.ttl)
+            _local.set(key, result)
+            return result
+
+        wrapper.uncached = func
+        wrapper.tables = tables
+        return wrapper
+
+    return decorator
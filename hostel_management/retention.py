@@ -0,0 +1,222 @@
+"""
+Notification retention.
+Old notifications are moved out of the notifications table by a policy per notification_type,
+so per-user queries only ever touch a recipient's recent working set. Each batch is selected,
+archived and deleted in its own short transaction, so a run never holds locks for long and can
+be stopped at any point. Archived notifications are kept per user as zlib-compressed JSON chunks
+of up to ARCHIVE_CHUNK_SIZE, filling the user's newest chunk before starting another, and are
+read back a page at a time with get_archived_notifications().
+Deletes go through raw SQL and send no model signals, so the unread counts and the report
+cache are updated here.
+
+Policies come from DEFAULT_POLICIES, overridden per type by the NOTIFICATION_RETENTION setting,
+e.g. {'payment': {'read_days': 730}, '*': {'unread_days': 365}} ('*' is every type not listed):
+    read_days    archive read notifications older than this many days (None keeps them)
+    unread_days  archive unread notifications older than this many days (None keeps them)
+    archive      False to delete them without archiving
+"""
+
+import base64
+import json
+import zlib
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Notification, NotificationArchive
+from .report_cache import bump_table_versions
+from .unread import adjust_unread_counts
+
+NOTIFICATION_TABLE = Notification._meta.db_table
+RETENTION_BATCH_SIZE = 500
+ARCHIVE_CHUNK_SIZE = 500
+ARCHIVE_FIELDS = [
+    'id', 'notification_type', 'title', 'message', 'is_read',
+    'related_object_id', 'related_object_type', 'created_at',
+]
+
+RetentionPolicy = namedtuple('RetentionPolicy', ['read_days', 'unread_days', 'archive'])
+
+DEFAULT_POLICIES = {
+    '*': RetentionPolicy(read_days=90, unread_days=None, archive=True),
+    'payment': RetentionPolicy(read_days=365, unread_days=None, archive=True),
+    # Menu and shortage notices are worthless once the meal is over
+    'meal': RetentionPolicy(read_days=14, unread_days=30, archive=False),
+    'food_shortage': RetentionPolicy(read_days=14, unread_days=30, archive=False),
+    'food_shortage_acknowledged': RetentionPolicy(read_days=14, unread_days=30, archive=False),
+}
+
+
+class InvalidArchiveCursor(ValueError):
+    """Raised for an archive cursor that cannot be decoded"""
+
+
+def get_policies():
+    """{notification_type: RetentionPolicy}, with '*' for every type not listed"""
+    policies = dict(DEFAULT_POLICIES)
+    for notification_type, overrides in getattr(settings, 'NOTIFICATION_RETENTION', {}).items():
+        policies[notification_type] = policies.get(notification_type, policies['*'])._replace(**overrides)
+    return policies
+
+
+def _expired(policies, now):
+    """Q matching every notification past its type's retention, or None if no policy expires anything"""
+    listed = [notification_type for notification_type in policies if notification_type != '*']
+    expired = Q()
+    for notification_type, policy in policies.items():
+        age = Q()
+        if policy.read_days is not None:
+            age |= Q(is_read=True, created_at__lt=now - timedelta(days=policy.read_days))
+        if policy.unread_days is not None:
+            age |= Q(is_read=False, created_at__lt=now - timedelta(days=policy.unread_days))
+        if not age:
+            continue
+        if notification_type == '*':
+            expired |= ~Q(notification_type__in=listed) & age
+        else:
+            expired |= Q(notification_type=notification_type) & age
+    return expired or None
+
+
+def apply_retention(batch_size=RETENTION_BATCH_SIZE, now=None):
+    """Archive or delete every notification past its type's retention, returning (archived, deleted)"""
+    policies = get_policies()
+    expired = _expired(policies, now or timezone.now())
+    if expired is None:
+        return 0, 0
+
+    archived = deleted = 0
+    while True:
+        with transaction.atomic():
+            # Locked so a notification read meanwhile is not deleted with a stale is_read
+            rows = list(
+                Notification.objects.filter(expired).select_for_update()
+                .order_by('recipient_id', 'created_at', 'id')
+                .values('recipient_id', *ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            to_archive = [
+                row for row in rows if policies.get(row['notification_type'], policies['*']).archive
+            ]
+            if to_archive:
+                _archive(to_archive)
+            _delete(rows)
+        archived += len(to_archive)
+        deleted += len(rows) - len(to_archive)
+        if len(rows) < batch_size:
+            break
+    return archived, deleted
+
+
+def _delete(rows):
+    ids = [row['id'] for row in rows]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {NOTIFICATION_TABLE} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids
+        )
+    unread = Counter(row['recipient_id'] for row in rows if not row['is_read'])
+    adjust_unread_counts({user_id: -count for user_id, count in unread.items()})
+    transaction.on_commit(lambda: bump_table_versions(NOTIFICATION_TABLE))
+
+
+def _pack(items):
+    return zlib.compress(json.dumps(items, separators=(',', ':')).encode())
+
+
+def _unpack(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+def _entry(item):
+    """(created_at, id, item) for sorting archived items"""
+    return parse_datetime(item['created_at']), item['id'], item
+
+
+def _archive(rows):
+    """Add rows to their recipients' archives, topping up each recipient's newest chunk first"""
+    by_recipient = defaultdict(list)
+    for row in rows:
+        item = {field: row[field] for field in ARCHIVE_FIELDS}
+        item['created_at'] = item['created_at'].isoformat()
+        by_recipient[row['recipient_id']].append(_entry(item))
+
+    open_chunks = {
+        chunk.recipient_id: chunk
+        for chunk in NotificationArchive.objects.filter(
+            recipient_id__in=list(by_recipient), count__lt=ARCHIVE_CHUNK_SIZE
+        ).order_by('newest_at', 'id')
+    }
+    created, updated = [], []
+    for recipient_id, entries in by_recipient.items():
+        chunk = open_chunks.get(recipient_id)
+        if chunk is not None:
+            entries.extend(_entry(item) for item in _unpack(chunk.payload))
+        entries.sort(key=lambda entry: entry[:2])
+        # Oldest first, so only the newest chunk is ever left part-full
+        for start in range(0, len(entries), ARCHIVE_CHUNK_SIZE):
+            part = entries[start:start + ARCHIVE_CHUNK_SIZE]
+            if start == 0 and chunk is not None:
+                target = chunk
+                updated.append(chunk)
+            else:
+                target = NotificationArchive(recipient_id=recipient_id)
+                created.append(target)
+            target.oldest_at = part[0][0]
+            target.newest_at = part[-1][0]
+            target.count = len(part)
+            target.payload = _pack([item for _, _, item in reversed(part)])
+
+    if updated:
+        NotificationArchive.objects.bulk_update(updated, ['oldest_at', 'newest_at', 'count', 'payload'])
+    if created:
+        NotificationArchive.objects.bulk_create(created)
+
+
+def get_archived_notifications(user_id, position=None, page_size=50):
+    """
+    One page of a user's archived notifications, newest first, after position (None for the first page).
+    Returns (items, position of the last item or None if it is the last page).
+    """
+    chunks = NotificationArchive.objects.filter(recipient_id=user_id).order_by('-newest_at', '-id')
+    if position is not None:
+        chunks = chunks.filter(oldest_at__lte=position[0])
+
+    found = []
+    for chunk in chunks.iterator(chunk_size=4):
+        # Chunks can overlap in time, so stop only once no later chunk can reach this page
+        if len(found) > page_size and chunk.newest_at < found[page_size][0]:
+            break
+        for item in _unpack(chunk.payload):
+            created_at, item_id, item = _entry(item)
+            if position is None or (created_at, item_id) < position:
+                found.append((created_at, item_id, item))
+        found.sort(key=lambda entry: entry[:2], reverse=True)
+        del found[page_size + 1:]
+
+    page = found[:page_size]
+    next_position = page[-1][:2] if len(found) > page_size else None
+    return [item for _, _, item in page], next_position
+
+
+def encode_archive_cursor(position):
+    created_at, item_id = position
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_archive_cursor(cursor):
+    """(created_at, id) from an archive cursor"""
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(item_id)
+    except Exception:
+        raise InvalidArchiveCursor('Invalid cursor')
@@ -0,0 +1,152 @@
+"""
+Rollup tables maintained incrementally alongside the raw rows they summarize.
+Writers describe what changed as {rollup key: delta} and apply it in one call,
+so single saves (via signals) and batch writes share the same code path.
+"""
+
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import AttendanceDailyRollup, PaymentMonthlyRollup
+from .report_cache import bump_table_versions
+
+ATTENDANCE_ROLLUP_TABLE = AttendanceDailyRollup._meta.db_table
+PAYMENT_ROLLUP_TABLE = PaymentMonthlyRollup._meta.db_table
+
+
+def attendance_rollup_key(attendance):
+    """Return the (date, summary) rollup key of an attendance row, or None if not loaded"""
+    if attendance.get_deferred_fields().intersection({'date', 'summary'}):
+        return None
+    return (attendance.date, attendance.summary)
+
+
+def attendance_deltas(changes):
+    """Turn (old key, new key) pairs into {key: delta}; a None key means absent"""
+    deltas = Counter()
+    for old_key, new_key in changes:
+        if old_key == new_key:
+            continue
+        if old_key is not None:
+            deltas[old_key] -= 1
+        if new_key is not None:
+            deltas[new_key] += 1
+    return deltas
+
+
+def apply_attendance_deltas(deltas):
+    """Add the given deltas to the daily attendance rollup"""
+    changed = False
+    for (day, summary), delta in deltas.items():
+        if not delta:
+            continue
+        changed = True
+        updated = AttendanceDailyRollup.objects.filter(date=day, summary=summary).update(count=F('count') + delta)
+        if not updated:
+            AttendanceDailyRollup.objects.get_or_create(date=day, summary=summary, defaults={'count': 0})
+            AttendanceDailyRollup.objects.filter(date=day, summary=summary).update(count=F('count') + delta)
+    if changed:
+        transaction.on_commit(lambda: bump_table_versions(ATTENDANCE_ROLLUP_TABLE))
+
+
+def rebuild_attendance_rollups(start_date=None, end_date=None):
+    """Recompute the daily attendance rollup from the raw attendances table"""
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append('date >= %s')
+        params.append(start_date)
+    if end_date:
+        conditions.append('date <= %s')
+        params.append(end_date)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {ATTENDANCE_ROLLUP_TABLE} {where}", params)
+        cursor.execute(f"""
+            INSERT INTO {ATTENDANCE_ROLLUP_TABLE} (date, summary, count)
+            SELECT date, summary, COUNT(*)
+            FROM attendances
+            {where}
+            GROUP BY date, summary
+        """, params)
+        rows = cursor.rowcount
+        transaction.on_commit(lambda: bump_table_versions(ATTENDANCE_ROLLUP_TABLE))
+    return rows
+
+
+def payment_rollup_entry(payment):
+    """Return ((month, status, method), amount) for a payment, or None if not loaded or not filled in yet"""
+    if payment.get_deferred_fields().intersection({'payment_date', 'status', 'payment_method', 'amount'}):
+        return None
+    if payment.payment_date is None or payment.amount is None:
+        return None
+    month = payment.payment_date.replace(day=1)
+    return ((month, payment.status, payment.payment_method), Decimal(payment.amount))
+
+
+def payment_deltas(changes):
+    """Turn (old entry, new entry) pairs into {key: [count delta, amount delta]}"""
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for old_entry, new_entry in changes:
+        if old_entry == new_entry:
+            continue
+        if old_entry is not None:
+            key, amount = old_entry
+            deltas[key][0] -= 1
+            deltas[key][1] -= amount
+        if new_entry is not None:
+            key, amount = new_entry
+            deltas[key][0] += 1
+            deltas[key][1] += amount
+    return deltas
+
+
+def apply_payment_deltas(deltas):
+    """Add the given deltas to the monthly payment rollup"""
+    changed = False
+    for (month, status, method), (count_delta, amount_delta) in deltas.items():
+        if not count_delta and not amount_delta:
+            continue
+        changed = True
+        rollup = PaymentMonthlyRollup.objects.filter(month=month, status=status, payment_method=method)
+        changes = {
+            'payment_count': F('payment_count') + count_delta,
+            'total_amount': F('total_amount') + amount_delta,
+        }
+        if not rollup.update(**changes):
+            PaymentMonthlyRollup.objects.get_or_create(month=month, status=status, payment_method=method)
+            rollup.update(**changes)
+    if changed:
+        transaction.on_commit(lambda: bump_table_versions(PAYMENT_ROLLUP_TABLE))
+
+
+def rebuild_payment_rollups(start_month=None, end_month=None):
+    """Recompute the monthly payment rollup from the raw payments table"""
+    month_expr = "date(payment_date, 'start of month')"
+    bounds = []
+    params = []
+    if start_month:
+        bounds.append('{} >= %s')
+        params.append(start_month.replace(day=1))
+    if end_month:
+        bounds.append('{} <= %s')
+        params.append(end_month.replace(day=1))
+    rollup_where = f"WHERE {' AND '.join(b.format('month') for b in bounds)}" if bounds else ''
+    source_where = f"WHERE {' AND '.join(b.format(month_expr) for b in bounds)}" if bounds else ''
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {PAYMENT_ROLLUP_TABLE} {rollup_where}", params)
+        cursor.execute(f"""
+            INSERT INTO {PAYMENT_ROLLUP_TABLE} (month, status, payment_method, payment_count, total_amount)
+            SELECT {month_expr}, status, payment_method, COUNT(*), SUM(amount)
+            FROM payments
+            {source_where}
+            GROUP BY {month_expr}, status, payment_method
+        """, params)
+        rows = cursor.rowcount
+        transaction.on_commit(lambda: bump_table_versions(PAYMENT_ROLLUP_TABLE))
+    return rows
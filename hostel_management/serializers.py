@@ -1,5 +1,11 @@
-from rest_framework import serializers
+from operator import itemgetter
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth import authenticate
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
 from .models import (
     User, Student, Room, Payment, Attendance, Penalty, Meal, 
     MealFeedback, Complaint, StayExtensionRequest, Notification, 
@@ -7,7 +13,238 @@ from .models import (
 )
 
 
-class UserSerializer(serializers.ModelSerializer):
+def parse_field_paths(value):
+    """Turn 'id,student.user.first_name' into {'id': {}, 'student': {'user': {'first_name': {}}}}"""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin honouring ?fields= and ?expand= on GET requests.
+    fields keeps only the named fields, with dotted paths reaching into nested serializers;
+    once expand is given, nested serializers it does not name are rendered as primary keys.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        params = request.query_params
+        fields = parse_field_paths(params['fields']) if 'fields' in params else None
+        expand = parse_field_paths(params['expand']) if 'expand' in params else None
+        if fields is not None or expand is not None:
+            self.restrict_fields(fields, expand)
+
+    def restrict_fields(self, fields, expand):
+        """Drop fields not in the fields tree and collapse nested serializers not in the expand tree"""
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name, field in list(self.fields.items()):
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            sub_fields = (fields or {}).get(name) or None
+            if expand is not None and name not in expand and not sub_fields:
+                source = {} if field.source == name else {'source': field.source}
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **source)
+            elif isinstance(field, SparseFieldsetMixin):
+                field.restrict_fields(sub_fields, None if expand is None else expand.get(name, {}))
+
+    def get_query_plan(self, model=None, prefix=''):
+        """
+        (select_related paths, only() paths) needed to render the current fields.
+        only() paths are None when a field reads a model method, so every column must be loaded.
+        """
+        model = model or self.Meta.model
+        related, columns, whole_row = [], [], False
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                whole_row = True
+                continue
+            if isinstance(field, SparseFieldsetMixin):
+                path = prefix + '__'.join(field.source_attrs)
+                related_model = _follow(model, field.source_attrs)
+                sub_related, sub_columns = field.get_query_plan(related_model, path + '__')
+                related += [path] + sub_related
+                columns += sub_columns if sub_columns is not None else [path]
+                continue
+            current, attrs = model, []
+            for attr in field.source_attrs:
+                try:
+                    model_field = current._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    # Computed from a method or property: load the whole row it is read from
+                    if not attrs:
+                        whole_row = True
+                    else:
+                        columns.append(prefix + '__'.join(attrs))
+                    break
+                attrs.append(attr)
+                if model_field.is_relation and attr != field.source_attrs[-1]:
+                    related.append(prefix + '__'.join(attrs))
+                    current = model_field.related_model
+            else:
+                columns.append(prefix + '__'.join(attrs))
+        return related, None if whole_row else columns
+
+    def optimize_queryset(self, queryset, extra_columns=()):
+        """Join and select only what the current fields render"""
+        related, columns = self.get_query_plan()
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if columns is not None:
+            queryset = queryset.only(*columns, *extra_columns)
+        return queryset
+
+
+def _follow(model, attrs):
+    for attr in attrs:
+        model = model._meta.get_field(attr).related_model
+    return model
+
+
+# Fields whose to_representation() returns values() output unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+    serializers.BooleanField, serializers.ReadOnlyField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesPlan:
+    """
+    Precomputed mapping from a serializer's readable fields to .values() keys.
+    Renders rows straight from values() dicts, without model instances, with the same output as serializer.data.
+    """
+
+    def __init__(self, serializer):
+        self.keys = []
+        self.fields = self._compile(serializer, serializer.Meta.model, '')
+
+    def render(self, rows):
+        """Serialize an iterable of values() dicts"""
+        fields = self.fields
+        return [{name: get(row) for name, get in fields} for row in rows]
+
+    def _compile(self, serializer, model, prefix):
+        fields = []
+        for field in serializer._readable_fields:
+            attrs = field.source_attrs
+            if isinstance(field, serializers.BaseSerializer):
+                path = prefix + '__'.join(attrs)
+                self.keys.append(path)
+                nested = self._compile(field, _follow(model, attrs), path + '__')
+                fields.append((field.field_name, _nested_getter(path, nested)))
+                continue
+
+            current, names = model, []
+            for i, attr in enumerate(attrs):
+                try:
+                    model_field = current._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    row_prefix = prefix + ''.join(f'{name}__' for name in names)
+                    fields.append((field.field_name, self._method_getter(field, current, row_prefix, attrs[i:])))
+                    break
+                names.append(attr)
+                if model_field.is_relation and i < len(attrs) - 1:
+                    current = model_field.related_model
+            else:
+                key = prefix + '__'.join(names)
+                self.keys.append(key)
+                fields.append((field.field_name, _value_getter(field, model_field, key)))
+        return fields
+
+    def _method_getter(self, field, model, prefix, attrs):
+        """Rebuild the row a model method reads from its columns and call it"""
+        columns = [(f.attname, prefix + f.name) for f in model._meta.concrete_fields]
+        self.keys.extend(key for _, key in columns)
+        pk_key = prefix + model._meta.pk.name
+
+        # Rows repeat across a page (one student, many attendance rows), so build each one once
+        cache = {}
+
+        def get(row):
+            pk = row[pk_key]
+            if pk is None:
+                return None
+            if pk not in cache:
+                value = model(**{attname: row[key] for attname, key in columns})
+                for attr in attrs:
+                    value = getattr(value, attr)
+                value = value() if callable(value) else value
+                cache[pk] = None if value is None else field.to_representation(value)
+            return cache[pk]
+        return get
+
+
+def _nested_getter(path, nested):
+    def get(row):
+        if row[path] is None:
+            return None
+        return {name: getter(row) for name, getter in nested}
+    return get
+
+
+def _value_getter(field, model_field, key):
+    if isinstance(model_field, models.FileField):
+        return _file_getter(field, model_field, key)
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return itemgetter(key)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_getter(field, key)
+    to_representation = field.to_representation
+
+    def get(row):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return get
+
+
+def _datetime_getter(field, key):
+    """DateTimeField.to_representation with the output timezone looked up once instead of per value"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        to_representation = field.to_representation
+        return lambda row: None if row[key] is None else to_representation(row[key])
+
+    def get(row):
+        value = row[key]
+        if not value:
+            return None
+        if timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = field.enforce_timezone(value)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return get
+
+
+def _file_getter(field, model_field, key):
+    """values() returns the stored file name; build the same absolute URL FileField would"""
+    request = field.context.get('request')
+    storage = model_field.storage
+
+    def get(row):
+        name = row[key]
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return get
+
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for User model"""
     class Meta:
         model = User
@@ -78,7 +315,7 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Student model"""
     user = UserSerializer(read_only=True)
     
@@ -95,7 +332,7 @@ class StudentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Room model"""
     class Meta:
         model = Room
@@ -103,7 +340,7 @@ class RoomSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Payment model"""
     student = StudentSerializer(read_only=True)
     verified_by = UserSerializer(read_only=True)
@@ -114,7 +351,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'verified_by', 'verified_at']
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Attendance model"""
     student = StudentSerializer(read_only=True)
     marked_by = UserSerializer(read_only=True)
@@ -127,7 +364,7 @@ class AttendanceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'marked_by', 'summary']
 
 
-class PenaltySerializer(serializers.ModelSerializer):
+class PenaltySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Penalty model"""
     student = StudentSerializer(read_only=True)
     issued_by = UserSerializer(read_only=True)
@@ -138,7 +375,7 @@ class PenaltySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'issued_by', 'issued_date']
 
 
-class MealSerializer(serializers.ModelSerializer):
+class MealSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Meal model"""
     prepared_by = UserSerializer(read_only=True)
 
@@ -148,7 +385,7 @@ class MealSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'prepared_by']
 
 
-class MealFeedbackSerializer(serializers.ModelSerializer):
+class MealFeedbackSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for MealFeedback model"""
     student = StudentSerializer(read_only=True)
     meal = MealSerializer(read_only=True)
@@ -159,7 +396,7 @@ class MealFeedbackSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ComplaintSerializer(serializers.ModelSerializer):
+class ComplaintSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Complaint model"""
     student = StudentSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
@@ -170,7 +407,7 @@ class ComplaintSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class StayExtensionRequestSerializer(serializers.ModelSerializer):
+class StayExtensionRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for StayExtensionRequest model"""
     student = StudentSerializer(read_only=True)
     approved_by = UserSerializer(read_only=True)
@@ -181,7 +418,7 @@ class StayExtensionRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_by', 'approved_at']
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Notification model"""
     recipient = UserSerializer(read_only=True)
 
@@ -191,7 +428,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class StaffSerializer(serializers.ModelSerializer):
+class StaffSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Staff model"""
     user = UserSerializer(read_only=True)
 
@@ -201,7 +438,7 @@ class StaffSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class FoodShortageSerializer(serializers.ModelSerializer):
+class FoodShortageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for FoodShortage model"""
     meal = MealSerializer(read_only=True)
     reported_by = UserSerializer(read_only=True)
@@ -224,6 +461,7 @@ class DashboardStatsSerializer(serializers.Serializer):
     pending_extension_requests = serializers.IntegerField()
     today_meals = serializers.IntegerField()
     total_staff = serializers.IntegerField()
+    unread_notifications = serializers.IntegerField()
     recent_notifications = serializers.ListField()
 
 
@@ -267,6 +505,23 @@ class BulkAttendanceSerializer(serializers.Serializer):
         return value
 
 
+class OfflineAttendanceMarkSerializer(serializers.Serializer):
+    """One attendance mark made offline, with the version of the row it was based on"""
+    student = serializers.IntegerField()
+    date = serializers.DateField()
+    morning_shift = serializers.ChoiceField(choices=Attendance.SHIFT_CHOICES)
+    evening_shift = serializers.ChoiceField(choices=Attendance.SHIFT_CHOICES)
+    night_shift = serializers.ChoiceField(choices=Attendance.SHIFT_CHOICES)
+    remarks = serializers.CharField(required=False, allow_blank=True, default='')
+    base_version = serializers.CharField(required=False, allow_null=True, default=None)
+
+
+class AttendanceSyncUploadSerializer(serializers.Serializer):
+    """Serializer for uploading offline attendance marks"""
+    marks = OfflineAttendanceMarkSerializer(many=True)
+    force = serializers.BooleanField(required=False, default=False)
+
+
 class PaymentVerificationSerializer(serializers.Serializer):
     """Serializer for payment verification"""
     payment_id = serializers.IntegerField()
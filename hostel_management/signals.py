@@ -0,0 +1,242 @@
+"""
+Model signal handlers for the hostel management system
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
+
+from .counters import COUNTERS_BY_MODEL, counted_flags, adjust_counter, recount_counter
+from .models import Attendance, Notification, Payment
+from .report_cache import TRACKED_TABLES, bump_table_versions
+from .attendance_months import attendance_day_change, write_attendance_days
+from .unread import adjust_unread_counts, forget_unread_count
+from .rollups import (
+    attendance_rollup_key, attendance_deltas, apply_attendance_deltas, rebuild_attendance_rollups,
+    payment_rollup_entry, payment_deltas, apply_payment_deltas, rebuild_payment_rollups
+)
+
+ATTENDANCE_MONTH_FIELDS = {'student_id', 'date', 'morning_shift', 'evening_shift', 'night_shift', 'summary'}
+UNREAD_UNKNOWN = object()
+
+
+def remember_counter_state(sender, instance, **kwargs):
+    """Remember which dashboard counters an instance was counted in when loaded"""
+    instance._counter_flags = counted_flags(instance)
+
+
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    """Apply the counter deltas caused by creating or updating an instance"""
+    if raw:
+        return
+    previous = {} if created else getattr(instance, '_counter_flags', {})
+    current = counted_flags(instance)
+    for name, counted in current.items():
+        was_counted = previous.get(name, False)
+        if was_counted is None or counted is None:
+            recount_counter(name)
+        else:
+            adjust_counter(name, int(counted) - int(was_counted))
+    instance._counter_flags = current
+
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    """Remove a deleted instance from the counters it was counted in"""
+    for name, counted in getattr(instance, '_counter_flags', {}).items():
+        if counted is None:
+            recount_counter(name)
+        elif counted:
+            adjust_counter(name, -1)
+
+
+def connect_counter_signals():
+    for model in COUNTERS_BY_MODEL:
+        post_init.connect(remember_counter_state, sender=model, dispatch_uid=f'counters_init_{model.__name__}')
+        post_save.connect(update_counters_on_save, sender=model, dispatch_uid=f'counters_save_{model.__name__}')
+        post_delete.connect(update_counters_on_delete, sender=model, dispatch_uid=f'counters_delete_{model.__name__}')
+
+
+def invalidate_cached_reports(sender, update_fields=None, **kwargs):
+    """Bump the version of a written table once the write is committed"""
+    table = sender._meta.db_table
+    if table not in TRACKED_TABLES:
+        return
+    # Logins only touch users.last_login, which no report reads
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    transaction.on_commit(lambda: bump_table_versions(table))
+
+
+def connect_report_cache_signals():
+    post_save.connect(invalidate_cached_reports, dispatch_uid='report_cache_save')
+    post_delete.connect(invalidate_cached_reports, dispatch_uid='report_cache_delete')
+
+
+def remember_attendance_rollup_key(sender, instance, **kwargs):
+    """Remember the (date, summary) an attendance row was counted under when loaded"""
+    instance._rollup_key = attendance_rollup_key(instance)
+
+
+def update_attendance_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move a saved attendance row to its new rollup bucket"""
+    if raw:
+        return
+    new_key = attendance_rollup_key(instance)
+    old_key = None if created else getattr(instance, '_rollup_key', None)
+    if not created and old_key is None:
+        # Loaded with deferred fields, so the previous bucket is unknown
+        rebuild_attendance_rollups(instance.date, instance.date)
+    else:
+        apply_attendance_deltas(attendance_deltas([(old_key, new_key)]))
+    instance._rollup_key = new_key
+
+
+def capture_attendance_rollup_key(sender, instance, **kwargs):
+    """Look up the rollup bucket of a row loaded with deferred fields before it is deleted"""
+    if getattr(instance, '_rollup_key', None) is None:
+        instance._rollup_key = (
+            Attendance.objects.filter(pk=instance.pk).values_list('date', 'summary').first()
+        )
+
+
+def update_attendance_rollup_on_delete(sender, instance, **kwargs):
+    """Remove a deleted attendance row from its rollup bucket"""
+    old_key = getattr(instance, '_rollup_key', None)
+    if old_key is not None:
+        apply_attendance_deltas(attendance_deltas([(old_key, None)]))
+
+
+def remember_payment_rollup_entry(sender, instance, **kwargs):
+    """Remember the month, status, method and amount a payment was counted under when loaded"""
+    # An unsaved payment (e.g. from a form) is not counted anywhere yet
+    instance._rollup_entry = payment_rollup_entry(instance) if instance.pk is not None else None
+
+
+def update_payment_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move a saved payment to its new rollup bucket"""
+    if raw:
+        return
+    new_entry = payment_rollup_entry(instance)
+    old_entry = None if created else getattr(instance, '_rollup_entry', None)
+    if not created and old_entry is None:
+        # Loaded with deferred fields, so the previous bucket is unknown
+        rebuild_payment_rollups(instance.payment_date, instance.payment_date)
+    else:
+        apply_payment_deltas(payment_deltas([(old_entry, new_entry)]))
+    instance._rollup_entry = new_entry
+
+
+def capture_payment_rollup_entry(sender, instance, **kwargs):
+    """Load the rollup bucket of a payment loaded with deferred fields before it is deleted"""
+    if getattr(instance, '_rollup_entry', None) is None:
+        instance._rollup_entry = payment_rollup_entry(Payment.objects.get(pk=instance.pk))
+
+
+def update_payment_rollup_on_delete(sender, instance, **kwargs):
+    """Remove a deleted payment from its rollup bucket"""
+    old_entry = getattr(instance, '_rollup_entry', None)
+    if old_entry is not None:
+        apply_payment_deltas(payment_deltas([(old_entry, None)]))
+
+
+def remember_attendance_month_day(sender, instance, **kwargs):
+    """Remember which (student, date) an attendance row was packed under when loaded"""
+    if instance.get_deferred_fields().intersection({'student_id', 'date'}):
+        instance._month_day = None
+    else:
+        instance._month_day = (instance.student_id, instance.date)
+
+
+def update_attendance_month_on_save(sender, instance, created, raw=False, **kwargs):
+    """Pack a saved attendance row into its month, clearing the day it moved from"""
+    if raw:
+        return
+    row = instance
+    if instance.get_deferred_fields().intersection(ATTENDANCE_MONTH_FIELDS):
+        row = Attendance.objects.get(pk=instance.pk)
+    change = attendance_day_change(row)
+    changes = [change]
+    old_day = None if created else getattr(instance, '_month_day', None)
+    if old_day is not None and old_day != change[:2]:
+        changes.insert(0, (*old_day, 0))
+    write_attendance_days(changes)
+    instance._month_day = change[:2]
+
+
+def capture_attendance_month_day(sender, instance, **kwargs):
+    """Look up the (student, date) of a row loaded with deferred fields before it is deleted"""
+    if getattr(instance, '_month_day', None) is None:
+        instance._month_day = (
+            Attendance.objects.filter(pk=instance.pk).values_list('student_id', 'date').first()
+        )
+
+
+def update_attendance_month_on_delete(sender, instance, **kwargs):
+    """Clear a deleted attendance row's day from its month"""
+    old_day = getattr(instance, '_month_day', None)
+    if old_day is not None:
+        write_attendance_days([(*old_day, 0)])
+
+
+def connect_rollup_signals():
+    post_init.connect(remember_attendance_rollup_key, sender=Attendance, dispatch_uid='rollup_init_attendance')
+    post_save.connect(update_attendance_rollup_on_save, sender=Attendance, dispatch_uid='rollup_save_attendance')
+    pre_delete.connect(capture_attendance_rollup_key, sender=Attendance, dispatch_uid='rollup_pre_delete_attendance')
+    post_delete.connect(update_attendance_rollup_on_delete, sender=Attendance, dispatch_uid='rollup_delete_attendance')
+    post_init.connect(remember_attendance_month_day, sender=Attendance, dispatch_uid='months_init_attendance')
+    post_save.connect(update_attendance_month_on_save, sender=Attendance, dispatch_uid='months_save_attendance')
+    pre_delete.connect(capture_attendance_month_day, sender=Attendance, dispatch_uid='months_pre_delete_attendance')
+    post_delete.connect(update_attendance_month_on_delete, sender=Attendance, dispatch_uid='months_delete_attendance')
+    post_init.connect(remember_payment_rollup_entry, sender=Payment, dispatch_uid='rollup_init_payment')
+    post_save.connect(update_payment_rollup_on_save, sender=Payment, dispatch_uid='rollup_save_payment')
+    pre_delete.connect(capture_payment_rollup_entry, sender=Payment, dispatch_uid='rollup_pre_delete_payment')
+    post_delete.connect(update_payment_rollup_on_delete, sender=Payment, dispatch_uid='rollup_delete_payment')
+
+
+def _unread_recipient(notification):
+    """The user whose unread count includes a notification, None if it is read, or UNREAD_UNKNOWN if deferred"""
+    if notification.get_deferred_fields().intersection({'is_read', 'recipient_id'}):
+        return UNREAD_UNKNOWN
+    return None if notification.is_read else notification.recipient_id
+
+
+def remember_unread_recipient(sender, instance, **kwargs):
+    """Remember whose unread count a notification was in when loaded"""
+    instance._unread_recipient = _unread_recipient(instance)
+
+
+def update_unread_count_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move a saved notification into or out of its recipient's unread count"""
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_unread_recipient', None)
+    current = _unread_recipient(instance)
+    if previous is UNREAD_UNKNOWN or current is UNREAD_UNKNOWN:
+        forget_unread_count(instance.recipient_id)
+    elif previous != current:
+        deltas = {}
+        if previous is not None:
+            deltas[previous] = -1
+        if current is not None:
+            deltas[current] = deltas.get(current, 0) + 1
+        adjust_unread_counts(deltas)
+    instance._unread_recipient = current
+
+
+def capture_unread_recipient(sender, instance, **kwargs):
+    """Load the deferred fields of a notification about to be deleted while the row still exists"""
+    if getattr(instance, '_unread_recipient', None) is UNREAD_UNKNOWN:
+        instance._unread_recipient = None if instance.is_read else instance.recipient_id
+
+
+def update_unread_count_on_delete(sender, instance, **kwargs):
+    """Remove a deleted unread notification from its recipient's count"""
+    recipient = getattr(instance, '_unread_recipient', None)
+    if recipient is not None:
+        adjust_unread_counts({recipient: -1})
+
+
+def connect_unread_signals():
+    post_init.connect(remember_unread_recipient, sender=Notification, dispatch_uid='unread_init_notification')
+    post_save.connect(update_unread_count_on_save, sender=Notification, dispatch_uid='unread_save_notification')
+    pre_delete.connect(capture_unread_recipient, sender=Notification, dispatch_uid='unread_pre_delete_notification')
+    post_delete.connect(update_unread_count_on_delete, sender=Notification, dispatch_uid='unread_delete_notification')
@@ -0,0 +1,116 @@
+"""
+Per-user unread notification counts.
+Each user's count lives in the unread_notification_counts table and is adjusted in the
+same transaction as the notifications it counts, so it is correct in every worker process.
+When the report cache is shared between processes the counts are also cached there and
+dropped after every change is committed, so reading an unread badge usually costs no SQL at all.
+A user without a counter row is counted once from the notifications table on first read.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Notification, UnreadNotificationCount
+from .report_cache import shared_cache
+
+KEY_PREFIX = 'unread_notifications'
+# Bounds how long a count cached by a read that raced a write can be served
+CACHE_TIMEOUT = 300
+UPDATE_BATCH_SIZE = 500
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def get_unread_count(user_id):
+    """Number of unread notifications for a user"""
+    cache = shared_cache()
+    if cache is not None:
+        count = cache.get(_key(user_id))
+        if count is not None:
+            return count
+
+    count = UnreadNotificationCount.objects.filter(user_id=user_id).values_list('count', flat=True).first()
+    if count is None:
+        # Created before counting, so notifications committed from now on adjust it
+        UnreadNotificationCount.objects.get_or_create(user_id=user_id, defaults={'count': 0})
+        with transaction.atomic():
+            # Waits for writers already adjusting the row, so the recount includes their notifications
+            list(UnreadNotificationCount.objects.select_for_update().filter(user_id=user_id).values_list('pk'))
+            count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+            UnreadNotificationCount.objects.filter(user_id=user_id).update(count=count)
+    if cache is not None:
+        cache.set(_key(user_id), count, timeout=CACHE_TIMEOUT)
+    return count
+
+
+def adjust_unread_counts(deltas):
+    """
+    Apply {user id: change} to the unread counts, with one UPDATE per distinct change and batch of users.
+    Users without a counter row are skipped; their first read counts them from scratch.
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    if not by_delta:
+        return
+
+    for delta, user_ids in by_delta.items():
+        for i in range(0, len(user_ids), UPDATE_BATCH_SIZE):
+            UnreadNotificationCount.objects.filter(user_id__in=user_ids[i:i + UPDATE_BATCH_SIZE]).update(
+                count=F('count') + delta
+            )
+
+    cache = shared_cache()
+    if cache is not None:
+        # Dropped rather than adjusted, as a read between the commit and this would apply the change twice
+        keys = [_key(user_id) for user_ids in by_delta.values() for user_id in user_ids]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def forget_unread_count(user_id):
+    """Drop a user's stored count so the next read recounts it, for changes with an unknown effect on it"""
+    UnreadNotificationCount.objects.filter(user_id=user_id).delete()
+    cache = shared_cache()
+    if cache is not None:
+        transaction.on_commit(lambda: cache.delete(_key(user_id)))
+
+
+def mark_all_read(user_id):
+    """Mark all of a user's notifications as read, returning how many were unread"""
+    with transaction.atomic():
+        updated = Notification.objects.filter(recipient_id=user_id, is_read=False).update(is_read=True)
+        UnreadNotificationCount.objects.update_or_create(user_id=user_id, defaults={'count': 0})
+    cache = shared_cache()
+    if cache is not None:
+        transaction.on_commit(lambda: cache.delete(_key(user_id)))
+    return updated
+
+
+def rebuild_unread_counts():
+    """Recount every user's unread notifications, returning {user id: (stored, actual)} for drifted ones"""
+    stored = dict(UnreadNotificationCount.objects.values_list('user_id', 'count'))
+    actual = dict(
+        Notification.objects.filter(is_read=False).order_by()
+        .values_list('recipient_id').annotate(unread=Count('id'))
+    )
+    drift = {
+        user_id: (count, actual.get(user_id, 0))
+        for user_id, count in stored.items() if count != actual.get(user_id, 0)
+    }
+    if drift:
+        UnreadNotificationCount.objects.bulk_create(
+            [UnreadNotificationCount(user_id=user_id, count=count) for user_id, (_, count) in drift.items()],
+            batch_size=UPDATE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['count'],
+        )
+        cache = shared_cache()
+        if cache is not None:
+            transaction.on_commit(lambda: cache.delete_many([_key(user_id) for user_id in drift]))
+    return drift
@@ -36,6 +36,14 @@ urlpatterns = [
     path('student-pre-dashboard/', views.StudentPreDashboardView.as_view(), name='student-pre-dashboard'),
     path('student-post-dashboard/', views.StudentPostDashboardView.as_view(), name='student-post-dashboard'),
     path('warden-dashboard/', views.WardenDashboardView.as_view(), name='warden-dashboard'),
+    # Server-Sent Events push channel for dashboards and notifications
+    path('events/', views.EventStreamView.as_view(), name='event-stream'),
+    # Streaming CSV / NDJSON report exports
+    path('exports/<str:report>/', views.ReportExportView.as_view(), name='report-export'),
+    # Vectorized hostel-wide attendance statistics
+    path('reports/attendance-analytics/', views.AttendanceAnalyticsView.as_view(), name='attendance-analytics'),
+    # Ranked full-text search across complaints, notifications, meals and feedback
+    path('search/', views.GlobalSearchView.as_view(), name='global-search'),
     # Router URLs should come last
     path('', include(router.urls)),
 ]
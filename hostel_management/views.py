@@ -1,11 +1,18 @@
+import math
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.utils.urls import replace_query_param
 from django.contrib.auth import login, logout
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Count, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from datetime import date, timedelta
@@ -21,7 +28,26 @@ from .serializers import (
     PenaltySerializer, MealSerializer, MealFeedbackSerializer, ComplaintSerializer,
     StayExtensionRequestSerializer, NotificationSerializer, StaffSerializer,
     FoodShortageSerializer, DashboardStatsSerializer, RoomApplicationSerializer,
-    BulkAttendanceSerializer, PaymentVerificationSerializer, SystemSettingsSerializer
+    BulkAttendanceSerializer, AttendanceSyncUploadSerializer, PaymentVerificationSerializer, SystemSettingsSerializer, ValuesPlan
+)
+from .dashboard_queries import get_dashboard_stats, get_global_search_results, GLOBAL_SEARCH_KINDS
+from .counters import read_counters
+from .report_cache import bump_table_versions
+from .attendance_marking import mark_attendance
+from .outbox import enqueue_notification
+from .unread import get_unread_count, mark_all_read
+from .attendance_months import get_attendance_month, get_attendance_percentages
+from .attendance_sync import InvalidSyncToken, apply_offline_marks, get_attendance_changes
+from .analytics import get_attendance_analytics
+from .pagination import KeysetPagination
+from .admin_feed import InvalidFeedCursor, decode_feed_cursor, encode_feed_cursor, get_admin_feed
+from .retention import (
+    InvalidArchiveCursor, decode_archive_cursor, encode_archive_cursor, get_archived_notifications,
+)
+from .renderers import API_RENDERER_CLASSES, FastJSONRenderer
+from .exports import CSVStreamRenderer, NDJSONStreamRenderer, ENCODERS, EXPORTS
+from .events import (
+    EventStreamRenderer, dashboard_event_stream, DEFAULT_STREAM_TIMEOUT, MAX_STREAM_TIMEOUT
 )
 
 
@@ -44,9 +70,43 @@ class RoleBasedPermission(permissions.BasePermission):
         return request.user.role in allowed_roles
 
 
+class SparseFieldsetViewMixin:
+    """Join and select only the columns needed for the ?fields= / ?expand= the client asked for"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if self.request.method != 'GET' or ('fields' not in params and 'expand' not in params):
+            return queryset
+        # Keep the pagination key loaded so building the next cursor does not hit deferred fields
+        ordering = getattr(self, 'keyset_ordering', KeysetPagination.ordering)
+        return self.get_serializer().optimize_queryset(queryset, [field.lstrip('-') for field in ordering])
+
+
+class ValuesListMixin:
+    """
+    Read-only fast path for list(): rows are fetched with .values() and rendered through a ValuesPlan
+    instead of model instances and serializer fields. ?fields= / ?expand= use the regular serializers.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if 'fields' in request.query_params or 'expand' in request.query_params:
+            return super().list(request, *args, **kwargs)
+        
+        plan = ValuesPlan(self.get_serializer())
+        ordering = [field.lstrip('-') for field in getattr(self, 'keyset_ordering', KeysetPagination.ordering)]
+        queryset = self.filter_queryset(self.get_queryset()).values(*plan.keys, *ordering)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(queryset))
+
+
 class AuthViewSet(viewsets.ViewSet):
     """Authentication views"""
     permission_classes = [permissions.AllowAny]
+    renderer_classes = API_RENDERER_CLASSES
 
     @action(detail=False, methods=['post'])
     def register(self, request):
@@ -84,44 +144,160 @@ class AuthViewSet(viewsets.ViewSet):
 class DashboardView(APIView):
     """Dashboard statistics view"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt', 'mess_staff', 'student']
 
     def get(self, request):
         """Get dashboard statistics"""
-        today = date.today()
+        stats = get_dashboard_stats()
+        stats['unread_notifications'] = get_unread_count(request.user.id)
+        stats['recent_notifications'] = list(
+            Notification.objects.filter(recipient=request.user, is_read=False)
+            .values('id', 'title', 'created_at')[:5]
+        ) if stats['unread_notifications'] else []
         
-        # Calculate occupied rooms (rooms with at least one student)
-        occupied_rooms = Room.objects.filter(occupied__gt=0).count()
+        serializer = DashboardStatsSerializer(stats)
+        return Response(serializer.data)
+
+
+class EventStreamView(APIView):
+    """Server-Sent Events stream of dashboard counter changes and new notifications"""
+    permission_classes = [RoleBasedPermission]
+    allowed_roles = ['admin', 'warden', 'deputy_rt', 'mess_staff', 'student']
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        """Stream events until the timeout, after which the browser reconnects"""
+        try:
+            timeout = float(request.query_params.get('timeout', DEFAULT_STREAM_TIMEOUT))
+            # nan passes through min()/max() and would keep the worker streaming forever
+            if not math.isfinite(timeout):
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'timeout must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        timeout = min(max(timeout, 0), MAX_STREAM_TIMEOUT)
+        
+        last_event_id = request.META.get('HTTP_LAST_EVENT_ID') or request.query_params.get('last_event_id')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
         
-        # Calculate pending extension requests
-        pending_extension_requests = StayExtensionRequest.objects.filter(status='pending').count()
+        response = StreamingHttpResponse(
+            dashboard_event_stream(request.user, last_event_id=last_event_id, timeout=timeout),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class ReportExportView(APIView):
+    """Streaming CSV / newline-delimited JSON export of large reports"""
+    permission_classes = [RoleBasedPermission]
+    allowed_roles = ['admin', 'warden']
+    renderer_classes = [FastJSONRenderer, CSVStreamRenderer, NDJSONStreamRenderer]
+
+    def get(self, request, report):
+        """Stream a report; choose the format with ?format=csv or ?format=ndjson"""
+        if report not in EXPORTS:
+            return Response({'error': f'Unknown report. Must be one of: {sorted(EXPORTS)}'}, status=status.HTTP_404_NOT_FOUND)
+        
+        export_format = request.accepted_renderer.format
+        if export_format not in ENCODERS:
+            export_format = 'csv'
+        
+        iter_rows, required_params, date_params = EXPORTS[report]
+        params = []
+        for name in required_params:
+            value = request.query_params.get(name)
+            if not value:
+                return Response({'error': f'Missing required parameter: {name}'}, status=status.HTTP_400_BAD_REQUEST)
+            if name in date_params:
+                try:
+                    # None for a malformed date, ValueError for an impossible one such as 2025-02-30
+                    value = parse_date(value)
+                except ValueError:
+                    value = None
+                if value is None:
+                    return Response({'error': f'Invalid date for {name}. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+            params.append(value)
+        
+        content_type = NDJSONStreamRenderer.media_type if export_format == 'ndjson' else CSVStreamRenderer.media_type
+        response = StreamingHttpResponse(ENCODERS[export_format](iter_rows(*params)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{report}-{date.today().isoformat()}.{export_format}"'
+        return response
+
+
+class AttendanceAnalyticsView(APIView):
+    """Hostel-wide attendance statistics per student, floor, department and day"""
+    permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
+    allowed_roles = ['admin', 'warden']
+    max_days = 366
+
+    def get(self, request):
+        """Statistics between ?start_date= and ?end_date= (YYYY-MM-DD, at most a year apart)"""
+        dates = {}
+        for name in ('start_date', 'end_date'):
+            value = request.query_params.get(name)
+            if not value:
+                return Response({'error': f'Missing required parameter: {name}'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                dates[name] = parse_date(value)
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                return Response({'error': f'Invalid date for {name}. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        days = (dates['end_date'] - dates['start_date']).days + 1
+        if days < 1:
+            return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+        if days > self.max_days:
+            return Response({'error': f'Date range must be at most {self.max_days} days'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(get_attendance_analytics(dates['start_date'], dates['end_date']))
+
+
+class GlobalSearchView(APIView):
+    """Ranked full-text search across complaints, notifications, meals and meal feedback"""
+    permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
+    allowed_roles = ['admin', 'warden', 'deputy_rt', 'mess_staff']
+    max_page_size = 100
+
+    def get(self, request):
+        """Search with ?q=, optionally narrowed with ?kind=complaint,meal and paged with ?page=&page_size="""
+        search_term = request.query_params.get('q', '').strip()
+        if not search_term:
+            return Response({'error': 'Missing required parameter: q'}, status=status.HTTP_400_BAD_REQUEST)
         
-        stats = {
-            'total_students': Student.objects.filter(is_active=True).count(),
-            'total_rooms': Room.objects.count(),
-            'available_rooms': Room.objects.filter(is_available=True).count(),
-            'occupied_rooms': occupied_rooms,
-            'pending_payments': Payment.objects.filter(status='pending').count(),
-            'pending_complaints': Complaint.objects.filter(status='pending').count(),
-            'pending_extension_requests': pending_extension_requests,
-            'today_meals': Meal.objects.filter(date=today).count(),
-            'total_staff': Staff.objects.filter(is_active=True).count(),
-            'recent_notifications': list(
-                Notification.objects.filter(recipient=request.user, is_read=False)
-                .values('id', 'title', 'created_at')[:5]
-            )
-        }
+        kinds = [kind for value in request.query_params.getlist('kind') for kind in value.split(',') if kind]
+        invalid_kinds = set(kinds) - set(GLOBAL_SEARCH_KINDS)
+        if invalid_kinds:
+            return Response({'error': f'Invalid kind. Must be one of: {GLOBAL_SEARCH_KINDS}'}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = DashboardStatsSerializer(stats)
-        return Response(serializer.data)
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), self.max_page_size)
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Only admins search every user's notifications
+        recipient_id = None if request.user.role == 'admin' else request.user.id
+        results = get_global_search_results(
+            search_term, kinds=kinds or None, recipient_id=recipient_id, page=page, page_size=page_size
+        )
+        return Response({'page': page, 'page_size': page_size, **results})
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """User management views"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Filter users based on role"""
@@ -132,16 +308,18 @@ class UserViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Student management views"""
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related('user')
     serializer_class = StudentSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt', 'student']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Filter students based on various criteria"""
-        queryset = Student.objects.all()
+        queryset = super().get_queryset()
         
         # Filter by department
         department = self.request.query_params.get('department', None)
@@ -198,23 +376,19 @@ class StudentViewSet(viewsets.ModelViewSet):
         """Delete student and notify deputy RT"""
         student_name = f"{instance.user.first_name} {instance.user.last_name}"
         
-        # Notify deputy RT before deletion
-        try:
-            deputy_rt_users = User.objects.filter(role='deputy_rt')
-            for deputy in deputy_rt_users:
-                Notification.objects.create(
-                    recipient=deputy,
-                    notification_type='student_action',
-                    title='Student Removed',
-                    message=f'Student {student_name} has been removed from the system by admin.'
-                )
-        except Exception as e:
-            print(f"Error notifying deputy RT: {e}")
-        
-        # Delete the student and user
-        user = instance.user
-        instance.delete()
-        user.delete()
+        with transaction.atomic():
+            # Queue notification for deputy RT, sent once the deletion commits; a failure rolls the deletion back
+            enqueue_notification(
+                role='deputy_rt',
+                notification_type='student_action',
+                title='Student Removed',
+                message=f'Student {student_name} has been removed from the system by admin.'
+            )
+            
+            # Delete the student and user
+            user = instance.user
+            instance.delete()
+            user.delete()
 
     @action(detail=True, methods=['post'])
     def allocate_room(self, request, pk=None):
@@ -232,22 +406,23 @@ class StudentViewSet(viewsets.ModelViewSet):
             if room.occupied >= room.capacity:
                 return Response({'error': 'Room is full'}, status=status.HTTP_400_BAD_REQUEST)
             
-            student.room = room
-            student.check_in_date = date.today()
-            student.save()
-            
-            room.occupied += 1
-            if room.occupied >= room.capacity:
-                room.is_available = False
-            room.save()
-            
-            # Create notification for student about room assignment
-            Notification.objects.create(
-                recipient=student.user,
-                notification_type='room_assigned',
-                title='Room Assigned',
-                message=f'You have been assigned to room {room.room_number}. Please log out and log back in to access your full dashboard.'
-            )
+            with transaction.atomic():
+                student.room = room
+                student.check_in_date = date.today()
+                student.save()
+                
+                room.occupied += 1
+                if room.occupied >= room.capacity:
+                    room.is_available = False
+                room.save()
+                
+                # Queue notification for student about room assignment
+                enqueue_notification(
+                    recipient=student.user,
+                    notification_type='room_assigned',
+                    title='Room Assigned',
+                    message=f'You have been assigned to room {room.room_number}. Please log out and log back in to access your full dashboard.'
+                )
             
             return Response({'message': 'Room allocated successfully'})
         except Room.DoesNotExist:
@@ -262,32 +437,36 @@ class StudentViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Student has no room assigned'}, status=status.HTTP_400_BAD_REQUEST)
         
         room = student.room
-        student.room = None
-        student.check_in_date = None
-        student.save()
-        
-        room.occupied -= 1
-        if room.occupied < room.capacity:
-            room.is_available = True
-        room.save()
-        
-        # Create notification for student about room deallocation
-        Notification.objects.create(
-            recipient=student.user,
-            notification_type='room_deallocated',
-            title='Room Deallocated',
-            message=f'Your room {room.room_number} has been deallocated.'
-        )
+        with transaction.atomic():
+            student.room = None
+            student.check_in_date = None
+            student.save()
+            
+            room.occupied -= 1
+            if room.occupied < room.capacity:
+                room.is_available = True
+            room.save()
+            
+            # Queue notification for student about room deallocation
+            enqueue_notification(
+                recipient=student.user,
+                notification_type='room_deallocated',
+                title='Room Deallocated',
+                message=f'Your room {room.room_number} has been deallocated.'
+            )
         
         return Response({'message': 'Room deallocated successfully'})
 
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Room management views"""
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden']
+    pagination_class = KeysetPagination
+    keyset_ordering = ('room_number', 'id')
 
     def get_queryset(self):
         """Filter rooms based on various criteria"""
@@ -309,16 +488,18 @@ class RoomViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ValuesListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Payment management views"""
-    queryset = Payment.objects.all()
+    queryset = Payment.objects.select_related('student__user', 'verified_by')
     serializer_class = PaymentSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Filter payments based on various criteria"""
-        queryset = Payment.objects.all()
+        queryset = super().get_queryset()
         
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
@@ -348,14 +529,11 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment.verified_by = request.user
             payment.verified_at = timezone.now()
             payment.reject_reason = None  # Clear any previous rejection reason
-            
-            # Create notification for student
-            Notification.objects.create(
-                recipient=payment.student.user,
-                notification_type='payment_verified',
-                title='Payment Verified',
-                message=f'Your payment of PKR {payment.amount} has been verified successfully. You can now apply for room assignment.'
-            )
+            notification = {
+                'notification_type': 'payment_verified',
+                'title': 'Payment Verified',
+                'message': f'Your payment of PKR {payment.amount} has been verified successfully. You can now apply for room assignment.'
+            }
         elif status == 'rejected':
             if not reject_reason:
                 return Response({'error': 'Rejection reason is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -363,16 +541,16 @@ class PaymentViewSet(viewsets.ModelViewSet):
             payment.reject_reason = reject_reason
             payment.verified_by = None
             payment.verified_at = None
-            
-            # Create notification for student
-            Notification.objects.create(
-                recipient=payment.student.user,
-                notification_type='payment_rejected',
-                title='Payment Rejected',
-                message=f'Your payment of PKR {payment.amount} has been rejected. Reason: {reject_reason}. Please submit a new payment.'
-            )
+            notification = {
+                'notification_type': 'payment_rejected',
+                'title': 'Payment Rejected',
+                'message': f'Your payment of PKR {payment.amount} has been rejected. Reason: {reject_reason}. Please submit a new payment.'
+            }
         
-        payment.save()
+        with transaction.atomic():
+            payment.save()
+            # Queue notification for student
+            enqueue_notification(recipient=payment.student.user, **notification)
         return Response({'message': f'Payment {status} successfully'})
 
     @action(detail=False, methods=['post'])
@@ -394,16 +572,19 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Payment not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(ValuesListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Attendance management views"""
-    queryset = Attendance.objects.all()
+    queryset = Attendance.objects.select_related('student__user', 'marked_by')
     serializer_class = AttendanceSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt']
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', '-id')
 
     def get_queryset(self):
         """Filter attendance based on various criteria"""
-        queryset = Attendance.objects.all()
+        queryset = super().get_queryset()
         
         # Filter by date
         date_filter = self.request.query_params.get('date', None)
@@ -422,60 +603,11 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         """Bulk mark attendance for multiple students with shift logic"""
         serializer = BulkAttendanceSerializer(data=request.data)
         if serializer.is_valid():
-            date = serializer.validated_data['date']
-            attendances = serializer.validated_data['attendances']
-            
-            created_count = 0
-            updated_count = 0
-            
-            for attendance_data in attendances:
-                student_id = attendance_data['student']
-                try:
-                    student = Student.objects.get(id=student_id)
-                    
-                    morning_shift = attendance_data.get('morning_shift', 'Null')
-                    evening_shift = attendance_data.get('evening_shift', 'Null')
-                    night_shift = attendance_data.get('night_shift', 'Null')
-                    
-                    # Apply shift logic: if morning & evening are present, night should be null
-                    if morning_shift == 'Present' and evening_shift == 'Present':
-                        night_shift = 'Null'
-                    
-                    # Calculate summary
-                    summary = self._calculate_summary(morning_shift, evening_shift, night_shift)
-                    
-                    # Check if attendance already exists for this student and date
-                    attendance, created = Attendance.objects.get_or_create(
-                        student=student,
-                        date=date,
-                        defaults={
-                            'marked_by': request.user,
-                            'remarks': attendance_data.get('remarks', ''),
-                            'morning_shift': morning_shift,
-                            'evening_shift': evening_shift,
-                            'night_shift': night_shift,
-                            'summary': summary
-                        }
-                    )
-                    
-                    if not created:
-                        # Update existing attendance
-                        attendance.remarks = attendance_data.get('remarks', '')
-                        attendance.morning_shift = morning_shift
-                        attendance.evening_shift = evening_shift
-                        attendance.night_shift = night_shift
-                        attendance.summary = summary
-                        attendance.save()
-                        updated_count += 1
-                    else:
-                        created_count += 1
-                    
-                    # Handle night shift penalty logic
-                    self._handle_night_shift_penalty(student, date, night_shift, request.user)
-                        
-                except Student.DoesNotExist:
-                    continue
-            
+            created_count, updated_count = mark_attendance(
+                serializer.validated_data['date'],
+                serializer.validated_data['attendances'],
+                request.user,
+            )
             return Response({
                 'message': f'Attendance marked successfully. Created: {created_count}, Updated: {updated_count}',
                 'created': created_count,
@@ -483,74 +615,124 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    def _calculate_summary(self, morning_shift, evening_shift, night_shift):
-        """Calculate daily summary based on shifts"""
-        # If both morning and evening are present, summary is present
-        if morning_shift == 'Present' and evening_shift == 'Present':
-            return 'Present'
-        # If both morning and evening are absent, summary is absent
-        elif morning_shift == 'Absent' and evening_shift == 'Absent':
-            return 'Absent'
-        # If both morning and evening are holiday, summary is holiday
-        elif morning_shift == 'Holiday' and evening_shift == 'Holiday':
-            return 'Holiday'
-        # If both morning and evening are leave, summary is leave
-        elif morning_shift == 'Leave' and evening_shift == 'Leave':
-            return 'Leave'
-        # Mixed shifts - default to present if at least one is present
-        elif morning_shift == 'Present' or evening_shift == 'Present':
-            return 'Present'
-        else:
-            return 'Absent'
-    
-    def _handle_night_shift_penalty(self, student, date, night_shift, marked_by):
-        """Handle night shift penalty creation/deletion"""
-        if night_shift == 'Present':
-            # Create penalty for night shift presence
-            Penalty.objects.get_or_create(
-                student=student,
-                penalty_type='night_shift',
-                defaults={
-                    'amount': 500,
-                    'reason': 'Present during night shift (after 8 PM)',
-                    'issued_by': marked_by
-                }
+
+    @action(detail=False, methods=['get', 'post'])
+    def sync(self, request):
+        """Delta sync for offline marking: GET ?date=&floor=&token= for changes, POST offline marks"""
+        if request.method == 'POST':
+            serializer = AttendanceSyncUploadSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            applied, conflicts = apply_offline_marks(
+                serializer.validated_data['marks'], request.user, force=serializer.validated_data['force']
             )
-        elif night_shift == 'Null':
-            # Remove penalty if night shift is null
-            Penalty.objects.filter(
-                student=student,
-                penalty_type='night_shift'
-            ).delete()
+            return Response({'applied': applied, 'conflicts': conflicts})
+
+        date_param = request.query_params.get('date')
+        try:
+            date_filter = parse_date(date_param) if date_param else date.today()
+        except ValueError:
+            date_filter = None
+        if date_filter is None:
+            return Response({'error': 'Invalid date. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        floor = request.query_params.get('floor')
+        if floor is not None:
+            try:
+                floor = int(floor)
+            except ValueError:
+                return Response({'error': 'floor must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            changes = get_attendance_changes(date_filter, token=request.query_params.get('token'), floor=floor)
+        except InvalidSyncToken as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(changes)
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """A student's month of attendance from the packed monthly store (?student_id=&month=YYYY-MM)"""
+        student_id = request.query_params.get('student_id')
+        if not student_id:
+            return Response({'error': 'Missing required parameter: student_id'}, status=status.HTTP_400_BAD_REQUEST)
+        month = request.query_params.get('month')
+        try:
+            month = parse_date(f'{month}-01') if month else date.today().replace(day=1)
+        except ValueError:
+            month = None
+        if month is None:
+            return Response({'error': 'Invalid month. Use YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        student = get_object_or_404(Student, student_id=student_id)
+        return Response({
+            'student': student.id,
+            'student_id': student.student_id,
+            'month': f'{month:%Y-%m}',
+            **get_attendance_month(student.id, month),
+        })
+
+    @action(detail=False, methods=['get'])
+    def percentages(self, request):
+        """Attendance percentage per student between ?start_date= and ?end_date= from the packed monthly store"""
+        dates = {}
+        for name in ('start_date', 'end_date'):
+            value = request.query_params.get(name)
+            if not value:
+                return Response({'error': f'Missing required parameter: {name}'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                dates[name] = parse_date(value)
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                return Response({'error': f'Invalid date for {name}. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if dates['start_date'] > dates['end_date']:
+            return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        students = Student.objects.all()
+        student_id = request.query_params.get('student_id')
+        if student_id:
+            students = students.filter(student_id=student_id)
+        codes = dict(students.values_list('id', 'student_id'))
+        percentages = get_attendance_percentages(
+            dates['start_date'], dates['end_date'], student_ids=list(codes) if student_id else None
+        )
+        return Response([
+            {'student': pk, 'student_id': codes.get(pk), **summary}
+            for pk, summary in sorted(percentages.items())
+            if pk in codes
+        ])
 
 
-class PenaltyViewSet(viewsets.ModelViewSet):
+class PenaltyViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Penalty management views"""
-    queryset = Penalty.objects.all()
+    queryset = Penalty.objects.select_related('student__user', 'issued_by')
     serializer_class = PenaltySerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt']
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         """Create penalty and send notification"""
-        penalty = serializer.save(issued_by=self.request.user)
-        
-        # Create notification for student
-        Notification.objects.create(
-            recipient=penalty.student.user,
-            notification_type='penalty',
-            title=f'{penalty.penalty_type.title()} Issued',
-            message=f'You have been issued a {penalty.penalty_type} penalty. Reason: {penalty.reason}'
-        )
+        with transaction.atomic():
+            penalty = serializer.save(issued_by=self.request.user)
+            
+            # Queue notification for student
+            enqueue_notification(
+                recipient=penalty.student.user,
+                notification_type='penalty',
+                title=f'{penalty.penalty_type.title()} Issued',
+                message=f'You have been issued a {penalty.penalty_type} penalty. Reason: {penalty.reason}'
+            )
 
 
-class MealViewSet(viewsets.ModelViewSet):
+class MealViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Meal management views"""
-    queryset = Meal.objects.all()
+    queryset = Meal.objects.select_related('prepared_by')
     serializer_class = MealSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt', 'mess_staff', 'student']
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', '-id')
 
     def perform_create(self, serializer):
         """Create meal and set prepared_by"""
@@ -558,7 +740,7 @@ class MealViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter meals based on various criteria"""
-        queryset = Meal.objects.all()
+        queryset = super().get_queryset()
         
         # Filter by meal type
         meal_type = self.request.query_params.get('meal_type', None)
@@ -573,24 +755,32 @@ class MealViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class MealFeedbackViewSet(viewsets.ModelViewSet):
+class MealFeedbackViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Meal feedback views"""
-    queryset = MealFeedback.objects.all()
+    queryset = MealFeedback.objects.select_related('student__user', 'meal__prepared_by')
     serializer_class = MealFeedbackSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt', 'mess_staff', 'student']
+    pagination_class = KeysetPagination
 
 
-class ComplaintViewSet(viewsets.ModelViewSet):
+class ComplaintViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Complaint management views"""
-    queryset = Complaint.objects.all()
+    queryset = Complaint.objects.select_related('student__user', 'assigned_to')
     serializer_class = ComplaintSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'student']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Filter complaints based on various criteria"""
-        queryset = Complaint.objects.all()
+        queryset = super().get_queryset()
+        
+        # Students only see their own, so their pages do not depend on the first page of everyone's
+        if self.request.user.role == 'student':
+            queryset = queryset.filter(student__user=self.request.user)
         
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
@@ -605,16 +795,22 @@ class ComplaintViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class StayExtensionRequestViewSet(viewsets.ModelViewSet):
+class StayExtensionRequestViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Stay extension request views"""
-    queryset = StayExtensionRequest.objects.all()
+    queryset = StayExtensionRequest.objects.select_related('student__user', 'approved_by')
     serializer_class = StayExtensionRequestSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'student']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Filter requests based on various criteria"""
-        queryset = StayExtensionRequest.objects.all()
+        queryset = super().get_queryset()
+        
+        # Students only see their own, so their pages do not depend on the first page of everyone's
+        if self.request.user.role == 'student':
+            queryset = queryset.filter(student__user=self.request.user)
         
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
@@ -637,15 +833,16 @@ class StayExtensionRequestViewSet(viewsets.ModelViewSet):
         extension_request.status = 'approved'
         extension_request.approved_by = request.user
         extension_request.approved_at = timezone.now()
-        extension_request.save()
-        
-        # Create notification for student
-        Notification.objects.create(
-            recipient=extension_request.student.user,
-            notification_type='extension',
-            title='Stay Extension Approved',
-            message=f'Your stay extension request has been approved until {extension_request.requested_checkout_date}'
-        )
+        with transaction.atomic():
+            extension_request.save()
+            
+            # Queue notification for student
+            enqueue_notification(
+                recipient=extension_request.student.user,
+                notification_type='extension',
+                title='Stay Extension Approved',
+                message=f'Your stay extension request has been approved until {extension_request.requested_checkout_date}'
+            )
         
         return Response({'message': 'Stay extension request approved'})
 
@@ -657,90 +854,52 @@ class StayExtensionRequestViewSet(viewsets.ModelViewSet):
         
         extension_request.status = 'rejected'
         extension_request.rejection_reason = rejection_reason
-        extension_request.save()
-        
-        # Create notification for student
-        Notification.objects.create(
-            recipient=extension_request.student.user,
-            notification_type='extension',
-            title='Stay Extension Rejected',
-            message=f'Your stay extension request has been rejected. Reason: {rejection_reason}'
-        )
+        with transaction.atomic():
+            extension_request.save()
+            
+            # Queue notification for student
+            enqueue_notification(
+                recipient=extension_request.student.user,
+                notification_type='extension',
+                title='Stay Extension Rejected',
+                message=f'Your stay extension request has been rejected. Reason: {rejection_reason}'
+            )
         
         return Response({'message': 'Stay extension request rejected'})
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ValuesListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Notification views"""
-    queryset = Notification.objects.all()
+    queryset = Notification.objects.select_related('recipient')
     serializer_class = NotificationSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'deputy_rt', 'mess_staff', 'student']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Get notifications for current user"""
-        return Notification.objects.filter(recipient=self.request.user)
+        return super().get_queryset().filter(recipient=self.request.user)
 
     @action(detail=False, methods=['get'])
     def admin(self, request):
-        """Get admin-specific notifications"""
+        """Admin feed of pending payments, food shortages and inactive students, newest first (?cursor=&page_size=)"""
         if request.user.role != 'admin':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        notifications = []
-        
-        # Get pending payment notifications
-        pending_payments = Payment.objects.filter(status='pending').select_related('student__user')
-        for payment in pending_payments:
-            notifications.append({
-                'id': f'payment_{payment.id}',
-                'notification_type': 'payment',
-                'title': 'New Payment Receipt',
-                'message': f'Payment received from {payment.student.user.first_name} {payment.student.user.last_name}',
-                'student_name': f'{payment.student.user.first_name} {payment.student.user.last_name}',
-                'student_id': payment.student.student_id,
-                'amount': payment.amount,
-                'payment_method': payment.payment_method,
-                'description': payment.description,
-                'status': payment.status,
-                'created_at': payment.created_at.isoformat()
-            })
-        
-        # Get food shortage notifications
-        food_shortages = FoodShortage.objects.filter(status='pending').select_related('meal', 'reported_by')
-        for shortage in food_shortages:
-            notifications.append({
-                'id': f'shortage_{shortage.id}',
-                'notification_type': 'food_shortage',
-                'title': 'Food Shortage Alert',
-                'message': f'Food shortage reported for {shortage.meal.meal_type} on {shortage.meal.date}: {shortage.description}',
-                'created_at': shortage.created_at.isoformat()
-            })
-        
-        # Get inactive student notifications (students who haven't applied for room after 7 days)
-        from datetime import timedelta
-        seven_days_ago = timezone.now() - timedelta(days=7)
-        inactive_students = Student.objects.filter(
-            is_active=True,
-            room__isnull=True,
-            user__date_joined__lt=seven_days_ago
-        ).select_related('user')
-        
-        for student in inactive_students:
-            notifications.append({
-                'id': f'inactive_{student.id}',
-                'notification_type': 'inactive_student',
-                'title': 'Inactive Student',
-                'message': f'Student {student.user.first_name} {student.user.last_name} has not applied for room after 7 days of login',
-                'student_name': f'{student.user.first_name} {student.user.last_name}',
-                'student_id': student.student_id,
-                'created_at': student.user.date_joined.isoformat()
-            })
-        
-        # Sort by creation date (newest first)
-        notifications.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        return Response(notifications)
+        cursor = request.query_params.get('cursor')
+        try:
+            position = decode_feed_cursor(cursor) if cursor else None
+        except InvalidFeedCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        items, next_position = get_admin_feed(position, KeysetPagination().get_page_size(request))
+        next_link = None
+        if next_position is not None:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_feed_cursor(next_position)
+            )
+        return Response({'next': next_link, 'results': items})
 
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -748,13 +907,39 @@ class NotificationViewSet(viewsets.ModelViewSet):
         notification = self.get_object()
         notification.is_read = True
         notification.save()
-        return Response({'message': 'Notification marked as read'})
+        return Response({'message': 'Notification marked as read', 'unread': get_unread_count(request.user.id)})
 
     @action(detail=False, methods=['post'])
     def mark_all_as_read(self, request):
         """Mark all notifications as read"""
-        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
-        return Response({'message': 'All notifications marked as read'})
+        mark_all_read(request.user.id)
+        # QuerySet.update() bypasses the signals that invalidate cached reports
+        bump_table_versions('notifications')
+        return Response({'message': 'All notifications marked as read', 'unread': 0})
+
+    @action(detail=False, methods=['get'])
+    def archive(self, request):
+        """Notifications moved to the archive by the retention policies, newest first (?cursor=&page_size=)"""
+        cursor = request.query_params.get('cursor')
+        try:
+            position = decode_archive_cursor(cursor) if cursor else None
+        except InvalidArchiveCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        items, next_position = get_archived_notifications(
+            request.user.id, position, KeysetPagination().get_page_size(request)
+        )
+        next_link = None
+        if next_position is not None:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_archive_cursor(next_position)
+            )
+        return Response({'next': next_link, 'results': items})
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Number of unread notifications for the badge, without counting the notifications table"""
+        return Response({'unread': get_unread_count(request.user.id)})
 
     @action(detail=False, methods=['post'])
     def notify_deputy_rt(self, request):
@@ -762,37 +947,34 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if request.user.role != 'admin':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        student_id = request.data.get('student_id')
         student_name = request.data.get('student_name')
         action = request.data.get('action')
+        if not student_name or not action:
+            return Response({'error': 'student_name and action are required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            enqueue_notification(
+                role='deputy_rt',
+                notification_type='student_action',
+                title=f'Student {action.title()}',
+                message=f'Student {student_name} has been {action} from the system by admin.'
+            )
         
-        try:
-            # Find deputy RT users
-            deputy_rt_users = User.objects.filter(role='deputy_rt')
-            
-            for deputy in deputy_rt_users:
-                Notification.objects.create(
-                    recipient=deputy,
-                    notification_type='student_action',
-                    title=f'Student {action.title()}',
-                    message=f'Student {student_name} has been {action} from the system by admin.'
-                )
-            
-            return Response({'message': 'Deputy RT notified successfully'})
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({'message': 'Deputy RT notified successfully'})
 
 
-class StaffViewSet(viewsets.ModelViewSet):
+class StaffViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Staff management views"""
-    queryset = Staff.objects.all()
+    queryset = Staff.objects.select_related('user')
     serializer_class = StaffSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Filter staff based on various criteria"""
-        queryset = Staff.objects.all()
+        queryset = super().get_queryset()
         
         # Filter by staff type
         staff_type = self.request.query_params.get('staff_type', None)
@@ -802,22 +984,23 @@ class StaffViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FoodShortageViewSet(viewsets.ModelViewSet):
+class FoodShortageViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Food shortage views"""
-    queryset = FoodShortage.objects.all()
+    queryset = FoodShortage.objects.select_related('meal__prepared_by', 'reported_by', 'resolved_by')
     serializer_class = FoodShortageSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'mess_staff']
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         """Create food shortage and send notification"""
-        shortage = serializer.save(reported_by=self.request.user)
-        
-        # Create notification for mess staff
-        mess_staff = User.objects.filter(role='mess_staff')
-        for staff in mess_staff:
-            Notification.objects.create(
-                recipient=staff,
+        with transaction.atomic():
+            shortage = serializer.save(reported_by=self.request.user)
+            
+            # Queue notification for mess staff
+            enqueue_notification(
+                role='mess_staff',
                 notification_type='food_shortage',
                 title='Food Shortage Reported',
                 message=f'Food shortage reported for {shortage.meal.meal_type} on {shortage.meal.date}'
@@ -837,13 +1020,12 @@ class FoodShortageViewSet(viewsets.ModelViewSet):
                     shortage.status = 'acknowledged'
                     shortage.resolved_by = request.user
                     shortage.resolved_at = timezone.now()
-                    shortage.save()
-                    
-                    # Create notification for mess staff
-                    mess_staff = User.objects.filter(role='mess_staff')
-                    for staff in mess_staff:
-                        Notification.objects.create(
-                            recipient=staff,
+                    with transaction.atomic():
+                        shortage.save()
+                        
+                        # Queue notification for mess staff
+                        enqueue_notification(
+                            role='mess_staff',
                             notification_type='food_shortage_acknowledged',
                             title='Food Shortage Acknowledged',
                             message=f'Admin has acknowledged the food shortage for {shortage.meal.meal_type} on {shortage.meal.date}'
@@ -867,6 +1049,7 @@ class FoodShortageViewSet(viewsets.ModelViewSet):
 class DeputyDashboardView(APIView):
     """Deputy RT Dashboard statistics view"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['deputy_rt']
 
     def get(self, request):
@@ -876,21 +1059,20 @@ class DeputyDashboardView(APIView):
         
         today = date.today()
         
+        counters = read_counters(['allocated_students', 'meal_feedbacks'])
+        
         # Get students assigned to rooms (for attendance marking)
-        total_students = Student.objects.filter(room__isnull=False, is_active=True).count()
+        total_students = counters['allocated_students']
         
         # Get latest meal update
         latest_meal = Meal.objects.order_by('-updated_at').first()
         meal_menu_last_updated = latest_meal.updated_at if latest_meal else None
         
         # Get meal feedback count
-        meal_feedback_count = MealFeedback.objects.count()
+        meal_feedback_count = counters['meal_feedbacks']
         
         # Get unread notifications count
-        notifications_count = Notification.objects.filter(
-            recipient=request.user, 
-            is_read=False
-        ).count()
+        notifications_count = get_unread_count(request.user.id)
         
         # Get new students added in last 7 days
         from datetime import timedelta
@@ -914,6 +1096,7 @@ class DeputyDashboardView(APIView):
 class DeputyDashboardViewSet(viewsets.ViewSet):
     """Deputy RT Dashboard views"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['deputy_rt']
 
     @action(detail=False, methods=['get'])
@@ -939,6 +1122,7 @@ class SystemSettingsViewSet(viewsets.ModelViewSet):
     queryset = SystemSettings.objects.all()
     serializer_class = SystemSettingsSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden']
 
     def get_queryset(self):
@@ -967,6 +1151,7 @@ class SystemSettingsViewSet(viewsets.ModelViewSet):
 class MessDashboardView(APIView):
     """Mess Dashboard statistics view"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['mess_staff']
 
     def get(self, request):
@@ -1001,6 +1186,7 @@ class MessDashboardView(APIView):
 class StudentPreDashboardView(APIView):
     """Student Pre-Dashboard view"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['student']
 
     def get(self, request):
@@ -1057,6 +1243,7 @@ class StudentPreDashboardView(APIView):
 class StudentPostDashboardView(APIView):
     """Student Post-Dashboard statistics view"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['student']
 
     def get(self, request):
@@ -1131,6 +1318,7 @@ class StudentPostDashboardView(APIView):
 class WardenDashboardView(APIView):
     """Warden Dashboard statistics view"""
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['warden']
 
     def get(self, request):
@@ -1139,16 +1327,13 @@ class WardenDashboardView(APIView):
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
         try:
+            counters = read_counters(['open_complaints', 'allocated_students'])
+            
             # Get current complaints that need warden response
-            current_complaints = Complaint.objects.filter(
-                status__in=['pending', 'in_progress']
-            ).count()
+            current_complaints = counters['open_complaints']
             
             # Get current room allocations (students with assigned rooms)
-            current_room_allocations = Student.objects.filter(
-                room__isnull=False,
-                is_active=True
-            ).count()
+            current_room_allocations = counters['allocated_students']
             
             # Get recent notifications for warden
             recent_notifications = Notification.objects.filter(
@@ -1176,12 +1361,14 @@ class WardenDashboardView(APIView):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class RoomApplicationViewSet(viewsets.ModelViewSet):
+class RoomApplicationViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Room application views"""
-    queryset = Payment.objects.all()  # Using Payment model for room applications
+    queryset = Payment.objects.select_related('student__user', 'verified_by')  # Using Payment model for room applications
     serializer_class = PaymentSerializer
     permission_classes = [RoleBasedPermission]
+    renderer_classes = API_RENDERER_CLASSES
     allowed_roles = ['admin', 'warden', 'student']
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         """Create room application (payment)"""
@@ -1197,32 +1384,29 @@ class RoomApplicationViewSet(viewsets.ModelViewSet):
             else:
                 amount = 7000  # Default to dormitory
             
-            # Create payment record
-            payment = serializer.save(
-                student=student,
-                amount=amount,
-                payment_method=self.request.data.get('payment_method'),
-                description=f"Room application for {room_type} room",
-                status='pending'
-            )
-            
-            # Create notification for admin
-            admin_users = User.objects.filter(role='admin')
-            for admin in admin_users:
-                Notification.objects.create(
-                    recipient=admin,
+            with transaction.atomic():
+                # Create payment record
+                serializer.save(
+                    student=student,
+                    amount=amount,
+                    payment_method=self.request.data.get('payment_method'),
+                    description=f"Room application for {room_type} room",
+                    status='pending'
+                )
+                
+                # Queue notifications for admins and the student
+                enqueue_notification(
+                    role='admin',
                     notification_type='payment',
                     title='New Room Application',
                     message=f'Student {student.user.get_full_name()} has submitted a room application with payment of PKR {amount}'
                 )
-            
-            # Create notification for student
-            Notification.objects.create(
-                recipient=student.user,
-                notification_type='registration_success',
-                title='Application Submitted',
-                message='Your room application has been submitted successfully. Payment will be verified by admin.'
-            )
+                enqueue_notification(
+                    recipient=student.user,
+                    notification_type='registration_success',
+                    title='Application Submitted',
+                    message='Your room application has been submitted successfully. Payment will be verified by admin.'
+                )
             
             return Response({'message': 'Room application submitted successfully'})
         except Student.DoesNotExist: